@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+MTG Card Name Autocomplete
+
+Type-ahead completion over every card name in the library. Names are kept in
+a sorted array of normalised keys; a prefix query is two binary searches plus
+a ranking of the matching range by EDHREC rank (most played first). The best
+completions of every one- and two-letter prefix are precomputed, since those
+ranges are too large to rank per keystroke.
+
+Double-faced and split cards can also be completed by their back-face name.
+The index is cached in .cache/ keyed by the library fingerprint.
+
+Usage:
+    python scripts/autocomplete.py <prefix> [--limit N]
+    python scripts/search_cards.py --complete <prefix>
+
+Example:
+    from autocomplete import load_completer
+    load_completer().complete("sol r")   # ['Sol Ring', ...]
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+from library_watcher import CACHE_DIR, LibraryWatcher, library_fingerprint, prune_cache, write_json_atomic
+
+CACHE_VERSION = 1
+DEFAULT_LIMIT = 10
+PRECOMPUTED_PREFIX_LENGTH = 2
+PRECOMPUTED_LIMIT = 25
+UNRANKED = 10 ** 7  # Sorts cards without an EDHREC rank last
+
+# Layouts that are not deck cards (same as card_matrix.NON_CARD_LAYOUTS, without importing numpy)
+NON_CARD_LAYOUTS = {
+    'token', 'double_faced_token', 'art_series', 'emblem',
+    'vanguard', 'scheme', 'planar', 'reversible_card'
+}
+
+
+def normalize_prefix(text: str) -> str:
+    """Lowercase, accent-free key used for matching"""
+    text = unicodedata.normalize('NFKD', text.replace('’', "'"))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def build_completion_index(cards) -> Dict[str, list]:
+    """
+    Sorted name keys with the card name and rank each key completes to.
+
+    Returns:
+        {'keys': [...], 'names': [...], 'ranks': [...], 'top': {prefix: [key indices]}}
+    """
+    best: Dict[str, List] = {}
+    for card in cards:
+        card_name = card.get('name', '')
+        if not card_name or card.get('layout') in NON_CARD_LAYOUTS:
+            continue
+        rank = card.get('edhrec_rank') or UNRANKED
+        faces = [face.get('name', '') for face in card.get('card_faces') or []]
+        for key_name in [card_name] + [face for face in faces if face and face != card_name]:
+            key = normalize_prefix(key_name)
+            if key not in best or rank < best[key][1]:
+                best[key] = [card_name, rank]
+
+    keys = sorted(best)
+    names = [best[key][0] for key in keys]
+    ranks = [best[key][1] for key in keys]
+
+    top: Dict[str, List[int]] = {}
+    for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+        for prefix in sorted({key[:length] for key in keys if len(key) >= length}):
+            lo, hi = prefix_range(keys, prefix)
+            top[prefix] = heapq.nsmallest(PRECOMPUTED_LIMIT, range(lo, hi), key=lambda i: (ranks[i], keys[i]))
+
+    return {'keys': keys, 'names': names, 'ranks': ranks, 'top': top}
+
+
+def prefix_range(keys: List[str], prefix: str):
+    """[lo, hi) range of sorted keys starting with prefix"""
+    lo = bisect.bisect_left(keys, prefix)
+    hi = bisect.bisect_left(keys, prefix + '\U0010ffff', lo)
+    return lo, hi
+
+
+class NameCompleter:
+    """Prefix completion over the sorted card name index"""
+
+    def __init__(self, index: Dict[str, list]):
+        self.keys = index['keys']
+        self.names = index['names']
+        self.ranks = index['ranks']
+        self.top = index['top']
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """Up to limit card names starting with prefix, most played first"""
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and limit <= PRECOMPUTED_LIMIT:
+            rows = self.top.get(prefix, [])
+        else:
+            lo, hi = prefix_range(self.keys, prefix)
+            rows = heapq.nsmallest(limit * 2, range(lo, hi), key=lambda i: (self.ranks[i], self.keys[i]))
+
+        completions = []
+        for row in rows:
+            card_name = self.names[row]
+            if card_name not in completions:
+                completions.append(card_name)
+                if len(completions) == limit:
+                    break
+        return completions
+
+
+def load_completer(library: Optional[LibraryWatcher] = None) -> NameCompleter:
+    """Load the completion index from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library.library_path) if library else library_fingerprint()
+    cache_file = CACHE_DIR / f"autocomplete_v{CACHE_VERSION}_{fingerprint}.json"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return NameCompleter(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if library is None:
+        library = LibraryWatcher()
+    library.poll()
+    index = build_completion_index(library.cards())
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(cache_file, index)
+    prune_cache("autocomplete_v*_*.json")
+    return NameCompleter(index)
+
+
+_completer: Optional[NameCompleter] = None
+
+
+def complete(prefix: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+    """Card name completions for a prefix (index loaded once per process)"""
+    global _completer
+
+    if _completer is None:
+        _completer = load_completer()
+    return _completer.complete(prefix, limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Complete card names from a prefix')
+    parser.add_argument('prefix', help='Beginning of a card name')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f'Number of completions (default: {DEFAULT_LIMIT})')
+    args = parser.parse_args(argv)
+
+    completer = load_completer()
+    start = time.perf_counter()
+    completions = completer.complete(args.prefix, args.limit)
+    elapsed = time.perf_counter() - start
+
+    for card_name in completions:
+        print(card_name)
+    print(f"({len(completions)} completions from {len(completer)} names in {elapsed * 1e6:.0f}µs)")
+
+
+if __name__ == "__main__":
+    main()
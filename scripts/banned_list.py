@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+MTG Banned/Restricted Table
+
+Compiles formats/banned-restricted.md into a normalised
+card name -> {format: status} table for constant-time ban checks.
+The compiled table is cached in .cache/ keyed by the SHA-256 of the markdown
+file, so it is only re-parsed after the list is edited.
+
+Statuses are 'banned' or 'restricted'. Entries annotated as MTG Arena
+Best-of-One only are kept separately (they do not apply to paper play), and
+entries annotated as recently unbanned are ignored. Category rules that
+are not card names (e.g. 'All cards referencing "Stickers"') are kept as
+per-format rule text.
+
+Usage:
+    python scripts/banned_list.py "<card name>" [...]
+    python scripts/banned_list.py --format commander
+    python scripts/banned_list.py --check-library
+
+Example:
+    python scripts/banned_list.py "Sol Ring" "Oko, Thief of Crowns"
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from library_watcher import CACHE_DIR, PROJECT_ROOT, write_json_atomic
+
+BANNED_LIST_PATH = PROJECT_ROOT / "formats" / "banned-restricted.md"
+TABLE_CACHE_FILE = CACHE_DIR / "banned_table.json"
+TABLE_VERSION = 1
+
+# Section headings in banned-restricted.md -> format key
+FORMAT_HEADINGS = {
+    'standard': 'standard',
+    'pioneer': 'pioneer',
+    'modern': 'modern',
+    'legacy': 'legacy',
+    'vintage': 'vintage',
+    'commander (edh)': 'commander',
+    'pauper': 'pauper',
+    '$30 value vintage (budget vintage)': 'valuevintage',
+}
+
+# Formats that Scryfall also reports in each card's 'legalities'
+SCRYFALL_FORMATS = {'standard', 'pioneer', 'modern', 'legacy', 'vintage', 'commander', 'pauper'}
+
+# Bold labels that end a card list inside a format section
+LIST_END_LABELS = ('pricing', 'note', 'recent changes', 'status', 'budget')
+
+HEADING_PATTERN = re.compile(r'^(#{2,3})\s+(.*?)\s*$')
+BULLET_PATTERN = re.compile(r'^\s*[-*]\s+(.*?)\s*$')
+BOLD_LABEL_PATTERN = re.compile(r'^\*\*(.+?):?\*\*')
+ANNOTATION_PATTERN = re.compile(r'\s*\*\((.*?)\)\*\s*$')
+
+
+def normalize_name(card_name: str) -> str:
+    """Case-, accent- and quote-insensitive card name key (front face for split/DFC names)"""
+    card_name = card_name.split(' // ')[0]
+    card_name = card_name.replace('’', "'").replace('‘', "'")
+    card_name = unicodedata.normalize('NFKD', card_name)
+    card_name = ''.join(c for c in card_name if not unicodedata.combining(c))
+    return ' '.join(card_name.lower().split())
+
+
+def parse_banned_list(text: str) -> Dict[str, Any]:
+    """
+    Parse banned-restricted.md.
+
+    Returns:
+        {'cards': {name key: {format: status}},
+         'names': {name key: display name},
+         'arena_only': {name key: [formats]},
+         'rules': {format: {status: [rule text]}}}
+    """
+    cards: Dict[str, Dict[str, str]] = {}
+    names: Dict[str, str] = {}
+    arena_only: Dict[str, List[str]] = {}
+    rules: Dict[str, Dict[str, List[str]]] = {}
+
+    format_key = None
+    status = None
+
+    for line in text.splitlines():
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2).strip()
+            if level == 2:
+                format_key = FORMAT_HEADINGS.get(title.lower())
+                status = None
+            elif format_key:
+                lowered = title.lower()
+                status = 'banned' if lowered.startswith('banned') else (
+                    'restricted' if lowered.startswith('restricted') else None)
+            continue
+
+        if not format_key or not status:
+            continue
+
+        label = BOLD_LABEL_PATTERN.match(line.strip())
+        if label:
+            if label.group(1).lower().startswith(LIST_END_LABELS):
+                status = None
+            continue
+
+        bullet = BULLET_PATTERN.match(line)
+        if not bullet:
+            continue
+
+        entry = bullet.group(1)
+        annotation = ANNOTATION_PATTERN.search(entry)
+        note = annotation.group(1).lower() if annotation else ''
+        entry = ANNOTATION_PATTERN.sub('', entry).strip()
+
+        if entry.lower().startswith(('all ', 'cards ')):
+            rules.setdefault(format_key, {}).setdefault(status, []).append(entry)
+            continue
+        if 'unbanned' in note:
+            continue
+
+        key = normalize_name(entry)
+        names.setdefault(key, entry)
+        if 'arena' in note:
+            arena_only.setdefault(key, []).append(format_key)
+            continue
+        cards.setdefault(key, {})[format_key] = status
+
+    return {'cards': cards, 'names': names, 'arena_only': arena_only, 'rules': rules}
+
+
+class BanTable:
+    """Compiled banned/restricted lookups"""
+
+    def __init__(self, table: Dict[str, Any]):
+        self.cards = table['cards']
+        self.names = table['names']
+        self.arena_only = table['arena_only']
+        self.rules = table['rules']
+
+    def status(self, card_name: str, format_name: str) -> Optional[str]:
+        """'banned', 'restricted' or None for a card in a format"""
+        return self.cards.get(normalize_name(card_name), {}).get(format_name)
+
+    def statuses(self, card_name: str) -> Dict[str, str]:
+        """Every format in which the card is banned or restricted"""
+        return self.cards.get(normalize_name(card_name), {})
+
+    def formats(self) -> List[str]:
+        """Formats with at least one entry, in document order"""
+        seen = []
+        for format_key in FORMAT_HEADINGS.values():
+            if format_key in self.rules or any(format_key in s for s in self.cards.values()):
+                seen.append(format_key)
+        return seen
+
+    def format_entries(self, format_name: str) -> List[Tuple[str, str]]:
+        """(display name, status) of every entry for a format, sorted by name"""
+        entries = [(self.names[key], statuses[format_name])
+                   for key, statuses in self.cards.items() if format_name in statuses]
+        return sorted(entries)
+
+    def check_deck(self, deck: Iterable[Tuple[int, str]], format_name: str) -> List[str]:
+        """
+        Banned cards and restricted cards with more than one copy.
+
+        Args:
+            deck: (quantity, card_name) pairs; quantities of repeated names are combined
+        """
+        quantities: Dict[str, int] = {}
+        display: Dict[str, str] = {}
+        for quantity, card_name in deck:
+            key = normalize_name(card_name)
+            quantities[key] = quantities.get(key, 0) + quantity
+            display.setdefault(key, card_name)
+
+        violations = []
+        for key, quantity in quantities.items():
+            status = self.cards.get(key, {}).get(format_name)
+            if status == 'banned':
+                violations.append(f"Banned card: {display[key]}")
+            elif status == 'restricted' and quantity > 1:
+                violations.append(f"Restricted card (max 1 copy): {display[key]} x{quantity}")
+        return violations
+
+    def disagreements(self, card: Dict[str, Any], format_name: str) -> Optional[str]:
+        """Describe a mismatch between this table and the card's Scryfall legalities, if any"""
+        if format_name not in SCRYFALL_FORMATS:
+            return None
+        scryfall = (card.get('legalities') or {}).get(format_name)
+        if scryfall in (None, 'not_legal'):
+            return None
+
+        ours = self.status(card.get('name', ''), format_name)
+        if ours == scryfall or (ours is None and scryfall == 'legal'):
+            return None
+        if ours is None and normalize_name(card.get('name', '')) in self.arena_only:
+            return None
+        return (f"{card.get('name', '')}: banned-restricted.md says {ours or 'legal'} in {format_name}, "
+                f"Scryfall says {scryfall}")
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's contents (plus the table version)"""
+    digest = hashlib.sha256(f"v{TABLE_VERSION}".encode('utf-8'))
+    if path.exists():
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_ban_table() -> BanTable:
+    """Load the compiled table from cache, re-parsing only if banned-restricted.md changed"""
+    key = file_hash(BANNED_LIST_PATH)
+
+    if TABLE_CACHE_FILE.exists():
+        try:
+            with open(TABLE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return BanTable(cached['table'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    text = BANNED_LIST_PATH.read_text(encoding='utf-8') if BANNED_LIST_PATH.exists() else ''
+    table = parse_banned_list(text)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(TABLE_CACHE_FILE, {'key': key, 'table': table})
+    return BanTable(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Banned/restricted lookups compiled from banned-restricted.md')
+    parser.add_argument('cards', nargs='*', help='Card names to look up')
+    parser.add_argument('--format', dest='format_name', help='List every entry for a format')
+    parser.add_argument('--check-library', action='store_true',
+                        help='Report disagreements with Scryfall legalities across the card library')
+    args = parser.parse_args(argv)
+
+    table = load_ban_table()
+
+    for card_name in args.cards:
+        statuses = table.statuses(card_name)
+        if statuses:
+            print(f"{card_name}: " + ', '.join(f"{status} in {fmt}" for fmt, status in statuses.items()))
+        else:
+            print(f"{card_name}: not banned or restricted in any listed format")
+
+    if args.format_name:
+        entries = table.format_entries(args.format_name)
+        print(f"{args.format_name.upper()}: {len(entries)} entries")
+        for card_name, status in entries:
+            print(f"  {status:<10} {card_name}")
+        for status, rule_texts in table.rules.get(args.format_name, {}).items():
+            for rule_text in rule_texts:
+                print(f"  {status:<10} {rule_text}")
+
+    if args.check_library:
+        from library_watcher import get_library
+
+        card_data = get_library().by_name()
+        found = 0
+        for card in card_data.values():
+            for format_name in SCRYFALL_FORMATS:
+                message = table.disagreements(card, format_name)
+                if message:
+                    found += 1
+                    print(f"  {message}")
+        print(f"{found} disagreement(s) between banned-restricted.md and Scryfall legalities")
+
+    if not (args.cards or args.format_name or args.check_library):
+        for format_name in table.formats():
+            entries = table.format_entries(format_name)
+            banned = sum(1 for _, status in entries if status == 'banned')
+            print(f"  {format_name:<14} {banned} banned, {len(entries) - banned} restricted")
+
+
+if __name__ == "__main__":
+    main()
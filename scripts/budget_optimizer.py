@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Budget Optimizer for $30 Value Vintage (and other price-capped decks)
+
+Works entirely from the local card library:
+
+1. Assigns every card its cheapest tournament-legal printing (English, paper,
+   not gold-bordered or oversized) from a local printing/price index.
+2. If the deck is still over budget, ranks cheaper functional substitutes for
+   the most expensive cards: same card type and role, inside the deck's color
+   identity, legal in the format (banned cards and, for multi-copy swaps,
+   restricted cards excluded per banned-restricted.md), and most similar by
+   rules text (using the recommender's TF-IDF vectors).
+3. Proposes a greedy swap plan: the most expensive cards are swapped for
+   their closest cheaper substitute until the deck fits the cap; if it is
+   still over, closest picks are traded for the cheapest alternatives where
+   that saves the most. This is not guaranteed to be the plan with the
+   smallest total loss of similarity.
+
+Usage:
+    python scripts/budget_optimizer.py <deck_file_path> [budget_limit] [--format FORMAT] [--alternatives N]
+
+The default format is valuevintage ($30 Value Vintage): Vintage legality
+plus that format's own banned/restricted list.
+
+Example:
+    python scripts/budget_optimizer.py decks/my-deck.txt 30
+"""
+
+import argparse
+import json
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from banned_list import BanTable, load_ban_table
+from card_matrix import TYPE_FLAGS
+from check_deck_price import FREE_BASICS, is_legal_printing, parse_decklist
+from library_watcher import CACHE_DIR, LibraryWatcher, library_fingerprint, prune_cache, write_json_atomic
+from recommend import FORMATS, CardRecommender, load_recommender
+
+# Card types a substitute must share with the card it replaces
+SUBSTITUTE_TYPES = ['land', 'creature', 'artifact', 'enchantment', 'planeswalker', 'instant', 'sorcery', 'battle']
+
+MIN_SIMILARITY = 0.15
+
+# Formats not in the recommender's legality bitmask -> the format whose legality they build on
+BASE_FORMATS = {'valuevintage': 'vintage'}
+FORMAT_CHOICES = list(BASE_FORMATS) + FORMATS
+CACHE_VERSION = 1
+
+
+def build_printing_index(cards) -> Dict[str, List]:
+    """
+    Cheapest legal printing per card name.
+
+    Returns:
+        dict: lowercase name -> [price, name, set_code, collector_number]
+    """
+    index = {}
+    for card in cards:
+        price = (card.get('prices') or {}).get('usd')
+        if not price or not is_legal_printing(card):
+            continue
+        price = float(price)
+        names = [card.get('name', '')] + [face.get('name', '') for face in card.get('card_faces') or []]
+        for name in names:
+            key = name.lower()
+            if key and (key not in index or price < index[key][0]):
+                index[key] = [price, card.get('name', ''), card.get('set', ''), card.get('collector_number', '')]
+    return index
+
+
+def load_printing_index(library: Optional[LibraryWatcher] = None) -> Dict[str, List]:
+    """Load the printing/price index from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library.library_path) if library else library_fingerprint()
+    cache_file = CACHE_DIR / f"printing_prices_v{CACHE_VERSION}_{fingerprint}.json"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    if library is None:
+        library = LibraryWatcher()
+    library.poll()
+    index = build_printing_index(library.cards())
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(cache_file, index)
+    prune_cache("printing_prices_v*_*.json")
+    return index
+
+
+def assign_printings(deck: List[Tuple[int, str]], printing_index: Dict[str, List]):
+    """
+    Cheapest legal printing for every card in the deck.
+
+    Returns:
+        (list of (quantity, card_name, price, printing or None), list of unpriced names)
+    """
+    assignment = []
+    unpriced = []
+    for quantity, card_name in deck:
+        key = card_name.lower()
+        if key in FREE_BASICS:
+            assignment.append((quantity, card_name, 0.0, None))
+        elif key in printing_index:
+            price, _, set_code, collector_number = printing_index[key]
+            assignment.append((quantity, card_name, price, (set_code, collector_number)))
+        else:
+            unpriced.append(card_name)
+    return assignment, unpriced
+
+
+class BudgetOptimizer:
+    """Ranks cheaper functional substitutes using the recommender model"""
+
+    def __init__(self, recommender: CardRecommender, printing_index: Dict[str, List],
+                 format_name: str = 'valuevintage', ban_table: Optional[BanTable] = None):
+        self.recommender = recommender
+        self.printing_index = printing_index
+        self.format_name = format_name
+        self.format_bit = 1 << FORMATS.index(BASE_FORMATS.get(format_name, format_name))
+        self.ban_table = ban_table if ban_table is not None else load_ban_table()
+
+        # Cheapest legal printing price aligned with the recommender's rows
+        self.price = np.array([printing_index.get(name.lower(), [math.nan])[0] for name in recommender.names],
+                              dtype=np.float32)
+
+        type_mask = 0
+        for type_name in SUBSTITUTE_TYPES:
+            type_mask |= TYPE_FLAGS[type_name]
+        self.primary_types = recommender.types & type_mask
+
+    def deck_identity(self, deck: List[Tuple[int, str]]) -> int:
+        """Union of the deck cards' color identities"""
+        identity = 0
+        for _, card_name in deck:
+            row = self.recommender.name_rows.get(card_name)
+            if row is not None:
+                identity |= int(self.recommender.identity[row])
+        return identity
+
+    def allowed(self, card_name: str, quantity: int) -> bool:
+        """Whether quantity copies of a card may be played in the format (banned-restricted.md)"""
+        status = self.ban_table.status(card_name, self.format_name)
+        return status is None or (status == 'restricted' and quantity <= 1)
+
+    def substitutes(self, card_names: List[str], deck: List[Tuple[int, str]], alternatives: int = 3):
+        """
+        Cheaper substitutes for each card, scored in one batch. A substitute
+        must be playable in as many copies as the deck runs of the card it
+        replaces, so restricted cards are only proposed for single copies.
+
+        Returns:
+            dict: card name -> list of (substitute name, price, similarity)
+        """
+        recommender = self.recommender
+        rows = [recommender.name_rows.get(name) for name in card_names]
+        known = [(name, row) for name, row in zip(card_names, rows) if row is not None]
+        if not known:
+            return {}
+
+        profiles = np.stack([recommender.profile({name: 1}) for name, _ in known])
+        similarity = recommender.scores(profiles)
+
+        identity = self.deck_identity(deck)
+        quantities: Dict[str, int] = {}
+        in_deck = np.zeros(len(recommender), dtype=bool)
+        for quantity, card_name in deck:
+            quantities[card_name] = quantities.get(card_name, 0) + quantity
+            row = recommender.name_rows.get(card_name)
+            if row is not None:
+                in_deck[row] = True
+
+        base_mask = (((recommender.identity & ~np.uint8(identity)) == 0)
+                     & ((recommender.legality & self.format_bit) != 0)
+                     & ~np.isnan(self.price) & ~in_deck)
+
+        results = {}
+        for index, (name, row) in enumerate(known):
+            mask = (base_mask
+                    & (self.price < self.price[row])
+                    & (self.primary_types == self.primary_types[row])
+                    & ((recommender.roles & recommender.roles[row]) == recommender.roles[row])
+                    & (similarity[index] >= MIN_SIMILARITY))
+            candidates = np.nonzero(mask)[0]
+            if len(candidates) == 0:
+                results[name] = []
+                continue
+            scores = similarity[index][candidates]
+            quantity = quantities.get(name, 1)
+            choices = []
+            for i in np.argsort(-scores, kind='stable'):
+                substitute = recommender.names[candidates[i]]
+                if not self.allowed(substitute, quantity):
+                    continue
+                choices.append((substitute, float(self.price[candidates[i]]), float(scores[i])))
+                if len(choices) == alternatives:
+                    break
+            results[name] = choices
+        return results
+
+    def plan(self, assignment, budget_limit: float, alternatives: int = 3):
+        """
+        Greedy swap plan: replace the most expensive cards with their closest
+        cheaper substitute until the deck fits the budget.
+
+        Returns:
+            (ranked substitutes per card, list of swaps, total after swaps)
+        """
+        deck = [(quantity, card_name) for quantity, card_name, _, _ in assignment]
+        total = sum(quantity * price for quantity, _, price, _ in assignment)
+
+        expensive = sorted((entry for entry in assignment if entry[2] > 0), key=lambda e: -e[0] * e[2])
+        options = self.substitutes([card_name for _, card_name, _, _ in expensive], deck, alternatives)
+
+        swaps = []
+        for quantity, card_name, price, _ in expensive:
+            if total <= budget_limit:
+                break
+            choices = options.get(card_name) or []
+            if not choices:
+                continue
+            substitute, substitute_price, score = choices[0]
+            savings = quantity * (price - substitute_price)
+            total -= savings
+            swaps.append((quantity, card_name, price, substitute, substitute_price, savings, score))
+
+        # Still over: trade similarity for price, cheapest alternatives first where they save the most
+        if total > budget_limit:
+            upgrades = []
+            for index, (quantity, card_name, price, _, substitute_price, _, _) in enumerate(swaps):
+                cheapest = min(options[card_name], key=lambda choice: choice[1])
+                extra = quantity * (substitute_price - cheapest[1])
+                if extra > 0:
+                    upgrades.append((extra, index, cheapest))
+            for extra, index, (substitute, substitute_price, score) in sorted(upgrades, reverse=True):
+                if total <= budget_limit:
+                    break
+                quantity, card_name, price = swaps[index][:3]
+                swaps[index] = (quantity, card_name, price, substitute, substitute_price,
+                                quantity * (price - substitute_price), score)
+                total -= extra
+
+        return options, swaps, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find cheapest printings and budget substitutes from local data')
+    parser.add_argument('deck_file', help='Deck file path')
+    parser.add_argument('budget_limit', nargs='?', type=float, default=30.0, help='Budget limit in USD (default: 30)')
+    parser.add_argument('--format', dest='format_name', default='valuevintage', choices=FORMAT_CHOICES,
+                        help='Format legality for substitutes (default: valuevintage)')
+    parser.add_argument('--alternatives', type=int, default=3, help='Substitutes listed per card (default: 3)')
+    args = parser.parse_args(argv)
+
+    main_deck, sideboard = parse_decklist(args.deck_file)
+    deck = main_deck + sideboard
+
+    start = time.perf_counter()
+    printing_index = load_printing_index()
+    assignment, unpriced = assign_printings(deck, printing_index)
+    total = sum(quantity * price for quantity, _, price, _ in assignment)
+
+    print(f"\n{'='*60}")
+    print("BUDGET OPTIMIZER (local prices)")
+    print(f"{'='*60}")
+    print(f"Deck file: {args.deck_file}")
+    print(f"Budget limit: ${args.budget_limit:.2f} USD")
+    print(f"{'='*60}\n")
+
+    print("CHEAPEST LEGAL PRINTINGS:")
+    print("-" * 60)
+    for quantity, card_name, price, printing in assignment:
+        if printing is None:
+            print(f"  {quantity}x {card_name:40} FREE (basic land)")
+        else:
+            set_code, collector_number = printing
+            print(f"  {quantity}x {card_name:40} {set_code.upper():>5} #{collector_number:<5} ${price:.2f} ea")
+
+    print(f"\nMinimum-cost total: ${total:.2f}")
+
+    if unpriced:
+        print(f"\n[WARNING] {len(unpriced)} card(s) have no local price:")
+        for card_name in unpriced:
+            print(f"  - {card_name}")
+
+    if total <= args.budget_limit:
+        print(f"\n[LEGAL] Within the ${args.budget_limit:.2f} budget using the printings above "
+              f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+        return
+
+    optimizer = BudgetOptimizer(load_recommender(), printing_index, args.format_name)
+    options, swaps, new_total = optimizer.plan(assignment, args.budget_limit, args.alternatives)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n[OVER BUDGET] ${total - args.budget_limit:.2f} over. Ranked substitutes:")
+    print("-" * 60)
+    for quantity, card_name, price, _ in sorted(assignment, key=lambda e: -e[0] * e[2]):
+        choices = options.get(card_name)
+        if not choices:
+            continue
+        print(f"  {card_name} (${price:.2f}):")
+        for substitute, substitute_price, score in choices:
+            print(f"      -> {substitute:38} ${substitute_price:>6.2f}  saves ${quantity * (price - substitute_price):.2f}"
+                  f"  similarity {score:.2f}")
+
+    print(f"\nSUGGESTED SWAPS:")
+    print("-" * 60)
+    for quantity, card_name, price, substitute, substitute_price, savings, score in swaps:
+        print(f"  {quantity}x {card_name} -> {substitute}  (saves ${savings:.2f})")
+    print(f"\nTotal after swaps: ${new_total:.2f} ({elapsed * 1000:.0f}ms)")
+
+    if new_total <= args.budget_limit:
+        print(f"[LEGAL] The swaps above bring the deck within ${args.budget_limit:.2f}")
+    else:
+        print(f"[ILLEGAL] Still ${new_total - args.budget_limit:.2f} over budget - no further substitutes found")
+
+
+if __name__ == "__main__":
+    main()
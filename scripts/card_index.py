@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+MTG Card Offset Index
+
+Sidecar index mapping every card name (and oracle_id) to the byte offset and
+length of its records inside the card-library JSON files, so tools that only
+need a deck's worth of cards can seek to and decode those records instead of
+parsing the whole ~430 MB library.
+
+- Each card file gets its own sidecar in .cache/card-offsets/, rebuilt only
+  when that file's size or mtime changes.
+- The merged index (.cache/card_index_v1_<fingerprint>.json) is rebuilt from
+  the sidecars whenever the library fingerprint changes.
+- For each name the index keeps every printing; the canonical record is the
+  one the name-keyed library view uses (the last one in file order).
+- Exact printings are indexed by (set code, collector number), Scryfall id
+  and the external ids (tcgplayer, mtgo, multiverse, arena, cardmarket), in
+  a second cache file that is only read on the first printing lookup.
+- Deck-export references like "Sol Ring (C21) 263" resolve to that printing.
+- The index records the (mtime_ns, size) of every file version it indexed
+  and reads records through descriptors opened on exactly that version
+  (library_watcher.open_version), so a set re-fetched while the index is in
+  use never yields bytes from the new file at the old file's offsets.
+
+CardIndex is a dict-like, lazily decoded view of the canonical cards (as
+compact card_record.Card records) that can stand in for LibraryWatcher.by_name().
+
+Usage:
+    python scripts/card_index.py "<card name>" [--printings]
+    python scripts/card_index.py "<card name> (<set>) <collector number>"
+    python scripts/card_index.py --oracle-id <oracle_id>
+    python scripts/card_index.py --id <scryfall id>
+    python scripts/card_index.py --tcgplayer-id <id>   (also --mtgo-id, --multiverse-id, --arena-id, --cardmarket-id)
+
+Example:
+    python scripts/card_index.py "Sol Ring" --printings
+    python scripts/card_index.py "Sol Ring (C21) 263"
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from card_record import Card
+from library_watcher import (CACHE_DIR, CARD_LIBRARY_PATH, library_fingerprint, open_pinned, open_version,
+                             prune_cache, scan_library, write_json_atomic)
+
+INDEX_VERSION = 4
+SIDECAR_DIR = CACHE_DIR / "card-offsets"
+
+DATA_ARRAY_PATTERN = re.compile(r'"data"\s*:\s*\[')
+WHITESPACE = ' \t\n\r'
+MAX_PINNED_FILES = 64  # Card files a CardIndex keeps open for reading
+
+# Printing lookups: 'set_number' is "<set code>:<collector number>", the rest are Scryfall fields
+EXTERNAL_ID_FIELDS = ['tcgplayer_id', 'mtgo_id', 'arena_id', 'cardmarket_id']
+PRINTING_KEYS = ['set_number', 'id', 'multiverse_id'] + EXTERNAL_ID_FIELDS
+
+# Printing lookups store each record location packed into one int (file, offset, length);
+# a location whose offset or length does not fit is stored unpacked as [file, offset, length]
+OFFSET_BITS = 28
+LENGTH_BITS = 20
+
+# "Name (SET) 123" as written by Arena, Moxfield and most collection exports (*F* marks a foil)
+PRINTING_REFERENCE_PATTERN = re.compile(
+    r'^(?P<name>.+?)\s+\((?P<set>[A-Za-z0-9]{2,6})\)(?:\s+(?P<number>[^\s()*]+))?(?:\s+\*[A-Z]\*)?$'
+)
+
+
+def parse_printing_reference(text: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Split "Name (SET) 123" into (name, set code, collector number); plain names give (name, None, None)"""
+    match = PRINTING_REFERENCE_PATTERN.match(text.strip())
+    if not match:
+        return text.strip(), None, None
+    return match.group('name'), match.group('set').lower(), match.group('number')
+
+
+def pack_entry(entry) -> Union[int, List[int]]:
+    file_number, offset, length = entry
+    if offset >= 1 << OFFSET_BITS or length >= 1 << LENGTH_BITS:
+        return list(entry)
+    return (file_number << (OFFSET_BITS + LENGTH_BITS)) | (offset << LENGTH_BITS) | length
+
+
+def unpack_entry(packed: Union[int, List[int]]) -> List[int]:
+    if isinstance(packed, list):
+        return packed
+    return [packed >> (OFFSET_BITS + LENGTH_BITS),
+            (packed >> LENGTH_BITS) & ((1 << OFFSET_BITS) - 1),
+            packed & ((1 << LENGTH_BITS) - 1)]
+
+
+def printing_keys(card: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Lookup keys of one printing, per PRINTING_KEYS entry"""
+    keys = {}
+    if card.get('set') and card.get('collector_number'):
+        keys['set_number'] = [f"{card['set'].lower()}:{card['collector_number']}"]
+    if card.get('id'):
+        keys['id'] = [card['id']]
+    if card.get('multiverse_ids'):
+        keys['multiverse_id'] = [str(value) for value in card['multiverse_ids']]
+    for field in EXTERNAL_ID_FIELDS:
+        if card.get(field) is not None:
+            keys[field] = [str(card[field])]
+    return keys
+
+
+def index_card_file(path) -> Tuple[List[List[Any]], Tuple[int, int]]:
+    """
+    Locate every card record in one card file.
+
+    Returns:
+        (list of [name, oracle_id, byte offset, byte length, printing keys],
+         (mtime_ns, size) of the version that was indexed)
+    """
+    f, stat = open_pinned(path)
+    with f:
+        data = f.read()
+    return index_card_data(data), stat
+
+
+def index_card_data(data: bytes) -> List[List[Any]]:
+    """Records of the contents of one card file (see index_card_file)"""
+    text = data.decode('utf-8')
+    ascii_only = len(text) == len(data)
+
+    start = len(text) - len(text.lstrip(WHITESPACE))
+    if text.startswith('{', start):
+        match = DATA_ARRAY_PATTERN.search(text, start)
+        if not match:
+            raise ValueError("unexpected card file structure")
+        pos = match.end()
+    elif text.startswith('[', start):
+        pos = start + 1
+    else:
+        raise ValueError("unexpected card file structure")
+
+    decoder = json.JSONDecoder()
+    records = []
+    byte_pos = pos if ascii_only else len(text[:pos].encode('utf-8'))
+    char_pos = pos
+
+    while True:
+        while pos < len(text) and text[pos] in WHITESPACE + ',':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            break
+
+        card, end = decoder.raw_decode(text, pos)
+        if ascii_only:
+            offset, length = pos, end - pos
+        else:
+            offset = byte_pos + len(text[char_pos:pos].encode('utf-8'))
+            length = len(text[pos:end].encode('utf-8'))
+            byte_pos, char_pos = offset + length, end
+
+        if isinstance(card, dict) and card.get('name'):
+            records.append([card['name'], card.get('oracle_id'), offset, length, printing_keys(card)])
+        pos = end
+
+    return records
+
+
+def file_records(library_path, rel_path: str, stat) -> Tuple[List[List[Any]], Tuple[int, int]]:
+    """
+    Records of one card file from its sidecar, re-indexing the file only if it changed.
+
+    Returns:
+        (records, (mtime_ns, size) of the file version they describe)
+    """
+    sidecar = SIDECAR_DIR / f"{hashlib.sha1(rel_path.encode('utf-8')).hexdigest()}.json"
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == INDEX_VERSION and cached.get('stat') == list(stat):
+            return cached['records'], tuple(stat)
+    except (OSError, ValueError):
+        pass
+
+    # The file may have been replaced since it was stat'ed: keep the stat of the version indexed
+    records, stat = index_card_file(library_path / rel_path)
+    SIDECAR_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(sidecar, {'version': INDEX_VERSION, 'path': rel_path, 'stat': list(stat), 'records': records})
+    return records, stat
+
+
+def build_card_index(library_path=CARD_LIBRARY_PATH) -> Dict[str, Any]:
+    """
+    Merge the per-file records of the whole library.
+
+    Returns:
+        {'files': [rel paths], 'stats': [[mtime_ns, size] of each file], 'names': {name: [[file, offset, length], ...]},
+         'oracle': {oracle_id: name}, 'errors': [[rel path, error]],
+         'printings': {lookup key type: {key: packed (or overflowing unpacked) entry}}}
+    """
+    files = []
+    stats = []
+    names: Dict[str, List[List[int]]] = {}
+    oracle: Dict[str, str] = {}
+    printings: Dict[str, Dict[str, Union[int, List[int]]]] = {key_type: {} for key_type in PRINTING_KEYS}
+    errors = []
+
+    for rel_path, stat in sorted(scan_library(library_path).items()):
+        try:
+            records, stat = file_records(library_path, rel_path, stat)
+        except (OSError, ValueError) as e:
+            errors.append([rel_path, str(e)])
+            continue
+        file_number = len(files)
+        files.append(rel_path)
+        stats.append(list(stat))
+        for card_name, oracle_id, offset, length, keys in records:
+            entry = [file_number, offset, length]
+            names.setdefault(card_name, []).append(entry)
+            if oracle_id:
+                oracle[oracle_id] = card_name
+            packed = pack_entry(entry)
+            for key_type, values in keys.items():
+                for value in values:
+                    printings[key_type][value] = packed
+
+    return {'files': files, 'stats': stats, 'names': names, 'oracle': oracle, 'errors': errors, 'printings': printings}
+
+
+class CardIndex(MutableMapping):
+    """
+    Name-keyed view of the library (like LibraryWatcher.by_name()) that decodes
+    each canonical record on first access. Cards assigned to it, e.g. resolved
+    from Scryfall, are kept in memory on top of the library.
+    """
+
+    def __init__(self, index: Dict[str, Any], library_path=CARD_LIBRARY_PATH, printings_file=None):
+        self.library_path = library_path
+        self.files = index['files']
+        self.stats = index['stats']
+        self.names = index['names']
+        self.oracle = index['oracle']
+        self.errors = index.get('errors', [])
+        self._printings = index.get('printings')
+        self._printings_file = printings_file
+        self._cards: Dict[str, Card] = {}
+        self._lower: Optional[Dict[str, str]] = None
+        self._oracle_ids: Optional[Dict[str, str]] = None
+        self._open_files: OrderedDict = OrderedDict()
+        self._read_lock = threading.Lock()
+
+    def _file(self, file_number: int):
+        """Open descriptor on the indexed version of a card file (least recently used ones are closed)"""
+        f = self._open_files.get(file_number)
+        if f is not None:
+            self._open_files.move_to_end(file_number)
+            return f
+        f, _ = open_version(self.library_path, self.files[file_number], self.stats[file_number])
+        self._open_files[file_number] = f
+        if len(self._open_files) > MAX_PINNED_FILES:
+            self._open_files.popitem(last=False)[1].close()
+        return f
+
+    def read_bytes(self, file_number: int, offset: int = 0, length: int = -1) -> bytes:
+        """Bytes of the indexed version of a card file (the whole file by default)"""
+        with self._read_lock:
+            f = self._file(file_number)
+            f.seek(offset)
+            return f.read(length)
+
+    def read(self, entry) -> Card:
+        """Decode one record"""
+        file_number, offset, length = entry
+        return Card.from_dict(json.loads(self.read_bytes(file_number, offset, length)))
+
+    def close(self) -> None:
+        """Close the card files held open for reading"""
+        with self._read_lock:
+            while self._open_files:
+                self._open_files.popitem()[1].close()
+
+    def __getitem__(self, card_name: str) -> Card:
+        card = self._cards.get(card_name)
+        if card is None:
+            card = self._cards[card_name] = self.read(self.names[card_name][-1])
+        return card
+
+    def __setitem__(self, card_name: str, card: Dict[str, Any]) -> None:
+        self._cards[card_name] = card
+
+    def __delitem__(self, card_name: str) -> None:
+        del self._cards[card_name]
+
+    def __contains__(self, card_name) -> bool:
+        return card_name in self._cards or card_name in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.names
+        yield from (name for name in self._cards if name not in self.names)
+
+    def __len__(self) -> int:
+        return len(self.names) + sum(1 for name in self._cards if name not in self.names)
+
+    def find(self, card_name: str) -> Optional[str]:
+        """Library name matching a card name (or the front face of one) case-insensitively"""
+        if card_name in self:
+            return card_name
+        if self._lower is None:
+            self._lower = {name.lower(): name for name in self.names}
+            for name in self.names:
+                if ' // ' in name:
+                    self._lower.setdefault(name.split(' // ')[0].lower(), name)
+        return self._lower.get(card_name.lower())
+
+    def printings(self, card_name: str) -> List[Card]:
+        """Every printing of a card in the library, in file order"""
+        return [self.read(entry) for entry in self.names.get(card_name, [])]
+
+    def oracle_id_of(self, card_name: str) -> Optional[str]:
+        """oracle_id of a library card name"""
+        if self._oracle_ids is None:
+            self._oracle_ids = {name: oracle_id for oracle_id, name in self.oracle.items()}
+        return self._oracle_ids.get(card_name)
+
+    def by_oracle_id(self, oracle_id: str) -> Optional[Card]:
+        """Canonical card for an oracle_id"""
+        card_name = self.oracle.get(oracle_id)
+        return self[card_name] if card_name else None
+
+    def printing_table(self, key_type: str) -> Dict[str, Union[int, List[int]]]:
+        """Lookup table of one PRINTING_KEYS type (read from its cache file on first use)"""
+        if self._printings is None:
+            with open(self._printings_file, 'r', encoding='utf-8') as f:
+                self._printings = json.load(f)
+        return self._printings[key_type]
+
+    def find_printing(self, key_type: str, value) -> Optional[Card]:
+        """Printing with the given lookup key, e.g. ('tcgplayer_id', 12345) or ('id', <scryfall id>)"""
+        packed = self.printing_table(key_type).get(str(value))
+        return self.read(unpack_entry(packed)) if packed is not None else None
+
+    def printing(self, set_code: str, collector_number: str) -> Optional[Card]:
+        """Printing by set code and collector number"""
+        return self.find_printing('set_number', f"{set_code.lower()}:{collector_number}")
+
+    def by_id(self, scryfall_id: str) -> Optional[Card]:
+        """Printing by Scryfall id"""
+        return self.find_printing('id', scryfall_id)
+
+    def resolve_reference(self, text: str) -> Optional[Card]:
+        """
+        Card for a deck-export line such as "Sol Ring (C21) 263": the exact
+        printing when one is given, otherwise the canonical card of the name.
+        """
+        card_name, set_code, collector_number = parse_printing_reference(text)
+        if set_code and collector_number:
+            card = self.printing(set_code, collector_number)
+            if card is not None:
+                return card
+        library_name = self.find(card_name)
+        if library_name is None:
+            return None
+        if set_code:
+            # Set files are named after their set code, so only that file's records are decoded
+            set_file = f"all_cards_{set_code}.json"
+            for entry in reversed(self.names.get(library_name, [])):
+                if self.files[entry[0]].endswith(set_file):
+                    card = self.read(entry)
+                    if card.get('set') == set_code:
+                        return card
+        return self[library_name]
+
+
+_loaded: Dict[str, CardIndex] = {}
+
+
+def load_card_index(library_path=CARD_LIBRARY_PATH, fingerprint: Optional[str] = None) -> CardIndex:
+    """
+    Load the merged offset index from cache, rebuilding changed files' sidecars
+    if the library changed. The index is shared within a process until the
+    library changes.
+    """
+    fingerprint = fingerprint or library_fingerprint(library_path)
+    key = f"{library_path}:{fingerprint}"
+    if key in _loaded:
+        return _loaded[key]
+
+    _loaded.clear()
+    _loaded[key] = index = read_card_index(library_path, fingerprint)
+    return index
+
+
+def read_card_index(library_path, fingerprint: str) -> CardIndex:
+    """Read the cached index (names and oracle ids; printing lookups stay in their own file until needed)"""
+    cache_file = CACHE_DIR / f"card_index_v{INDEX_VERSION}_{fingerprint}.json"
+    printings_file = CACHE_DIR / f"card_printings_v{INDEX_VERSION}_{fingerprint}.json"
+
+    if cache_file.exists() and printings_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return CardIndex(json.load(f), library_path, printings_file)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index = build_card_index(library_path)
+    printings = index.pop('printings')
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for path, data in ((printings_file, printings), (cache_file, index)):
+        write_json_atomic(path, data)
+    for pattern in ("card_index_v*.json", "card_printings_v*.json"):
+        prune_cache(pattern)
+
+    index['printings'] = printings
+    return CardIndex(index, library_path, printings_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Look up cards through the offset index')
+    parser.add_argument('card_name', nargs='?', help='Card name')
+    parser.add_argument('--printings', action='store_true', help='List every printing in the library')
+    parser.add_argument('--oracle-id', help='Look a card up by oracle_id instead of name')
+    parser.add_argument('--id', dest='scryfall_id', help='Look a printing up by Scryfall id')
+    for field in ['multiverse_id'] + EXTERNAL_ID_FIELDS:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field,
+                            help=f"Look a printing up by {field.replace('_id', '').replace('_', ' ')} id")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = load_card_index()
+    loaded = time.perf_counter()
+
+    for rel_path, error in index.errors:
+        print(f"Warning: Could not index {rel_path}: {error}")
+
+    lookups = [(field, getattr(args, field)) for field in ['multiverse_id'] + EXTERNAL_ID_FIELDS
+               if getattr(args, field)]
+    if args.scryfall_id:
+        lookups.append(('id', args.scryfall_id))
+
+    if args.oracle_id:
+        card = index.by_oracle_id(args.oracle_id)
+        cards = [card] if card else []
+    elif lookups:
+        cards = [card for card in (index.find_printing(field, value) for field, value in lookups) if card]
+    elif args.card_name:
+        card_name = index.find(parse_printing_reference(args.card_name)[0])
+        if card_name is not None and args.printings:
+            cards = index.printings(card_name)
+        else:
+            card = index.resolve_reference(args.card_name)
+            cards = [card] if card else []
+    else:
+        print(f"{len(index.names)} names in {len(index.files)} files "
+              f"(index loaded in {(loaded - start) * 1000:.0f}ms)")
+        return
+
+    elapsed = time.perf_counter() - loaded
+    if not cards:
+        print(f"No card found for '{args.oracle_id or (lookups and lookups[0][1]) or args.card_name}'")
+        return
+    for card in cards:
+        usd = (card.get('prices') or {}).get('usd')
+        print(f"  {card.get('name')}  {card.get('set', '').upper()} #{card.get('collector_number', '')}"
+              f"  {card.get('type_line', '')}  {'$' + usd if usd else ''}")
+    print(f"({len(cards)} record(s) decoded in {elapsed * 1000:.1f}ms; index loaded in {(loaded - start) * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+MTG Card Attribute Matrix
+
+Columnar NumPy representation of the card library for vectorised analytics.
+Every printing becomes one row; attributes are stored as parallel arrays:
+
+- cmc, power, toughness, price (USD, NaN when unknown)
+- colors / color identity as 5-bit masks (W=1, U=2, B=4, R=8, G=16)
+- card type flags, rarity code, edhrec_rank (-1 when unranked)
+- role flags (ramp, card draw, removal) using the validator's heuristics
+
+The matrix is cached in .cache/ keyed by the library fingerprint, so only the
+first run after a set changes pays for parsing the JSON library.
+
+Usage:
+    python scripts/card_matrix.py curve [--set <set_code>] [--printings]
+    python scripts/card_matrix.py cmc-by-set [--top N]
+    python scripts/card_matrix.py types [--set <set_code>] [--printings]
+    python scripts/card_matrix.py deck <deck_file_path>
+    python scripts/card_matrix.py bench [--deck <deck_file_path>]
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from library_watcher import (CACHE_DIR, LibraryWatcher, library_fingerprint, prune_cache, temp_path,
+                             write_json_atomic)
+
+# Color bitmask
+COLOR_BITS = {'W': 1, 'U': 2, 'B': 4, 'R': 8, 'G': 16}
+COLOR_NAMES = {'W': 'White', 'U': 'Blue', 'B': 'Black', 'R': 'Red', 'G': 'Green'}
+
+# Card type flags
+TYPE_FLAGS = {
+    'land': 1 << 0,
+    'creature': 1 << 1,
+    'artifact': 1 << 2,
+    'enchantment': 1 << 3,
+    'planeswalker': 1 << 4,
+    'instant': 1 << 5,
+    'sorcery': 1 << 6,
+    'battle': 1 << 7,
+    'legendary': 1 << 8,
+    'basic': 1 << 9,
+}
+
+# Role flags (same heuristics as commander_deck_validator.check_best_practices)
+ROLE_RAMP = 1 << 0
+ROLE_DRAW = 1 << 1
+ROLE_REMOVAL = 1 << 2
+
+RARITY_CODES = {'common': 0, 'uncommon': 1, 'rare': 2, 'mythic': 3, 'special': 4, 'bonus': 5}
+
+# Layouts that are not real cards for library-wide statistics
+NON_CARD_LAYOUTS = {
+    'token', 'double_faced_token', 'art_series', 'emblem',
+    'vanguard', 'scheme', 'planar', 'reversible_card'
+}
+
+BASIC_LANDS = {
+    'Plains', 'Island', 'Swamp', 'Mountain', 'Forest',
+    'Wastes', 'Snow-Covered Plains', 'Snow-Covered Island',
+    'Snow-Covered Swamp', 'Snow-Covered Mountain', 'Snow-Covered Forest'
+}
+
+MAX_CURVE_CMC = 7  # Curve buckets 0..6 plus "7+"
+
+# Mana curve groups: mono colors, multicolor, colorless
+CURVE_GROUPS = ['W', 'U', 'B', 'R', 'G', 'Multicolor', 'Colorless']
+
+NUMERIC_COLUMNS = ['cmc', 'colors', 'identity', 'types', 'rarity', 'power',
+                   'toughness', 'price', 'edhrec_rank', 'roles', 'is_card', 'set_index']
+
+CACHE_VERSION = 1
+
+
+def color_mask(colors) -> int:
+    """Convert a list of color letters to a bitmask"""
+    mask = 0
+    for color in colors or []:
+        mask |= COLOR_BITS.get(color, 0)
+    return mask
+
+
+def mask_to_colors(mask: int) -> str:
+    """Convert a bitmask back to WUBRG letters"""
+    return ''.join(color for color, bit in COLOR_BITS.items() if mask & bit)
+
+
+def parse_stat(value) -> float:
+    """Parse power/toughness; non-numeric values like '*' become NaN"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def card_type_flags(type_line: str) -> int:
+    """Type flags from a type line (all faces)"""
+    type_line = type_line.lower()
+    flags = 0
+    for type_name, bit in TYPE_FLAGS.items():
+        if type_name in type_line:
+            flags |= bit
+    return flags
+
+
+def card_role_flags(card: Dict[str, Any]) -> int:
+    """Role flags using the validator's best-practice heuristics"""
+    from commander_deck_validator import is_card_draw, is_ramp_spell, is_removal
+
+    lookup = {card.get('name', ''): card}
+    name = card.get('name', '')
+    flags = 0
+    if is_ramp_spell(lookup, name):
+        flags |= ROLE_RAMP
+    if is_card_draw(lookup, name):
+        flags |= ROLE_DRAW
+    if is_removal(lookup, name):
+        flags |= ROLE_REMOVAL
+    return flags
+
+
+class CardMatrix:
+    """Parallel NumPy arrays with one row per printing"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], names: List[str],
+                 oracle_ids: List[str], set_codes: List[str]):
+        self.cmc = columns['cmc']
+        self.colors = columns['colors']
+        self.identity = columns['identity']
+        self.types = columns['types']
+        self.rarity = columns['rarity']
+        self.power = columns['power']
+        self.toughness = columns['toughness']
+        self.price = columns['price']
+        self.edhrec_rank = columns['edhrec_rank']
+        self.roles = columns['roles']
+        self.is_card = columns['is_card']
+        self.set_index = columns['set_index']
+
+        self.names = names
+        self.oracle_ids = oracle_ids
+        self.set_codes = set_codes
+
+        self._name_rows = None
+        self._unique_mask = None
+
+    def __len__(self):
+        return len(self.cmc)
+
+    @classmethod
+    def from_cards(cls, cards) -> 'CardMatrix':
+        """Build the matrix from an iterable of Scryfall card dicts"""
+        names, oracle_ids, set_codes = [], [], []
+        set_lookup = {}
+        rows = {column: [] for column in NUMERIC_COLUMNS}
+
+        for card in cards:
+            faces = card.get('card_faces') or []
+            colors = card.get('colors')
+            if colors is None:
+                colors = [c for face in faces for c in face.get('colors', [])]
+
+            price = (card.get('prices') or {}).get('usd')
+            set_code = card.get('set', '')
+            if set_code not in set_lookup:
+                set_lookup[set_code] = len(set_codes)
+                set_codes.append(set_code)
+
+            names.append(card.get('name', ''))
+            oracle_ids.append(card.get('oracle_id') or (faces[0].get('oracle_id', '') if faces else ''))
+
+            rows['cmc'].append(card.get('cmc') or 0.0)
+            rows['colors'].append(color_mask(colors))
+            rows['identity'].append(color_mask(card.get('color_identity')))
+            rows['types'].append(card_type_flags(card.get('type_line', '')))
+            rows['rarity'].append(RARITY_CODES.get(card.get('rarity'), -1))
+            rows['power'].append(parse_stat(card.get('power', faces[0].get('power') if faces else None)))
+            rows['toughness'].append(parse_stat(card.get('toughness', faces[0].get('toughness') if faces else None)))
+            rows['price'].append(float(price) if price else math.nan)
+            rows['edhrec_rank'].append(card.get('edhrec_rank') or -1)
+            rows['roles'].append(card_role_flags(card))
+            rows['is_card'].append(card.get('layout') not in NON_CARD_LAYOUTS)
+            rows['set_index'].append(set_lookup[set_code])
+
+        columns = {
+            'cmc': np.array(rows['cmc'], dtype=np.float32),
+            'colors': np.array(rows['colors'], dtype=np.uint8),
+            'identity': np.array(rows['identity'], dtype=np.uint8),
+            'types': np.array(rows['types'], dtype=np.uint16),
+            'rarity': np.array(rows['rarity'], dtype=np.int8),
+            'power': np.array(rows['power'], dtype=np.float32),
+            'toughness': np.array(rows['toughness'], dtype=np.float32),
+            'price': np.array(rows['price'], dtype=np.float32),
+            'edhrec_rank': np.array(rows['edhrec_rank'], dtype=np.int32),
+            'roles': np.array(rows['roles'], dtype=np.uint8),
+            'is_card': np.array(rows['is_card'], dtype=bool),
+            'set_index': np.array(rows['set_index'], dtype=np.int32),
+        }
+        return cls(columns, names, oracle_ids, set_codes)
+
+    def save(self, path) -> None:
+        """Save numeric columns as .npz and string columns as a JSON sidecar"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(path.with_suffix('.npz'))
+        np.savez(tmp_path, **{column: getattr(self, column) for column in NUMERIC_COLUMNS})
+        os.replace(tmp_path, path.with_suffix('.npz'))
+        write_json_atomic(path.with_suffix('.json'), {'names': self.names, 'oracle_ids': self.oracle_ids,
+                                                      'set_codes': self.set_codes})
+
+    @classmethod
+    def load(cls, path) -> 'CardMatrix':
+        """Load a matrix written by save()"""
+        with np.load(path.with_suffix('.npz')) as data:
+            columns = {column: data[column] for column in NUMERIC_COLUMNS}
+        with open(path.with_suffix('.json'), 'r', encoding='utf-8') as f:
+            strings = json.load(f)
+        return cls(columns, strings['names'], strings['oracle_ids'], strings['set_codes'])
+
+    def has_type(self, type_name: str) -> np.ndarray:
+        """Boolean mask of rows with the given type flag"""
+        return (self.types & TYPE_FLAGS[type_name]) != 0
+
+    def has_role(self, role_flag: int) -> np.ndarray:
+        """Boolean mask of rows with the given role flag"""
+        return (self.roles & role_flag) != 0
+
+    def set_mask(self, set_code: str) -> np.ndarray:
+        """Boolean mask of rows from one set"""
+        set_code = set_code.lower()
+        if set_code not in self.set_codes:
+            return np.zeros(len(self), dtype=bool)
+        return self.set_index == self.set_codes.index(set_code)
+
+    def unique_mask(self) -> np.ndarray:
+        """Boolean mask selecting one printing per oracle card (real cards only)"""
+        if self._unique_mask is None:
+            _, first_rows = np.unique(np.array(self.oracle_ids, dtype=object), return_index=True)
+            mask = np.zeros(len(self), dtype=bool)
+            mask[first_rows] = True
+            self._unique_mask = mask & self.is_card
+        return self._unique_mask
+
+    def name_rows(self) -> Dict[str, int]:
+        """Name -> row index (later printings win, like the validator's name-keyed DB)"""
+        if self._name_rows is None:
+            self._name_rows = {name: row for row, name in enumerate(self.names) if name}
+        return self._name_rows
+
+    def rows_for(self, names) -> np.ndarray:
+        """Row index for each name, -1 for names not in the library"""
+        name_rows = self.name_rows()
+        return np.array([name_rows.get(name, -1) for name in names], dtype=np.int64)
+
+
+def load_card_matrix(library: Optional[LibraryWatcher] = None) -> CardMatrix:
+    """Load the card matrix from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library.library_path) if library else library_fingerprint()
+    cache_path = CACHE_DIR / f"card_matrix_v{CACHE_VERSION}_{fingerprint}"
+
+    if cache_path.with_suffix('.npz').exists() and cache_path.with_suffix('.json').exists():
+        try:
+            return CardMatrix.load(cache_path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if library is None:
+        library = LibraryWatcher()
+    library.poll()
+    matrix = CardMatrix.from_cards(library.cards())
+
+    matrix.save(cache_path)
+    for suffix in ('.npz', '.json'):
+        prune_cache(f"card_matrix_v*_*{suffix}")
+    return matrix
+
+
+def mana_curve_by_color(matrix: CardMatrix, mask: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Non-land mana curve per color group.
+
+    Returns:
+        dict: group -> counts for cmc 0..6 and 7+
+    """
+    if mask is None:
+        mask = matrix.unique_mask()
+    mask = mask & ~matrix.has_type('land')
+
+    # Color group index for every 5-bit mask: mono colors 0-4, multicolor 5, colorless 6
+    group_of_mask = np.full(32, CURVE_GROUPS.index('Multicolor'), dtype=np.int64)
+    group_of_mask[0] = CURVE_GROUPS.index('Colorless')
+    for index, bit in enumerate(COLOR_BITS.values()):
+        group_of_mask[bit] = index
+
+    groups = group_of_mask[matrix.colors[mask]]
+    buckets = np.minimum(matrix.cmc[mask].astype(np.int64), MAX_CURVE_CMC)
+    counts = np.bincount(groups * (MAX_CURVE_CMC + 1) + buckets,
+                         minlength=len(CURVE_GROUPS) * (MAX_CURVE_CMC + 1))
+    counts = counts.reshape(len(CURVE_GROUPS), MAX_CURVE_CMC + 1)
+    return {group: counts[index] for index, group in enumerate(CURVE_GROUPS)}
+
+
+def average_cmc_by_set(matrix: CardMatrix, mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """Average cmc of non-land cards per set code"""
+    if mask is None:
+        mask = matrix.is_card
+    mask = mask & ~matrix.has_type('land')
+
+    set_index = matrix.set_index[mask]
+    counts = np.bincount(set_index, minlength=len(matrix.set_codes))
+    totals = np.bincount(set_index, weights=matrix.cmc[mask], minlength=len(matrix.set_codes))
+
+    present = np.nonzero(counts)[0]
+    return {matrix.set_codes[i]: float(totals[i] / counts[i]) for i in present}
+
+
+def type_distribution(matrix: CardMatrix, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+    """Number of cards having each type flag"""
+    if mask is None:
+        mask = matrix.unique_mask()
+    types = matrix.types[mask]
+    return {type_name: int(np.count_nonzero(types & bit)) for type_name, bit in TYPE_FLAGS.items()}
+
+
+def deck_composition(matrix: CardMatrix, main_deck: Dict[str, int]) -> Dict[str, int]:
+    """
+    Vectorised equivalent of check_best_practices' composition counters.
+
+    Lands, creatures and ramp are exclusive (in that order); card draw and
+    removal are counted independently. Basic lands missing from the library
+    still count as lands.
+    """
+    names = list(main_deck.keys())
+    quantities = np.array(list(main_deck.values()), dtype=np.int64)
+    rows = matrix.rows_for(names)
+    found = rows >= 0
+    safe_rows = np.where(found, rows, 0)
+
+    types = np.where(found, matrix.types[safe_rows], 0)
+    roles = np.where(found, matrix.roles[safe_rows], 0)
+    missing_basic = ~found & np.array([name in BASIC_LANDS for name in names], dtype=bool)
+
+    lands = ((types & TYPE_FLAGS['land']) != 0) | missing_basic
+    creatures = ~lands & ((types & TYPE_FLAGS['creature']) != 0)
+    ramp = ~lands & ~creatures & ((roles & ROLE_RAMP) != 0)
+
+    return {
+        'lands': int(quantities[lands].sum()),
+        'creatures': int(quantities[creatures].sum()),
+        'ramp': int(quantities[ramp].sum()),
+        'card_draw': int(quantities[(roles & ROLE_DRAW) != 0].sum()),
+        'removal': int(quantities[(roles & ROLE_REMOVAL) != 0].sum()),
+    }
+
+
+def _time(func, repeat=3):
+    """Best wall time of repeat calls, in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(deck_file: Optional[str] = None) -> None:
+    """Compare vectorised analytics with the equivalent dict loops"""
+    from commander_deck_validator import check_best_practices, parse_deck_file
+
+    library = LibraryWatcher()
+    library.poll()
+    cards = list(library.cards())
+    card_data = library.by_name()
+    matrix = load_card_matrix(library)
+    all_rows = np.ones(len(matrix), dtype=bool)
+
+    def loop_curve():
+        curve = {}
+        for card in cards:
+            if 'land' in card.get('type_line', '').lower():
+                continue
+            colors = card.get('colors', [])
+            group = colors[0] if len(colors) == 1 else ('Multicolor' if colors else 'Colorless')
+            bucket = min(int(card.get('cmc') or 0), MAX_CURVE_CMC)
+            curve.setdefault(group, [0] * (MAX_CURVE_CMC + 1))[bucket] += 1
+        return curve
+
+    def loop_cmc_by_set():
+        totals, counts = {}, {}
+        for card in cards:
+            if 'land' in card.get('type_line', '').lower():
+                continue
+            set_code = card.get('set', '')
+            totals[set_code] = totals.get(set_code, 0.0) + (card.get('cmc') or 0.0)
+            counts[set_code] = counts.get(set_code, 0) + 1
+        return {set_code: totals[set_code] / counts[set_code] for set_code in counts}
+
+    def loop_types():
+        counts = dict.fromkeys(TYPE_FLAGS, 0)
+        for card in cards:
+            type_line = card.get('type_line', '').lower()
+            for type_name in TYPE_FLAGS:
+                if type_name in type_line:
+                    counts[type_name] += 1
+        return counts
+
+    benchmarks = [
+        ("Mana curve by color", loop_curve, lambda: mana_curve_by_color(matrix, all_rows)),
+        ("Average cmc per set", loop_cmc_by_set, lambda: average_cmc_by_set(matrix, all_rows)),
+        ("Type distribution", loop_types, lambda: type_distribution(matrix, all_rows)),
+    ]
+
+    if deck_file:
+        _, main_deck, _ = parse_deck_file(deck_file)
+        benchmarks.append(("Deck composition", lambda: check_best_practices(main_deck, card_data),
+                           lambda: deck_composition(matrix, main_deck)))
+
+    print(f"Benchmarking over {len(matrix)} printings (best of 3)")
+    print(f"{'Operation':<24} {'dict loop':>12} {'vectorised':>12} {'speed-up':>10}")
+    print("-" * 62)
+    for label, loop_func, vector_func in benchmarks:
+        loop_time = _time(loop_func)
+        vector_time = _time(vector_func)
+        print(f"{label:<24} {loop_time * 1000:>10.2f}ms {vector_time * 1000:>10.2f}ms "
+              f"{loop_time / max(vector_time, 1e-9):>9.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Vectorised analytics over the card library')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    curve_parser = subparsers.add_parser('curve', help='Mana curve by color')
+    curve_parser.add_argument('--set', dest='set_code', help='Restrict to one set code')
+    curve_parser.add_argument('--printings', action='store_true', help='Count every printing, not unique cards')
+
+    cmc_parser = subparsers.add_parser('cmc-by-set', help='Average cmc of non-land cards per set')
+    cmc_parser.add_argument('--top', type=int, default=20, help='Number of sets to show (default: 20)')
+
+    types_parser = subparsers.add_parser('types', help='Card type distribution')
+    types_parser.add_argument('--set', dest='set_code', help='Restrict to one set code')
+    types_parser.add_argument('--printings', action='store_true', help='Count every printing, not unique cards')
+
+    deck_parser = subparsers.add_parser('deck', help='Composition of a Commander decklist')
+    deck_parser.add_argument('deck_file', help='Deck file path')
+
+    bench_parser = subparsers.add_parser('bench', help='Benchmark against dict-loop equivalents')
+    bench_parser.add_argument('--deck', dest='deck_file', help='Also benchmark composition of this deck')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        run_benchmarks(args.deck_file)
+        return
+
+    matrix = load_card_matrix()
+
+    if args.command in ('curve', 'types'):
+        mask = matrix.is_card if args.printings else matrix.unique_mask()
+        if args.set_code:
+            mask = mask & matrix.set_mask(args.set_code)
+
+    if args.command == 'curve':
+        curve = mana_curve_by_color(matrix, mask)
+        header = ' '.join(f"{cmc:>6}" for cmc in range(MAX_CURVE_CMC)) + f" {str(MAX_CURVE_CMC) + '+':>6}"
+        print(f"MANA CURVE BY COLOR (non-land{', set ' + args.set_code.upper() if args.set_code else ''}):")
+        print(f"  {'Color':<11} {header} {'Total':>7}")
+        for group, counts in curve.items():
+            label = COLOR_NAMES.get(group, group)
+            print(f"  {label:<11} " + ' '.join(f"{int(n):>6}" for n in counts) + f" {int(counts.sum()):>7}")
+
+    elif args.command == 'cmc-by-set':
+        averages = average_cmc_by_set(matrix)
+        print(f"AVERAGE CMC BY SET (non-land, top {args.top} of {len(averages)}):")
+        for set_code, average in sorted(averages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {set_code.upper():<8} {average:.2f}")
+
+    elif args.command == 'types':
+        print("TYPE DISTRIBUTION:")
+        for type_name, count in type_distribution(matrix, mask).items():
+            print(f"  {type_name.capitalize():<14} {count}")
+
+    elif args.command == 'deck':
+        from commander_deck_validator import parse_deck_file
+
+        commander, main_deck, errors = parse_deck_file(args.deck_file)
+        for error in errors:
+            print(f"  ERROR: {error}")
+        composition = deck_composition(matrix, main_deck)
+        print(f"DECK COMPOSITION: {args.deck_file}")
+        if commander:
+            print(f"  Commander: {commander}")
+        print(f"  Lands: {composition['lands']}")
+        print(f"  Creatures: {composition['creatures']}")
+        print(f"  Ramp: {composition['ramp']}")
+        print(f"  Card draw: {composition['card_draw']}")
+        print(f"  Removal: {composition['removal']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+MTG Compact Card Records
+
+A Scryfall card is a ~70-key dict, and across the library values such as
+set names, type lines, artists and legality tables repeat thousands of times
+as separate objects. Card keeps only the fields the scripts read, in
+__slots__:
+
+- low-cardinality strings (rarity, layout, border, language, set type) are
+  stored as small ints into per-field value tables
+- repeated strings are interned, and lists (colors, keywords, games...) and
+  legality tables are shared between every card with the same value (the
+  sharing table is bounded, so a long-lived process does not grow it forever)
+- prices are one tuple; card faces keep only their gameplay fields
+
+Card supports the read side of the dict interface (get, [], in, keys), so
+code written against Scryfall dicts works unchanged; dict(card) converts
+one back (e.g. for JSON). Fields not listed in FIELDS are dropped.
+
+Usage:
+    python scripts/card_record.py --benchmark [--files N]
+
+Example:
+    from card_record import Card
+    card = Card.from_dict(scryfall_card)
+    card.get('type_line'), card['prices']['usd']
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Fields stored as an index into a shared value table
+ENUM_FIELDS = ('lang', 'layout', 'rarity', 'border_color', 'set_type')
+
+# Fields stored as interned strings
+STRING_FIELDS = (
+    'id', 'oracle_id', 'name', 'mana_cost', 'type_line', 'oracle_text', 'power', 'toughness',
+    'loyalty', 'set', 'set_name', 'collector_number', 'artist', 'released_at'
+)
+
+# Fields stored as shared tuples
+LIST_FIELDS = ('colors', 'color_identity', 'keywords', 'produced_mana', 'games', 'multiverse_ids')
+
+# Fields stored as-is (numbers and flags)
+SCALAR_FIELDS = (
+    'cmc', 'edhrec_rank', 'digital', 'oversized', 'mtgo_id', 'arena_id', 'tcgplayer_id', 'cardmarket_id'
+)
+
+PRICE_FIELDS = ('usd', 'usd_foil', 'usd_etched', 'eur', 'eur_foil', 'tix')
+FACE_FIELDS = ('name', 'mana_cost', 'type_line', 'oracle_text', 'colors', 'power', 'toughness', 'loyalty')
+
+FIELDS = ENUM_FIELDS + STRING_FIELDS + LIST_FIELDS + SCALAR_FIELDS + ('legalities', 'prices', 'card_faces')
+
+# How each field is read back: stored as-is, enum code, or price tuple
+PLAIN, ENUM, PRICES = 0, 1, 2
+FIELD_KINDS = {field: ENUM if field in ENUM_FIELDS else PRICES if field == 'prices' else PLAIN
+               for field in FIELDS}
+
+_enum_values: Dict[str, List[str]] = {field: [] for field in ENUM_FIELDS}
+_enum_codes: Dict[str, Dict[str, int]] = {field: {} for field in ENUM_FIELDS}
+_shared: Dict[Any, Any] = {}
+MAX_SHARED = 65536  # Distinct shared values kept; the table starts over when full (cards keep theirs)
+
+
+def enum_code(field: str, value: Optional[str]) -> Optional[int]:
+    """Small-int code of an enum value (new values are added to the table)"""
+    if value is None:
+        return None
+    codes = _enum_codes[field]
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(_enum_values[field])
+        _enum_values[field].append(value)
+    return code
+
+
+def remember(key, value):
+    """Add a value to the shared table, starting the table over once it holds MAX_SHARED values"""
+    if len(_shared) >= MAX_SHARED:
+        _shared.clear()
+    _shared[key] = value
+    return value
+
+
+def shared(value):
+    """One shared instance per distinct (hashable) value"""
+    existing = _shared.get(value)
+    return existing if existing is not None else remember(value, value)
+
+
+def intern_string(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def shared_list(values) -> Optional[tuple]:
+    if values is None:
+        return None
+    return shared(tuple(intern_string(value) for value in values))
+
+
+def shared_legalities(legalities) -> Optional[Dict[str, str]]:
+    """Legality tables are read-only and heavily repeated, so equal tables share one dict"""
+    if not legalities:
+        return None
+    key = ('legalities',) + tuple(sorted(legalities.items()))
+    table = _shared.get(key)
+    if table is None:
+        table = remember(key, {intern_string(fmt): intern_string(status) for fmt, status in legalities.items()})
+    return table
+
+
+def compact_face(face: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {}
+    for field in FACE_FIELDS:
+        value = face.get(field)
+        if value is not None:
+            compact[field] = shared_list(value) if field == 'colors' else intern_string(value)
+    return compact
+
+
+class Card:
+    """Compact, read-only record of one printing"""
+
+    __slots__ = ENUM_FIELDS + STRING_FIELDS + LIST_FIELDS + SCALAR_FIELDS + ('legalities', '_prices', 'card_faces')
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Card':
+        """Compact a Scryfall card dict (a Card is returned as-is)"""
+        if isinstance(data, Card):
+            return data
+
+        card = cls.__new__(cls)
+        for field in ENUM_FIELDS:
+            setattr(card, field, enum_code(field, data.get(field)))
+        for field in STRING_FIELDS:
+            setattr(card, field, intern_string(data.get(field)))
+        for field in LIST_FIELDS:
+            setattr(card, field, shared_list(data.get(field)))
+        for field in SCALAR_FIELDS:
+            setattr(card, field, data.get(field))
+        card.legalities = shared_legalities(data.get('legalities'))
+
+        prices = data.get('prices') or {}
+        card._prices = shared(tuple(prices.get(field) for field in PRICE_FIELDS)) if prices else None
+
+        faces = data.get('card_faces')
+        card.card_faces = tuple(compact_face(face) for face in faces) if faces else None
+        return card
+
+    def _value(self, key: str):
+        kind = FIELD_KINDS.get(key)
+        if kind == PLAIN:
+            return getattr(self, key)
+        if kind == ENUM:
+            code = getattr(self, key)
+            return None if code is None else _enum_values[key][code]
+        if kind == PRICES and self._prices is not None:
+            return dict(zip(PRICE_FIELDS, self._prices))
+        return None
+
+    def get(self, key: str, default=None):
+        value = self._value(key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self._value(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._value(key) is not None
+
+    def keys(self) -> List[str]:
+        return [field for field in FIELDS if self._value(field) is not None]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"Card({self.name!r}, {self.set!r}, {self.collector_number!r})"
+
+
+def load_dicts(paths) -> List[Dict[str, Any]]:
+    from library_watcher import read_card_file
+    cards = []
+    for path in paths:
+        cards.extend(read_card_file(path))
+    return cards
+
+
+def load_compact(paths) -> List[Card]:
+    from library_watcher import read_card_file
+    cards = []
+    for path in paths:
+        cards.extend(Card.from_dict(card) for card in read_card_file(path))
+    return cards
+
+
+def measure(loader, paths) -> Tuple[int, float, int]:
+    """(cards, seconds, bytes retained) of loading the given files with loader"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cards = loader(paths)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = len(cards)
+    del cards
+    return count, elapsed, retained
+
+
+def main(argv=None):
+    from library_watcher import CARD_LIBRARY_PATH, scan_library
+
+    parser = argparse.ArgumentParser(description='Compare memory of dict and compact card records')
+    parser.add_argument('--benchmark', action='store_true', help='Load the library both ways and report memory')
+    parser.add_argument('--files', type=int, help='Only load the first N card files')
+    args = parser.parse_args(argv)
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    paths = [CARD_LIBRARY_PATH / rel_path for rel_path in sorted(scan_library())][:args.files]
+    print(f"Loading {len(paths)} card files (traced with tracemalloc, so slower than normal)...")
+
+    count, dict_time, dict_bytes = measure(load_dicts, paths)
+    _, card_time, card_bytes = measure(load_compact, paths)
+
+    print(f"  dict records:    {dict_bytes / 1024 / 1024:8.1f} MiB  ({dict_bytes / max(count, 1):6.0f} B/card, {dict_time:.1f}s)")
+    print(f"  Card records:    {card_bytes / 1024 / 1024:8.1f} MiB  ({card_bytes / max(count, 1):6.0f} B/card, {card_time:.1f}s)")
+    print(f"  {count} printings; Card uses {card_bytes / max(dict_bytes, 1):.1%} of the dict representation")
+
+
+if __name__ == "__main__":
+    main()
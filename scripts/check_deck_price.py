@@ -6,7 +6,7 @@ This script reads a decklist file and checks the total price against the $30 bud
 Uses Scryfall API to fetch TCGplayer Market prices for the cheapest English printing.
 
 Usage:
-    python scripts/check_deck_price.py <deck_file_path>
+    python scripts/check_deck_price.py <deck_file_path> [budget_limit] [--local]
 
 Example:
     python scripts/check_deck_price.py decks/my-deck.txt
@@ -16,24 +16,57 @@ $30 Value Vintage Pricing Rules:
 - Uses cheapest English-language, tournament-legal printing
 - Basic lands (Plains, Island, Swamp, Mountain, Forest) = $0.00
 - Snow-covered basics and Wastes are priced normally
-- Prices from TCGplayer Market via Scryfall API
+- Prices from TCGplayer Market via Scryfall API, or with --local from the
+  printings in the card library (read through the card offset index)
+- Banned cards and more than one copy of a restricted card are illegal
+  (formats/banned-restricted.md)
 """
 
 import sys
-import requests
-import time
 import re
 from pathlib import Path
 
-# Scryfall API endpoints
-SCRYFALL_SEARCH_API = "https://api.scryfall.com/cards/search"
-SCRYFALL_NAMED_API = "https://api.scryfall.com/cards/named"
+from banned_list import load_ban_table
+from card_index import parse_printing_reference
+from scryfall_client import get_client
+
+# Scryfall API endpoints (requests go through the shared, rate-limited client)
+SCRYFALL_SEARCH_API = "/cards/search"
+SCRYFALL_NAMED_API = "/cards/named"
 
 # Basic lands that are free in Value Vintage
 FREE_BASICS = {
     "plains", "island", "swamp", "mountain", "forest"
 }
 
+# Printings that are not tournament legal
+ILLEGAL_BORDERS = {'gold', 'silver'}
+ILLEGAL_SET_TYPES = {'memorabilia', 'token', 'funny'}
+
+# Local price history, opened on first use (see price_history.py)
+_price_history = None
+
+def record_price_history(printings):
+    """Append fetched printings to the local price history; skipped if numpy is unavailable"""
+    global _price_history
+
+    try:
+        if _price_history is None:
+            from price_history import PriceHistory
+            _price_history = PriceHistory()
+        _price_history.record(printings)
+    except (ImportError, OSError):
+        pass
+
+def is_legal_printing(card):
+    """Whether a printing counts for Value Vintage pricing"""
+    return (card.get('lang') == 'en'
+            and not card.get('digital')
+            and 'paper' in card.get('games', ['paper'])
+            and not card.get('oversized')
+            and card.get('border_color') not in ILLEGAL_BORDERS
+            and card.get('set_type') not in ILLEGAL_SET_TYPES)
+
 def parse_decklist(file_path):
     """
     Parse a decklist file and extract card names with quantities.
@@ -71,7 +104,7 @@ def parse_decklist(file_path):
                 match = re.match(r'^(\d+)x?\s+(.+)$', line)
                 if match:
                     quantity = int(match.group(1))
-                    card_name = match.group(2).strip()
+                    card_name = parse_printing_reference(match.group(2))[0]
 
                     # Clean up any extra info in parentheses or after //
                     card_name = re.sub(r'\s*\(.*?\)', '', card_name)
@@ -104,6 +137,9 @@ def get_card_price(card_name):
     if card_name.lower() in FREE_BASICS:
         return 0.0
 
+    # Imported here so offline code paths don't pay for loading requests
+    import requests
+
     try:
         # Query Scryfall for all printings of the card
         # Filter to English, paper printings only
@@ -114,10 +150,7 @@ def get_card_price(card_name):
             'dir': 'asc'
         }
 
-        response = requests.get(SCRYFALL_SEARCH_API, params=params, timeout=10)
-
-        # Rate limiting: Scryfall requests ~100ms between calls
-        time.sleep(0.1)
+        response = get_client().get(SCRYFALL_SEARCH_API, params=params, timeout=10)
 
         if response.status_code == 404:
             print(f"  [!] Card not found: {card_name}")
@@ -133,6 +166,8 @@ def get_card_price(card_name):
             print(f"  [!] No printings found for: {card_name}")
             return None
 
+        record_price_history(data['data'])
+
         # Search through all printings to find the cheapest with a valid price
         cheapest_price = None
 
@@ -163,13 +198,43 @@ def get_card_price(card_name):
         return None
 
 
-def check_deck_price(file_path, budget_limit=30.0):
+def get_local_card_price(card_name, card_data):
+    """
+    Cheapest legal English printing price from the local card library.
+    Only the printings of this card are read (via the card offset index).
+
+    Args:
+        card_name: Name of the card
+        card_data: CardIndex of the card library
+
+    Returns:
+        float: Price in USD, or None if not found
+    """
+    if card_name.lower() in FREE_BASICS:
+        return 0.0
+
+    library_name = card_data.find(card_name)
+    if library_name is None:
+        print(f"  [!] Card not in local library: {card_name}")
+        return None
+
+    prices = [float(card['prices']['usd']) for card in card_data.printings(library_name)
+              if is_legal_printing(card) and (card.get('prices') or {}).get('usd')]
+    if not prices:
+        print(f"  [!] No local price available for: {card_name}")
+        return None
+
+    return min(prices)
+
+
+def check_deck_price(file_path, budget_limit=30.0, local=False):
     """
     Check if a deck is legal for $30 Value Vintage budget.
 
     Args:
         file_path: Path to decklist file
         budget_limit: Budget limit in USD (default: 30.0)
+        local: Price from the local card library instead of Scryfall
     """
     print(f"\n{'='*60}")
     print(f"$30 Value Vintage Deck Price Checker")
@@ -185,6 +250,16 @@ def check_deck_price(file_path, budget_limit=30.0):
         print("Error: No cards found in decklist.")
         sys.exit(1)
 
+    # Banned/restricted list (main deck and sideboard combined)
+    ban_violations = load_ban_table().check_deck(main_deck + sideboard, 'valuevintage')
+
+    if local:
+        from card_index import load_card_index
+        card_data = load_card_index()
+        price_card = lambda card_name: get_local_card_price(card_name, card_data)
+    else:
+        price_card = get_card_price
+
     # Calculate prices
     main_deck_total = 0.0
     sideboard_total = 0.0
@@ -196,7 +271,7 @@ def check_deck_price(file_path, budget_limit=30.0):
     print("-" * 60)
 
     for quantity, card_name in main_deck:
-        price = get_card_price(card_name)
+        price = price_card(card_name)
 
         if price is None:
             errors.append(card_name)
@@ -219,7 +294,7 @@ def check_deck_price(file_path, budget_limit=30.0):
         print("-" * 60)
 
         for quantity, card_name in sideboard:
-            price = get_card_price(card_name)
+            price = price_card(card_name)
 
             if price is None:
                 errors.append(card_name)
@@ -245,6 +320,10 @@ def check_deck_price(file_path, budget_limit=30.0):
     print(f"Budget Limit: ${budget_limit:.2f}")
     print(f"Remaining Budget: ${remaining_budget:.2f}")
     print("-" * 60)
+    if local:
+        print("Prices: local card library (run fetch_set_cards.py --refresh-library to update)")
+    else:
+        print(f"Network: {get_client().summary()}")
 
     if errors:
         print(f"\n[WARNING] {len(errors)} card(s) could not be priced:")
@@ -252,36 +331,51 @@ def check_deck_price(file_path, budget_limit=30.0):
             print(f"  - {card}")
         print("\nPlease verify these cards manually on TCGplayer.")
 
-    if total_price <= budget_limit:
+    if ban_violations:
+        print(f"\n[ILLEGAL] {len(ban_violations)} banned/restricted list violation(s):")
+        for violation in ban_violations:
+            print(f"  - {violation}")
+
+    if total_price <= budget_limit and ban_violations:
+        print(f"\n[ILLEGAL] This deck is within the ${budget_limit:.2f} budget, but breaks the banned/restricted list!")
+    elif total_price <= budget_limit:
         print(f"\n[LEGAL] This deck is within the ${budget_limit:.2f} budget!")
     else:
         over_budget = total_price - budget_limit
         print(f"\n[ILLEGAL] This deck is ${over_budget:.2f} OVER budget!")
+        print(f"Run: python scripts/budget_optimizer.py {file_path} {budget_limit:g}")
+        print("to find cheaper printings and substitutes from local data.")
 
     print(f"{'='*60}\n")
 
-    return total_price <= budget_limit
+    return total_price <= budget_limit and not ban_violations
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
 
+    local = '--local' in argv
+    argv = [arg for arg in argv if arg != '--local']
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/check_deck_price.py <deck_file_path>")
+    if len(argv) < 1:
+        print("Usage: python scripts/check_deck_price.py <deck_file_path> [budget_limit] [--local]")
         print("\nExample:")
         print("  python scripts/check_deck_price.py decks/my-deck.txt")
+        print("  python scripts/check_deck_price.py decks/my-deck.txt 30 --local")
         sys.exit(1)
 
-    deck_file = sys.argv[1]
+    deck_file = argv[0]
 
     # Optional: custom budget limit
     budget_limit = 30.0
-    if len(sys.argv) >= 3:
+    if len(argv) >= 2:
         try:
-            budget_limit = float(sys.argv[2])
+            budget_limit = float(argv[1])
         except ValueError:
-            print(f"Error: Invalid budget limit: {sys.argv[2]}")
+            print(f"Error: Invalid budget limit: {argv[1]}")
             sys.exit(1)
 
-    check_deck_price(deck_file, budget_limit)
+    check_deck_price(deck_file, budget_limit, local=local)
 
 
 if __name__ == "__main__":
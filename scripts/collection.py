@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+MTG Collection Coverage
+
+Compares a card collection against many decklists at once: which cards each
+deck is missing, what share of it is already owned and what the missing
+cards cost (cheapest legal printing, local prices from budget_optimizer's
+printing index; no network).
+
+Decks and collection are compiled into multisets over oracle ids (so any
+printing of a card counts as owning it). Decks become rows of one count
+matrix and the collection one count vector, and the coverage of every deck
+is computed in a single vectorised pass. Basic lands are assumed owned.
+
+Collection file formats:
+- text: one card per line like a decklist ("4 Lightning Bolt",
+  "1 Sol Ring (C21) 263"); lines starting with # are comments
+- CSV (.csv) with a header: a count column (Count/Quantity/Qty), a Name
+  column and optionally Set/Edition and Collector Number (the exports of
+  Moxfield, Deckbox, ManaBox and similar tools)
+
+Usage:
+    python scripts/collection.py <collection file> <deck file or directory>... [--missing] [--sort owned|cost|name]
+
+Example:
+    python scripts/collection.py collection.csv decks/
+    python scripts/collection.py collection.txt decks/my-deck.txt --missing
+"""
+
+import argparse
+import csv
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from card_index import CardIndex, load_card_index, parse_printing_reference
+from check_deck_price import FREE_BASICS, parse_decklist
+
+COUNT_COLUMNS = ('count', 'quantity', 'qty')
+NAME_COLUMNS = ('name', 'card name', 'card')
+SET_COLUMNS = ('set code', 'set', 'edition')
+NUMBER_COLUMNS = ('collector number', 'card number', 'number')
+
+SORT_KEYS = ('owned', 'cost', 'name')
+
+
+def read_collection(path) -> List[Tuple[int, str]]:
+    """
+    Read a collection file (text or CSV).
+
+    Returns:
+        list of (quantity, card reference); a reference is a card name,
+        optionally followed by "(SET) collector number"
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        return read_collection_csv(path)
+
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            match = re.match(r'^(\d+)x?\s+(.+)$', line, re.IGNORECASE)
+            if match:
+                entries.append((int(match.group(1)), match.group(2).strip()))
+            else:
+                entries.append((1, line))
+    return entries
+
+
+def read_collection_csv(path) -> List[Tuple[int, str]]:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+
+        def column(candidates):
+            return next((columns[name] for name in candidates if name in columns), None)
+
+        count_column, name_column = column(COUNT_COLUMNS), column(NAME_COLUMNS)
+        set_column, number_column = column(SET_COLUMNS), column(NUMBER_COLUMNS)
+        if name_column is None:
+            raise ValueError(f"{path}: no Name column in CSV header")
+
+        entries = []
+        for row in reader:
+            card_name = (row.get(name_column) or '').strip()
+            if not card_name:
+                continue
+            try:
+                quantity = int(row.get(count_column) or 1) if count_column else 1
+            except ValueError:
+                quantity = 1
+            set_code = (row.get(set_column) or '').strip() if set_column else ''
+            number = (row.get(number_column) or '').strip() if number_column else ''
+            # Only set codes (not full edition names) can pin a printing
+            if set_code and re.fullmatch(r'[A-Za-z0-9]{2,6}', set_code):
+                card_name = f"{card_name} ({set_code}) {number}".strip()
+            entries.append((quantity, card_name))
+    return entries
+
+
+def deck_files(paths) -> List[Path]:
+    """Deck files from file and directory arguments (directories contribute their *.txt files)"""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob('*.txt')) if path.is_dir() else [path])
+    return files
+
+
+class CoverageEngine:
+    """Compiles card references into oracle-id multisets and computes deck coverage"""
+
+    def __init__(self, card_data: Optional[CardIndex] = None, printing_index: Optional[Dict[str, List]] = None):
+        if printing_index is None:
+            from budget_optimizer import load_printing_index
+            printing_index = load_printing_index()
+        self.card_data = card_data if card_data is not None else load_card_index()
+        self.printing_index = printing_index
+        self.keys: Dict[str, int] = {}      # oracle key -> column
+        self.labels: List[str] = []         # column -> card name
+        self.prices: List[float] = []       # column -> cheapest price (NaN if unpriced)
+        self._references: Dict[str, Optional[int]] = {}
+
+    def column(self, reference: str) -> Optional[int]:
+        """
+        Column of a card reference (None for basic lands). Cards not in the
+        library get a column of their own keyed by name, so they still count
+        as missing.
+        """
+        if reference in self._references:
+            return self._references[reference]
+
+        card_name, set_code, _ = parse_printing_reference(reference)
+        card_name = card_name.split('//')[0].strip()
+        column = None
+        if card_name.lower() not in FREE_BASICS:
+            # Plain names resolve without decoding a record; printings are looked up exactly
+            card = self.card_data.resolve_reference(reference) if set_code else None
+            library_name = card.get('name') if card is not None else self.card_data.find(card_name)
+            oracle_id = card.get('oracle_id') if card is not None else None
+            if library_name:
+                card_name = library_name
+                oracle_id = oracle_id or self.card_data.oracle_id_of(library_name)
+            key = oracle_id or f"name:{card_name.lower()}"
+
+            column = self.keys.get(key)
+            if column is None:
+                column = self.keys[key] = len(self.labels)
+                self.labels.append(card_name)
+                priced = self.printing_index.get(card_name.lower())
+                self.prices.append(priced[0] if priced else np.nan)
+
+        self._references[reference] = column
+        return column
+
+    def compile(self, entries: List[Tuple[int, str]]) -> Dict[int, int]:
+        """Multiset {column: count} of (quantity, reference) entries"""
+        counts: Dict[int, int] = {}
+        for quantity, reference in entries:
+            column = self.column(reference)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + quantity
+        return counts
+
+    def coverage(self, decks: Dict[str, List[Tuple[int, str]]], collection: List[Tuple[int, str]]) -> List[Dict]:
+        """
+        Coverage of every deck by the collection.
+
+        Returns:
+            list of {'deck', 'cards', 'owned', 'owned_pct', 'missing', 'cost', 'unpriced',
+                     'missing_cards': [(quantity, name, price or None)]} in deck order
+        """
+        deck_counts = [self.compile(entries) for entries in decks.values()]
+        owned_counts = self.compile(collection)
+
+        # One row per deck, one column per distinct card seen
+        width = len(self.labels)
+        required = np.zeros((len(deck_counts), width), dtype=np.int32)
+        for row, counts in enumerate(deck_counts):
+            if counts:
+                required[row, list(counts)] = list(counts.values())
+        owned = np.zeros(width, dtype=np.int32)
+        if owned_counts:
+            owned[list(owned_counts)] = list(owned_counts.values())
+
+        prices = np.array(self.prices, dtype=np.float64)
+        missing = np.maximum(required - owned, 0)
+        cards = required.sum(axis=1)
+        covered = cards - missing.sum(axis=1)
+        cost = missing @ np.nan_to_num(prices)
+        unpriced = (missing > 0) @ np.isnan(prices)
+
+        results = []
+        for row, deck_name in enumerate(decks):
+            missing_columns = np.flatnonzero(missing[row])
+            results.append({
+                'deck': deck_name,
+                'cards': int(cards[row]),
+                'owned': int(covered[row]),
+                'owned_pct': float(covered[row] / cards[row] * 100) if cards[row] else 100.0,
+                'missing': int(cards[row] - covered[row]),
+                'cost': float(cost[row]),
+                'unpriced': int(unpriced[row]),
+                'missing_cards': [(int(missing[row, column]), self.labels[column],
+                                   None if np.isnan(prices[column]) else float(prices[column]))
+                                  for column in missing_columns],
+            })
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check many decklists against a card collection')
+    parser.add_argument('collection_file', help='Collection file (text or .csv)')
+    parser.add_argument('decks', nargs='+', help='Deck files, or directories of *.txt deck files')
+    parser.add_argument('--missing', action='store_true', help='List the missing cards of each deck')
+    parser.add_argument('--sort', choices=SORT_KEYS, default='owned',
+                        help='Order decks by owned share (default), cost to complete or name')
+    args = parser.parse_args(argv)
+
+    collection = read_collection(args.collection_file)
+    decks = {}
+    for path in deck_files(args.decks):
+        main_deck, sideboard = parse_decklist(path)
+        decks[str(path)] = main_deck + sideboard
+
+    start = time.perf_counter()
+    engine = CoverageEngine()
+    results = engine.coverage(decks, collection)
+    elapsed = time.perf_counter() - start
+
+    if args.sort == 'owned':
+        results.sort(key=lambda result: (-result['owned_pct'], result['cost']))
+    elif args.sort == 'cost':
+        results.sort(key=lambda result: (result['cost'], -result['owned_pct']))
+
+    print(f"\n{'='*78}")
+    print("COLLECTION COVERAGE (local prices)")
+    print(f"{'='*78}")
+    print(f"Collection: {args.collection_file} ({sum(quantity for quantity, _ in collection)} cards)")
+    print(f"{'='*78}")
+    print(f"  {'Deck':<40} {'Cards':>5} {'Owned':>7} {'Missing':>7} {'To complete':>12}")
+    print("-" * 78)
+    for result in results:
+        unpriced = f" +{result['unpriced']}?" if result['unpriced'] else ""
+        print(f"  {Path(result['deck']).name[:40]:<40} {result['cards']:>5} {result['owned_pct']:>6.1f}% "
+              f"{result['missing']:>7} {'$' + format(result['cost'], '.2f'):>12}{unpriced}")
+
+        if args.missing and result['missing_cards']:
+            for quantity, card_name, price in sorted(result['missing_cards'], key=lambda card: -(card[2] or 0) * card[0]):
+                price_text = f"${price:.2f} ea" if price is not None else "no local price"
+                print(f"      {quantity}x {card_name:<40} {price_text}")
+
+    print("-" * 78)
+    print(f"{len(results)} deck(s), {len(engine.labels)} distinct cards compared in {elapsed * 1000:.0f}ms")
+    if any(result['unpriced'] for result in results):
+        print("+N? = missing cards without a local price (not included in the cost)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,114 +7,155 @@ Comprehensive validator for Commander/EDH deck legality including:
 - Singleton format (no duplicates except basic lands)
 - Color identity restrictions
 - Commander legality
+- Banned list (formats/banned-restricted.md)
 - Format legality (cards legal in Commander format)
+
+Several deck files can be validated in one run; they share one card database.
+Results are cached by deck file content (and library and banned list state),
+so re-validating an unchanged deck is instant. Each deck file's per-card
+analysis is also kept, so after an edit only the added cards are analysed
+and the composition counters are adjusted by the difference. --no-cache
+bypasses both.
 """
 
 import sys
 import os
 import re
 import json
-import requests
+import argparse
+import hashlib
 import time
-import subprocess
-
-def load_card_data():
-    """Load card data from our card library for format and color identity checking"""
-    card_data = {}
-    card_library_path = "card-library"
-
-    if not os.path.exists(card_library_path):
-        print(f"Warning: Card library not found at {card_library_path}")
-        return card_data
-
-    # Walk through all set directories
-    for set_dir in os.listdir(card_library_path):
-        set_path = os.path.join(card_library_path, set_dir)
-        if not os.path.isdir(set_path):
-            continue
-
-        # Look for card data files
-        for file in os.listdir(set_path):
-            if file.startswith("all_cards_") and file.endswith(".json"):
-                json_path = os.path.join(set_path, file)
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        cards = json.load(f)
-                        for card in cards:
-                            card_name = card.get('name', '')
-                            if card_name:
-                                card_data[card_name] = card
-                except Exception as e:
-                    print(f"Warning: Could not load {json_path}: {e}")
-                    continue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-    return card_data
+from banned_list import BANNED_LIST_PATH, file_hash, load_ban_table
+from card_index import load_card_index, parse_printing_reference
+from commander_index import is_commander_eligible
+from library_watcher import CACHE_DIR, LibraryWatcher, library_fingerprint, write_json_atomic
+from query_cache import QueryCache, content_hash
+from scryfall_client import get_client
 
-def fetch_missing_card_from_scryfall(card_name):
-    """Fetch a single card from Scryfall API and determine its set"""
-    try:
-        # Clean up card name for API
-        clean_name = card_name.replace("'", "'").strip()
+# Oracle text phrases used by the best-practice heuristics
+CARD_DRAW_PHRASES = ['draw a card', 'draw cards', 'draw two', 'draw three']
+REMOVAL_PHRASES = ['destroy target', 'exile target', 'return target', 'damage to target']
 
-        # Search for exact card name
-        url = f"https://api.scryfall.com/cards/named?exact={requests.utils.quote(clean_name)}"
-        response = requests.get(url)
+# Missing-card resolution (requests go through the shared, rate-limited client)
+COLLECTION_ENDPOINT = "/cards/collection"
+COLLECTION_BATCH_SIZE = 75  # Scryfall's identifier limit per collection request
+MAX_FETCH_WORKERS = 4
 
-        if response.status_code == 200:
-            card_data = response.json()
-            set_code = card_data.get('set', '').lower()
-            return set_code, card_data
-        else:
-            print(f"Warning: Could not find '{card_name}' on Scryfall")
-            return None, None
+BASIC_LANDS = {
+    'Plains', 'Island', 'Swamp', 'Mountain', 'Forest',
+    'Wastes', 'Snow-Covered Plains', 'Snow-Covered Island',
+    'Snow-Covered Swamp', 'Snow-Covered Mountain', 'Snow-Covered Forest'
+}
 
-    except Exception as e:
-        print(f"Warning: Error fetching '{card_name}' from Scryfall: {e}")
-        return None, None
+COMPOSITION_KEYS = ['lands', 'creatures', 'ramp', 'card_draw', 'removal']
 
-def auto_fetch_missing_sets(missing_cards):
-    """Auto-fetch sets for missing cards from Scryfall"""
-    if not missing_cards:
-        return
+# Cached per-card analysis of each deck file, for incremental re-validation
+DECK_STATE_DIR = CACHE_DIR / "deck-state"
+DECK_STATE_VERSION = 2
 
-    print(f"\nFound {len(missing_cards)} missing cards. Attempting to fetch from Scryfall...")
+def load_card_data(library=None):
+    """
+    Load card data from our card library for format and color identity checking.
 
-    sets_to_fetch = set()
+    Pass the same LibraryWatcher again to pick up newly fetched sets: only
+    files added or changed since the previous call are read.
+    """
+    library = library or LibraryWatcher()
 
-    # Find sets for missing cards
-    for card_name in missing_cards[:5]:  # Limit to 5 to avoid rate limiting
-        print(f"  Searching for: {card_name}")
-        set_code, _ = fetch_missing_card_from_scryfall(card_name)
+    if not library.library_path.exists():
+        print(f"Warning: Card library not found at {library.library_path}")
+        return {}
 
-        if set_code:
-            sets_to_fetch.add(set_code)
-            print(f"    Found in set: {set_code.upper()}")
+    library.poll()
+    for rel_path, error in library.errors:
+        print(f"Warning: Could not load {rel_path}: {error}")
 
-        time.sleep(0.1)  # Rate limiting
+    return library.by_name()
 
-    # Fetch the sets
-    if sets_to_fetch:
-        print(f"\nFetching {len(sets_to_fetch)} sets: {', '.join(s.upper() for s in sets_to_fetch)}")
+def fetch_card_batch(card_names):
+    """Resolve up to 75 card names with one Scryfall /cards/collection request"""
+    response = get_client().post(
+        COLLECTION_ENDPOINT,
+        json={'identifiers': [{'name': name.strip()} for name in card_names]}
+    )
+    response.raise_for_status()
+    return response.json().get('data', [])
+
+def resolve_missing_cards(missing_cards, max_workers=MAX_FETCH_WORKERS):
+    """
+    Resolve every missing card concurrently in batched lookups.
+    Returns dict of requested card name -> Scryfall card
+    """
+    import requests
 
-        for set_code in sets_to_fetch:
+    wanted = {name.lower(): name for name in missing_cards}
+    batches = [missing_cards[i:i + COLLECTION_BATCH_SIZE]
+               for i in range(0, len(missing_cards), COLLECTION_BATCH_SIZE)]
+    resolved = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_card_batch, batch) for batch in batches]
+        for future in as_completed(futures):
             try:
-                print(f"  Fetching {set_code.upper()}...")
-                result = subprocess.run([
-                    'python', 'scripts/fetch_set_cards.py', set_code
-                ], capture_output=True, text=True, cwd='.')
+                cards = future.result()
+            except requests.RequestException as e:
+                print(f"Warning: Scryfall batch lookup failed: {e}")
+                continue
+
+            for card in cards:
+                # Decklists may name a double-faced card by its front face only
+                names = [card.get('name', '')] + [face.get('name', '') for face in card.get('card_faces', [])]
+                for name in names:
+                    requested = wanted.get(name.lower())
+                    if requested:
+                        resolved[requested] = card
+
+    return resolved
+
+def persist_sets(set_codes, max_workers=MAX_FETCH_WORKERS):
+    """Fetch and save complete sets concurrently (in-process, no subprocess per set)"""
+    import fetch_set_cards
+
+    def fetch_and_save(set_code):
+        return fetch_set_cards.fetch_and_save_set(set_code) is not None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(set_codes, pool.map(fetch_and_save, set_codes)))
+
+    for set_code, saved in results.items():
+        if saved:
+            print(f"    Successfully fetched {set_code.upper()}")
+        else:
+            print(f"    Failed to fetch {set_code.upper()}")
+
+def auto_fetch_missing_sets(missing_cards, card_data, fetch_sets=False):
+    """
+    Resolve missing cards from Scryfall and insert them into card_data in place.
+    With fetch_sets, the complete sets of the resolved cards are also saved to
+    the card library for future runs.
+    Returns list of card names that were resolved.
+    """
+    if not missing_cards:
+        return []
 
-                if result.returncode == 0:
-                    print(f"    Successfully fetched {set_code.upper()}")
-                else:
-                    print(f"    Failed to fetch {set_code.upper()}: {result.stderr}")
+    print(f"\nFound {len(missing_cards)} missing cards. Resolving from Scryfall...")
 
-            except Exception as e:
-                print(f"    Error fetching {set_code.upper()}: {e}")
+    start = time.time()
+    resolved = resolve_missing_cards(list(missing_cards))
+    for card_name, card in resolved.items():
+        card_data[card_name] = card
+        card_data.setdefault(card.get('name', card_name), card)
+    print(f"  Resolved {len(resolved)}/{len(missing_cards)} cards in {time.time() - start:.1f}s")
+    print(f"  Network: {get_client().summary()}")
 
-        print("\nReloading card database...")
-        return True  # Indicate that we fetched new sets
+    if fetch_sets and resolved:
+        sets_to_fetch = sorted({card.get('set', '').lower() for card in resolved.values() if card.get('set')})
+        print(f"\nFetching {len(sets_to_fetch)} sets: {', '.join(s.upper() for s in sets_to_fetch)}")
+        persist_sets(sets_to_fetch)
 
-    return False
+    return list(resolved)
 
 def parse_deck_file(file_path):
     """
@@ -157,7 +198,8 @@ def parse_deck_file(file_path):
                 match = re.match(r'^(\d+)x?\s+(.+)$', line, re.IGNORECASE)
                 if match:
                     quantity = int(match.group(1))
-                    card_name = match.group(2).strip()
+                    # Exports may pin a printing: "Sol Ring (C21) 263"
+                    card_name = parse_printing_reference(match.group(2))[0]
 
                     # Detect commander
                     if current_section == "COMMANDER" or quantity == 1 and commander is None and "commander" in file_path.lower():
@@ -207,12 +249,7 @@ def is_land(card_data, card_name):
     """Check if a card is a land"""
     if card_name not in card_data:
         # Basic lands are always lands even if not in database
-        basic_lands = {
-            'Plains', 'Island', 'Swamp', 'Mountain', 'Forest',
-            'Wastes', 'Snow-Covered Plains', 'Snow-Covered Island',
-            'Snow-Covered Swamp', 'Snow-Covered Mountain', 'Snow-Covered Forest'
-        }
-        return card_name in basic_lands
+        return card_name in BASIC_LANDS
 
     card = card_data[card_name]
     type_line = card.get('type_line', '').lower()
@@ -255,37 +292,30 @@ def is_ramp_spell(card_data, card_name):
     # Ramp spells and artifacts
     return any(keyword in oracle_text for keyword in ramp_keywords)
 
-def check_best_practices(main_deck, card_data):
-    """
-    Check Commander deck building best practices.
-    Returns list of recommendations (not violations)
-    """
-    recommendations = []
+def is_card_draw(card_data, card_name):
+    """Check if a card draws cards (simplified)"""
+    if card_name not in card_data:
+        return False
 
-    # Count different card types
-    land_count = 0
-    creature_count = 0
-    ramp_count = 0
-    card_draw_count = 0
-    removal_count = 0
+    oracle_text = card_data[card_name].get('oracle_text', '').lower()
+    return any(phrase in oracle_text for phrase in CARD_DRAW_PHRASES)
 
-    for card_name, quantity in main_deck.items():
-        if is_land(card_data, card_name):
-            land_count += quantity
-        elif is_creature(card_data, card_name):
-            creature_count += quantity
-        elif is_ramp_spell(card_data, card_name):
-            ramp_count += quantity
-
-        # Check for card draw (simplified)
-        if card_name in card_data:
-            oracle_text = card_data[card_name].get('oracle_text', '').lower()
-            if any(phrase in oracle_text for phrase in ['draw a card', 'draw cards', 'draw two', 'draw three']):
-                card_draw_count += quantity
-
-            # Check for removal (simplified)
-            if any(phrase in oracle_text for phrase in ['destroy target', 'exile target', 'return target', 'damage to target']):
-                removal_count += quantity
+def is_removal(card_data, card_name):
+    """Check if a card is removal (simplified)"""
+    if card_name not in card_data:
+        return False
+
+    oracle_text = card_data[card_name].get('oracle_text', '').lower()
+    return any(phrase in oracle_text for phrase in REMOVAL_PHRASES)
+
+def best_practice_recommendations(composition):
+    """Recommendations (not violations) for a deck's composition counters"""
+    recommendations = []
+    land_count = composition['lands']
+    creature_count = composition['creatures']
+    ramp_count = composition['ramp']
+    card_draw_count = composition['card_draw']
+    removal_count = composition['removal']
 
     # Best Practice 1: Land count (35+ recommended)
     if land_count < 35:
@@ -311,36 +341,65 @@ def check_best_practices(main_deck, card_data):
     if removal_count < 6:
         recommendations.append(f"Consider adding more removal: {removal_count}/6+ recommended to handle threats")
 
-    return recommendations, {
-        'lands': land_count,
-        'creatures': creature_count,
-        'ramp': ramp_count,
-        'card_draw': card_draw_count,
-        'removal': removal_count
-    }
+    return recommendations
 
-def validate_commander_deck(file_path):
+def check_best_practices(main_deck, card_data):
     """
-    Validate all Commander deck rules.
-    Returns tuple of (is_valid, violations, stats)
+    Check Commander deck building best practices.
+    Returns list of recommendations (not violations)
     """
-    violations = []
-    stats = {}
+    composition = deck_composition({name: card_facts(card_data, name) for name in main_deck}, main_deck)
+    return best_practice_recommendations(composition), composition
 
-    # Load card database
-    print("Loading card database...")
-    card_data = load_card_data()
-    print(f"Loaded {len(card_data)} cards from database")
+def card_facts(card_data, card_name):
+    """Everything the rule and best-practice checks need to know about one card"""
+    if card_name not in card_data:
+        # Basic lands are always lands even if not in database
+        return {'in_db': False, 'land': card_name in BASIC_LANDS}
 
-    # Parse deck file
-    commander, main_deck, parse_errors = parse_deck_file(file_path)
+    card = card_data[card_name]
+    type_line = card.get('type_line', '').lower()
+    return {
+        'in_db': True,
+        'name': card.get('name', card_name),
+        'identity': sorted(get_color_identity(card_data, card_name)),
+        'legendary': 'legendary' in type_line,
+        'commander_type': 'creature' in type_line or 'planeswalker' in type_line,
+        'commander_eligible': is_commander_eligible(card),
+        'land': is_land(card_data, card_name),
+        'creature': is_creature(card_data, card_name),
+        'ramp': is_ramp_spell(card_data, card_name),
+        'card_draw': is_card_draw(card_data, card_name),
+        'removal': is_removal(card_data, card_name),
+        'commander_legality': (card.get('legalities') or {}).get('commander'),
+    }
 
-    if parse_errors:
-        violations.extend([f"Parse Error: {error}" for error in parse_errors])
+def composition_counts(facts):
+    """Composition counters contributed by one copy of a card (lands, creatures and ramp are exclusive)"""
+    land = facts.get('land', False)
+    creature = not land and facts.get('creature', False)
+    return {
+        'lands': int(land),
+        'creatures': int(creature),
+        'ramp': int(not land and not creature and facts.get('ramp', False)),
+        'card_draw': int(facts.get('card_draw', False)),
+        'removal': int(facts.get('removal', False)),
+    }
 
-    if not commander:
-        violations.append("No commander found - Commander section missing or unclear")
-        return False, violations, {}
+def deck_composition(facts, main_deck):
+    """Composition counters of a whole main deck"""
+    composition = dict.fromkeys(COMPOSITION_KEYS, 0)
+    for card_name, quantity in main_deck.items():
+        for key, count in composition_counts(facts[card_name]).items():
+            composition[key] += quantity * count
+    return composition
+
+def evaluate_deck(commander, main_deck, facts, ban_table, resolution_violations=(), composition=None):
+    """
+    Apply the Commander rules to a parsed deck using per-card facts.
+    Returns tuple of (violations, stats)
+    """
+    violations = []
 
     # Calculate stats
     total_main_deck = sum(main_deck.values())
@@ -352,7 +411,7 @@ def validate_commander_deck(file_path):
         'total_cards': total_cards,
         'main_deck_cards': total_main_deck,
         'unique_cards': unique_cards,
-        'commander_in_db': commander in card_data,
+        'commander_in_db': facts[commander]['in_db'],
     }
 
     # Rule 1: Exactly 100 cards total
@@ -364,98 +423,224 @@ def validate_commander_deck(file_path):
             violations.append(f"Too few cards: {total_cards}/100 ({difference})")
 
     # Rule 2: Singleton format (except basic lands)
-    basic_lands = {
-        'Plains', 'Island', 'Swamp', 'Mountain', 'Forest',
-        'Wastes', 'Snow-Covered Plains', 'Snow-Covered Island',
-        'Snow-Covered Swamp', 'Snow-Covered Mountain', 'Snow-Covered Forest'
-    }
-
     for card_name, quantity in main_deck.items():
-        if quantity > 1 and card_name not in basic_lands:
+        if quantity > 1 and card_name not in BASIC_LANDS:
             violations.append(f"Non-basic card appears {quantity} times: {card_name}")
 
-    # Rule 3: Commander must be legendary creature (or allowed planeswalker)
-    if commander in card_data:
-        commander_card = card_data[commander]
-        type_line = commander_card.get('type_line', '').lower()
+    # Cards that could not be resolved from the database
+    violations.extend(resolution_violations)
 
-        if 'legendary' not in type_line:
+    # Rule 3: Commander must be a legendary creature (or say it can be your commander)
+    commander_facts = facts[commander]
+    if commander_facts['in_db']:
+        if not commander_facts['legendary']:
             violations.append(f"Commander must be legendary: {commander}")
 
-        if not ('creature' in type_line or 'planeswalker' in type_line):
+        if not commander_facts['commander_type']:
             violations.append(f"Commander must be a creature or planeswalker: {commander}")
+        elif not commander_facts['commander_eligible'] and commander_facts['legendary']:
+            violations.append(f"Commander must be a legendary creature or say it can be your commander: {commander}")
     else:
         violations.append(f"Commander not found in database: {commander}")
 
-    # Rule 4: Format legality and auto-fetch missing cards (do this before color identity check)
-    cards_not_in_db = [name for name in main_deck.keys() if name not in card_data]
-
-    # Auto-fetch missing cards if found
-    if cards_not_in_db:
-        print(f"\nFound {len(cards_not_in_db)} cards not in database")
-
-        if auto_fetch_missing_sets(cards_not_in_db):
-            # Reload card data after fetching new sets
-            card_data = load_card_data()
-            print(f"Reloaded database with {len(card_data)} total cards")
-
-            # Re-check missing cards
-            still_missing = [name for name in main_deck.keys() if name not in card_data]
-
-            if still_missing:
-                violations.append(f"Cards still not found after auto-fetch: {', '.join(still_missing[:5])}{'...' if len(still_missing) > 5 else ''}")
-            else:
-                print("All missing cards now found in database!")
-
-                # Re-validate color identity for newly found cards
-                if commander in card_data:
-                    commander_colors = get_color_identity(card_data, commander)
-                    stats['commander_colors'] = sorted(list(commander_colors))
-
-                    for card_name in main_deck.keys():
-                        if card_name in card_data:
-                            card_colors = get_color_identity(card_data, card_name)
-                            if not card_colors.issubset(commander_colors):
-                                illegal_colors = card_colors - commander_colors
-                                violations.append(f"Color identity violation: {card_name} contains {sorted(list(illegal_colors))} not in commander's {sorted(list(commander_colors))}")
-        else:
-            violations.append(f"Cards not in database (could not auto-fetch): {', '.join(cards_not_in_db[:5])}{'...' if len(cards_not_in_db) > 5 else ''}")
+    # Rule 4: Commander banned list, cross-checked against Scryfall legalities
+    ban_list_notes = []
+    for card_name in [commander] + list(main_deck.keys()):
+        if ban_table.status(card_name, 'commander') == 'banned':
+            violations.append(f"Banned in Commander: {card_name}")
+        if facts[card_name]['in_db']:
+            card = {'name': facts[card_name]['name'],
+                    'legalities': {'commander': facts[card_name]['commander_legality']}}
+            disagreement = ban_table.disagreements(card, 'commander')
+            if disagreement:
+                ban_list_notes.append(disagreement)
+    stats['ban_list_notes'] = ban_list_notes
 
     # Rule 5: Color identity restrictions (after auto-fetch)
-    if commander in card_data:
-        commander_colors = get_color_identity(card_data, commander)
+    if commander_facts['in_db']:
+        commander_colors = set(commander_facts['identity'])
         stats['commander_colors'] = sorted(list(commander_colors))
 
         for card_name in main_deck.keys():
-            if card_name in card_data:
-                card_colors = get_color_identity(card_data, card_name)
+            if facts[card_name]['in_db']:
+                card_colors = set(facts[card_name]['identity'])
                 if not card_colors.issubset(commander_colors):
                     illegal_colors = card_colors - commander_colors
                     violations.append(f"Color identity violation: {card_name} contains {sorted(list(illegal_colors))} not in commander's {sorted(list(commander_colors))}")
             else:
                 violations.append(f"Card not found in database (cannot verify color identity): {card_name}")
 
-    # Best Practices Check (use potentially updated card data)
-    recommendations, deck_composition = check_best_practices(main_deck, card_data)
-    stats['deck_composition'] = deck_composition
-    stats['recommendations'] = recommendations
+    # Best Practices Check
+    if composition is None:
+        composition = deck_composition(facts, main_deck)
+    stats['deck_composition'] = composition
+    stats['recommendations'] = best_practice_recommendations(composition)
 
-    is_valid = len(violations) == 0
-    return is_valid, violations, stats
+    return violations, stats
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python commander_deck_validator.py <deck_file_path>")
-        print("Example: python commander_deck_validator.py decks/my-commander-deck.txt")
-        sys.exit(1)
+def deck_state_path(file_path):
+    """Per-deck analysis state file, keyed by the deck's absolute path"""
+    key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+    return DECK_STATE_DIR / f"{key}.json"
 
-    deck_file = sys.argv[1]
-    print(f"Validating Commander deck: {deck_file}")
-    print("=" * 60)
+def load_deck_state(file_path, library_key):
+    """Previous analysis of this deck file, if it was made against the same library and banned list"""
+    try:
+        with open(deck_state_path(file_path), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != DECK_STATE_VERSION or state.get('library_key') != library_key:
+        return None
+    return state
+
+def save_deck_state(file_path, library_key, commander, main_deck, facts, composition):
+    DECK_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    state = {
+        'version': DECK_STATE_VERSION,
+        'library_key': library_key,
+        'path': os.path.abspath(file_path),
+        'commander': commander,
+        'main_deck': main_deck,
+        'facts': {name: facts[name] for name in [commander] + list(main_deck)},
+        'composition': composition,
+    }
+    write_json_atomic(deck_state_path(file_path), state)
 
-    is_valid, violations, stats = validate_commander_deck(deck_file)
+def revalidate_incrementally(state, commander, main_deck, ban_table):
+    """
+    Re-check a deck against its previous analysis, analysing only the cards
+    that were added and adjusting the composition counters by the difference.
+    Returns tuple of (violations, stats, facts, changed card count), or None
+    if a new card is not in the card library (needs a full run).
+    """
+    old_deck = state['main_deck']
+    facts = state['facts']
+
+    new_names = [name for name in [commander] + list(main_deck) if name not in facts]
+    if new_names:
+        card_data = load_card_index()
+        for card_name in new_names:
+            if card_name not in card_data:
+                return None
+            facts[card_name] = card_facts(card_data, card_name)
+
+    composition = dict(state['composition'])
+    changed = 0
+    for card_name in set(old_deck) | set(main_deck):
+        delta = main_deck.get(card_name, 0) - old_deck.get(card_name, 0)
+        if delta:
+            changed += 1
+            for key, count in composition_counts(facts[card_name]).items():
+                composition[key] += delta * count
+    if commander != state['commander']:
+        changed += 1
+
+    violations, stats = evaluate_deck(commander, main_deck, facts, ban_table, composition=composition)
+    return violations, stats, facts, changed
+
+def validate_commander_deck(file_path, fetch_sets=False, use_cache=True):
+    """
+    Validate all Commander deck rules.
+    Cards missing from the library are resolved from Scryfall; with fetch_sets
+    their complete sets are also saved to the card library.
+    Results for decks whose cards are all in the library are cached by deck
+    file content, and each deck's per-card analysis is kept so that an edited
+    deck only needs its changed cards analysed.
+    Returns tuple of (is_valid, violations, stats)
+    """
+    violations = []
 
-    # Print results
+    deck_hash = content_hash(file_path)
+    cache = QueryCache() if use_cache and deck_hash else None
+    ban_hash = file_hash(BANNED_LIST_PATH)
+    # parse_deck_file() also reads the commander from a file named *commander*, so that goes in the key
+    cache_key = ['validate', deck_hash, ban_hash, DECK_STATE_VERSION, "commander" in file_path.lower()]
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print("Using cached result (deck, card library and banned list unchanged)")
+            return cached['is_valid'], cached['violations'], cached['stats']
+
+    # Parse deck file
+    commander, main_deck, parse_errors = parse_deck_file(file_path)
+
+    if parse_errors:
+        violations.extend([f"Parse Error: {error}" for error in parse_errors])
+
+    if not commander:
+        violations.append("No commander found - Commander section missing or unclear")
+        return False, violations, {}
+
+    ban_table = load_ban_table()
+    fingerprint = library_fingerprint()
+    library_key = f"{fingerprint}:{ban_hash}"
+
+    # Edited deck: analyse only the cards that changed since the last run
+    state = load_deck_state(file_path, library_key) if use_cache else None
+    if state:
+        start = time.perf_counter()
+        result = revalidate_incrementally(state, commander, main_deck, ban_table)
+        if result:
+            deck_violations, stats, facts, changed = result
+            violations.extend(deck_violations)
+            print(f"Incremental re-validation: {changed} card(s) changed since the last run "
+                  f"({(time.perf_counter() - start) * 1000:.1f}ms)")
+            save_deck_state(file_path, library_key, commander, main_deck, facts, stats['deck_composition'])
+            is_valid = len(violations) == 0
+            if cache:
+                cache.put(cache_key, {'is_valid': is_valid, 'violations': violations, 'stats': stats})
+            return is_valid, violations, stats
+
+    # Open the card offset index; only the deck's records are read from the library
+    print("Loading card database...")
+    card_data = load_card_index(fingerprint=fingerprint)
+    for rel_path, error in card_data.errors:
+        print(f"Warning: Could not index {rel_path}: {error}")
+    print(f"Loaded {len(card_data)} cards from database")
+
+    # Resolve cards missing from the database (including the commander) before the remaining rules
+    resolution_violations = []
+    cards_not_in_db = [name for name in [commander] + list(main_deck.keys()) if name not in card_data]
+
+    if cards_not_in_db:
+        print(f"\nFound {len(cards_not_in_db)} cards not in database")
+
+        if auto_fetch_missing_sets(cards_not_in_db, card_data, fetch_sets=fetch_sets):
+            if fetch_sets:
+                # Index only the newly fetched set files, keeping the resolved cards
+                resolved = {name: card_data[name] for name in cards_not_in_db if name in card_data}
+                card_data = load_card_index()
+                for card_name, card in resolved.items():
+                    card_data.setdefault(card_name, card)
+                print(f"Reloaded database with {len(card_data)} total cards")
+
+            still_missing = [name for name in cards_not_in_db if name not in card_data]
+
+            if still_missing:
+                resolution_violations.append(f"Cards still not found after auto-fetch: {', '.join(still_missing[:5])}{'...' if len(still_missing) > 5 else ''}")
+            else:
+                print("All missing cards now found!")
+        else:
+            resolution_violations.append(f"Cards not in database (could not auto-fetch): {', '.join(cards_not_in_db[:5])}{'...' if len(cards_not_in_db) > 5 else ''}")
+
+    # Analyse each card once, then apply the rules (use potentially updated card data)
+    facts = {name: card_facts(card_data, name) for name in [commander] + list(main_deck.keys())}
+    deck_violations, stats = evaluate_deck(commander, main_deck, facts, ban_table, resolution_violations)
+    violations.extend(deck_violations)
+
+    is_valid = len(violations) == 0
+
+    # Results that depended on Scryfall lookups are not cached
+    if use_cache and not cards_not_in_db:
+        save_deck_state(file_path, library_key, commander, main_deck, facts, stats['deck_composition'])
+        if cache:
+            cache.put(cache_key, {'is_valid': is_valid, 'violations': violations, 'stats': stats})
+
+    return is_valid, violations, stats
+
+def print_validation_report(deck_file, is_valid, violations, stats):
+    """Print the statistics, violations and recommendations for one deck"""
     if stats:
         print("DECK STATISTICS:")
         print(f"  Commander: {stats.get('commander', 'Unknown')}")
@@ -494,18 +679,56 @@ def main():
         for i, recommendation in enumerate(stats['recommendations'], 1):
             print(f"  {i}. {recommendation}")
 
+    # Banned list entries that disagree with Scryfall's legality data
+    if stats and stats.get('ban_list_notes'):
+        print()
+        print("BAN LIST DISAGREEMENTS (banned-restricted.md vs Scryfall):")
+        for note in stats['ban_list_notes']:
+            print(f"  - {note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate Commander/EDH decks')
+    parser.add_argument('deck_files', nargs='+', metavar='deck_file',
+                        help='Deck file path(s) (e.g. decks/my-commander-deck.txt)')
+    parser.add_argument('--fetch-sets', action='store_true',
+                        help='Also save the complete sets of cards missing from the library')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-validate even if a cached result exists')
+    args = parser.parse_args(argv)
+
+    results = []
+    for deck_file in args.deck_files:
+        if results:
+            print()
+        print(f"Validating Commander deck: {deck_file}")
+        print("=" * 60)
+
+        is_valid, violations, stats = validate_commander_deck(
+            deck_file, fetch_sets=args.fetch_sets, use_cache=not args.no_cache)
+        print_validation_report(deck_file, is_valid, violations, stats)
+        results.append((deck_file, is_valid, violations))
+
     print()
     print("RULES CHECKED:")
     print("  + Card count (exactly 100 cards)")
     print("  + Singleton format (no duplicates except basics)")
     print("  + Commander legality (legendary creature/planeswalker)")
+    print("  + Commander banned list (formats/banned-restricted.md)")
     print("  + Color identity restrictions")
     print("  + Format legality (based on card database)")
     print("  + Best practices (land count, ramp, card draw, removal)")
 
-    # Exit with error code if deck is invalid
-    if not is_valid:
+    if len(results) > 1:
+        print()
+        print("BATCH SUMMARY:")
+        for deck_file, is_valid, violations in results:
+            result = "LEGAL" if is_valid else f"ILLEGAL ({len(violations)} violations)"
+            print(f"  {deck_file}: {result}")
+
+    # Exit with error code if any deck is invalid
+    if not all(is_valid for _, is_valid, _ in results):
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
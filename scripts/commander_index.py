@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+MTG Commander Candidate Index
+
+Every oracle card that can lead a Commander deck, bucketed by color identity
+(a 5-bit WUBRG mask) and sorted by EDHREC rank within each bucket, so color
+queries read one pre-sorted list instead of scanning the library:
+
+- eligible: a legendary creature (front face), a card whose text says it
+  "can be your commander", or a legendary card that is a creature while
+  not on the battlefield
+- pairings: Partner, Partner with <name>, Partner—<kind> and Friends forever,
+  Choose a Background (with Background enchantments, which are indexed for
+  pairing only) and Doctor's companion (with Time Lord Doctors)
+
+A pair's color identity is the union of both commanders' identities. Cards
+that are not legal in Commander are left out; banned commanders are kept
+but hidden unless asked for. The index is cached in .cache/ keyed by the
+library fingerprint.
+
+Usage:
+    python scripts/commander_index.py <colors> [--within] [--pairs] [--limit N] [--include-banned]
+    python scripts/commander_index.py --partners "<commander name>"
+
+Colors are letters ("wub"), a guild/shard/wedge name ("esper") or "colorless".
+
+Example:
+    python scripts/commander_index.py esper
+    python scripts/commander_index.py sultai --pairs
+    python scripts/commander_index.py --partners "Tymna the Weaver"
+"""
+
+import argparse
+import json
+import re
+import time
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from library_watcher import CACHE_DIR, LibraryWatcher, library_fingerprint, prune_cache, write_json_atomic
+
+CACHE_VERSION = 1
+DEFAULT_LIMIT = 25
+UNRANKED = 10 ** 7  # Sorts cards without an EDHREC rank last
+
+COLOR_ORDER = 'WUBRG'
+COLOR_BITS = {color: 1 << i for i, color in enumerate(COLOR_ORDER)}
+
+# Color-group names -> identity letters
+COLOR_NAMES = {
+    'colorless': '', 'white': 'W', 'blue': 'U', 'black': 'B', 'red': 'R', 'green': 'G',
+    'azorius': 'WU', 'dimir': 'UB', 'rakdos': 'BR', 'gruul': 'RG', 'selesnya': 'GW',
+    'orzhov': 'WB', 'izzet': 'UR', 'golgari': 'BG', 'boros': 'RW', 'simic': 'GU',
+    'bant': 'GWU', 'esper': 'WUB', 'grixis': 'UBR', 'jund': 'BRG', 'naya': 'RGW',
+    'abzan': 'WBG', 'jeskai': 'URW', 'sultai': 'BGU', 'mardu': 'RWB', 'temur': 'GUR',
+    'yore-tiller': 'WUBR', 'glint-eye': 'UBRG', 'dune-brood': 'BRGW', 'ink-treader': 'RGWU',
+    'witch-maw': 'GWUB', 'five-color': 'WUBRG',
+}
+
+# Layouts that are not deck cards (same as autocomplete.NON_CARD_LAYOUTS)
+NON_CARD_LAYOUTS = {
+    'token', 'double_faced_token', 'art_series', 'emblem',
+    'vanguard', 'scheme', 'planar', 'reversible_card'
+}
+PLAYABLE_LEGALITIES = {'legal', 'banned'}
+
+PARTNER_WITH_PATTERN = re.compile(r'^Partner with ([^(\n]+?)\s*(?:\(|$)', re.MULTILINE)
+PARTNER_GROUP_PATTERN = re.compile(r'^(Partner(?:—[^(\n]+?)?|Friends forever)\s*(?:\(|$)', re.MULTILINE)
+CHOOSE_BACKGROUND_PATTERN = re.compile(r'^Choose a Background\b', re.MULTILINE)
+DOCTORS_COMPANION_PATTERN = re.compile(r"^Doctor's companion\b", re.MULTILINE)
+# Legendary cards that are creatures outside the battlefield (Grist, the Hunger Tide)
+CREATURE_OFF_BATTLEFIELD_PATTERN = re.compile(r"isn't on the battlefield, it's an? [^.]*creature", re.IGNORECASE)
+
+
+def color_mask(colors) -> int:
+    mask = 0
+    for color in colors:
+        mask |= COLOR_BITS.get(color.upper(), 0)
+    return mask
+
+
+def mask_colors(mask: int) -> str:
+    return ''.join(color for color in COLOR_ORDER if mask & COLOR_BITS[color]) or 'C'
+
+
+def parse_colors(text: str) -> Optional[int]:
+    """Identity mask of a color query ("esper", "wub", "W U B", "colorless"); None if not understood"""
+    key = text.strip().lower().replace(' ', '-')
+    if key in COLOR_NAMES:
+        return color_mask(COLOR_NAMES[key])
+    letters = re.sub(r'[\s,/{}]', '', text).upper()
+    if key in ('c', 'wastes') or (letters and all(letter in COLOR_BITS for letter in letters)):
+        return color_mask(letters.replace('C', ''))
+    return None
+
+
+def front_type_line(card) -> str:
+    faces = card.get('card_faces') or []
+    return (faces[0].get('type_line') if faces and faces[0].get('type_line') else card.get('type_line', '')).split('//')[0]
+
+
+def rules_text(card) -> str:
+    faces = card.get('card_faces') or []
+    return '\n'.join(face.get('oracle_text', '') for face in faces) if faces else card.get('oracle_text', '')
+
+
+def is_commander_eligible(card) -> bool:
+    """Whether a card can be a commander: a legendary creature, or its text says it can be your commander"""
+    type_line = front_type_line(card).lower()
+    if 'legendary' in type_line and 'creature' in type_line:
+        return True
+    text = rules_text(card)
+    return ('can be your commander' in text.lower() or
+            'legendary' in type_line and CREATURE_OFF_BATTLEFIELD_PATTERN.search(text) is not None)
+
+
+def is_background(card) -> bool:
+    type_line = front_type_line(card).lower()
+    return 'legendary' in type_line and 'background' in type_line
+
+
+def pairing_traits(card) -> Dict[str, Any]:
+    """Second-commander abilities of a card (absent keys mean no such ability)"""
+    text = rules_text(card)
+    traits = {}
+    partner_with = PARTNER_WITH_PATTERN.search(text)
+    if partner_with:
+        traits['with'] = partner_with.group(1).strip()
+    group = PARTNER_GROUP_PATTERN.search(text)
+    if group:
+        traits['group'] = group.group(1).strip().lower()
+    if CHOOSE_BACKGROUND_PATTERN.search(text):
+        traits['background'] = True
+    if DOCTORS_COMPANION_PATTERN.search(text):
+        traits['companion'] = True
+    if 'time lord doctor' in front_type_line(card).lower():
+        traits['doctor'] = True
+    return traits
+
+
+def build_commander_index(cards) -> Dict[str, Any]:
+    """
+    Commander candidates of the library, one per oracle card (the last printing wins).
+
+    Returns:
+        {'cards': [[name, identity mask, rank, banned, kind, traits]],
+         'buckets': {mask: [rows by rank]}, 'paired': [rows with a pairing ability or that are Backgrounds]}
+    """
+    candidates: Dict[str, list] = {}
+    for card in cards:
+        card_name = card.get('name', '')
+        if not card_name or card.get('layout') in NON_CARD_LAYOUTS:
+            continue
+        legality = (card.get('legalities') or {}).get('commander')
+        if legality not in PLAYABLE_LEGALITIES:
+            continue
+        if is_commander_eligible(card):
+            kind = 'commander'
+        elif is_background(card):
+            kind = 'background'
+        else:
+            continue
+        candidates[card.get('oracle_id') or card_name] = [
+            card_name, color_mask(card.get('color_identity') or []), card.get('edhrec_rank') or UNRANKED,
+            legality == 'banned', kind, pairing_traits(card)
+        ]
+
+    rows = sorted(candidates.values(), key=lambda row: (row[2], row[0]))
+    buckets: Dict[str, List[int]] = {}
+    for row, (_, mask, _, _, kind, _) in enumerate(rows):
+        if kind == 'commander':
+            buckets.setdefault(str(mask), []).append(row)
+    paired = [row for row, entry in enumerate(rows) if entry[5] or entry[4] == 'background']
+    return {'cards': rows, 'buckets': buckets, 'paired': paired}
+
+
+def can_pair(first, second) -> bool:
+    """Whether two candidate rows can be commanders together"""
+    name_a, _, _, _, kind_a, traits_a = first
+    name_b, _, _, _, kind_b, traits_b = second
+    if name_a == name_b:
+        return False
+    if kind_a == 'background' or kind_b == 'background':
+        return (kind_a == 'background' and kind_b == 'commander' and traits_b.get('background', False) or
+                kind_b == 'background' and kind_a == 'commander' and traits_a.get('background', False))
+    if traits_a.get('with') == name_b or traits_b.get('with') == name_a:
+        return True
+    if traits_a.get('group') and traits_a.get('group') == traits_b.get('group'):
+        return True
+    return (traits_a.get('companion', False) and traits_b.get('doctor', False) or
+            traits_b.get('companion', False) and traits_a.get('doctor', False))
+
+
+class CommanderIndex:
+    """Color-bucketed commander candidates with partner/background pairing lookups"""
+
+    def __init__(self, index: Dict[str, Any]):
+        self.cards = index['cards']
+        self.buckets = {int(mask): rows for mask, rows in index['buckets'].items()}
+        self.paired = index['paired']
+        self._by_name = {row[0].lower(): i for i, row in enumerate(self.cards)}
+
+    def __len__(self):
+        return len(self.cards)
+
+    def find(self, card_name: str) -> Optional[int]:
+        """Row of a candidate by name (case-insensitive, front face of "A // B" also matches)"""
+        key = card_name.strip().lower()
+        row = self._by_name.get(key)
+        if row is None:
+            row = next((i for i, entry in enumerate(self.cards)
+                        if entry[0].lower().split(' // ')[0] == key), None)
+        return row
+
+    def commanders(self, mask: int, within: bool = False, include_banned: bool = False) -> List[int]:
+        """Commander rows with exactly this identity (or any identity inside it), best ranked first"""
+        if within:
+            rows = sorted((row for bucket, rows in self.buckets.items() if bucket & ~mask == 0 for row in rows))
+        else:
+            rows = self.buckets.get(mask, [])
+        return [row for row in rows if include_banned or not self.cards[row][3]]
+
+    def partners(self, card_name: str, include_banned: bool = False) -> Optional[List[int]]:
+        """Rows that can be a second commander next to card_name (None if it is not a candidate)"""
+        row = self.find(card_name)
+        if row is None:
+            return None
+        entry = self.cards[row]
+        return [other for other in self.paired
+                if (include_banned or not self.cards[other][3]) and can_pair(entry, self.cards[other])]
+
+    def pairs(self, mask: int, include_banned: bool = False) -> List[Tuple[int, int]]:
+        """Commander pairs whose combined identity is exactly mask, best ranked first"""
+        rows = [row for row in self.paired
+                if self.cards[row][1] & ~mask == 0 and (include_banned or not self.cards[row][3])]
+        found = [(a, b) for a, b in combinations(rows, 2)
+                 if self.cards[a][1] | self.cards[b][1] == mask and can_pair(self.cards[a], self.cards[b])]
+        return sorted(found, key=lambda pair: (self.cards[pair[0]][2] + self.cards[pair[1]][2], pair))
+
+
+def load_commander_index(library: Optional[LibraryWatcher] = None) -> CommanderIndex:
+    """Load the commander index from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library.library_path) if library else library_fingerprint()
+    cache_file = CACHE_DIR / f"commander_index_v{CACHE_VERSION}_{fingerprint}.json"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return CommanderIndex(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if library is None:
+        library = LibraryWatcher()
+    library.poll()
+    index = build_commander_index(library.cards())
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(cache_file, index)
+    prune_cache("commander_index_v*_*.json")
+    return CommanderIndex(index)
+
+
+def describe(entry) -> str:
+    card_name, mask, rank, banned, kind, _ = entry
+    rank_text = f"#{rank}" if rank != UNRANKED else "unranked"
+    notes = (" [Background]" if kind == 'background' else "") + (" [BANNED]" if banned else "")
+    return f"{card_name} ({mask_colors(mask)}, {rank_text}){notes}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Commander candidates by color identity, and legal pairings')
+    parser.add_argument('colors', nargs='?', help='Color identity: letters (wub), a group name (esper) or colorless')
+    parser.add_argument('--within', action='store_true', help='Include commanders with fewer of these colors')
+    parser.add_argument('--pairs', action='store_true', help='Also list commander pairs with this combined identity')
+    parser.add_argument('--partners', metavar='NAME', help='List legal second commanders for a commander')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'Results to show (default: {DEFAULT_LIMIT})')
+    parser.add_argument('--include-banned', action='store_true', help='Include commanders banned in Commander')
+    args = parser.parse_args(argv)
+
+    if not args.colors and not args.partners:
+        parser.error('a color identity or --partners is required')
+
+    index = load_commander_index()
+    start = time.perf_counter()
+
+    if args.partners:
+        rows = index.partners(args.partners, args.include_banned)
+        elapsed = time.perf_counter() - start
+        if rows is None:
+            print(f"'{args.partners}' is not a commander candidate in the library")
+            return
+        entry = index.cards[index.find(args.partners)]
+        print(f"SECOND COMMANDERS FOR {entry[0].upper()} ({len(rows)}, {elapsed * 1000:.2f}ms)")
+        print("-" * 60)
+        for row in rows[:args.limit]:
+            print(f"  {describe(index.cards[row])}  -> {mask_colors(entry[1] | index.cards[row][1])}")
+        if len(rows) > args.limit:
+            print(f"  ... and {len(rows) - args.limit} more")
+        return
+
+    mask = parse_colors(args.colors)
+    if mask is None:
+        print(f"Unknown color identity: {args.colors}")
+        return
+
+    rows = index.commanders(mask, args.within, args.include_banned)
+    pairs = index.pairs(mask, args.include_banned) if args.pairs else []
+    elapsed = time.perf_counter() - start
+
+    scope = "within" if args.within else "exactly"
+    print(f"COMMANDERS {scope.upper()} {mask_colors(mask)}: {len(rows)} ({elapsed * 1000:.2f}ms, "
+          f"{len(index)} candidates indexed)")
+    print("-" * 60)
+    for row in rows[:args.limit]:
+        print(f"  {describe(index.cards[row])}")
+    if len(rows) > args.limit:
+        print(f"  ... and {len(rows) - args.limit} more")
+
+    if args.pairs:
+        print(f"\nCOMMANDER PAIRS WITH IDENTITY {mask_colors(mask)}: {len(pairs)}")
+        print("-" * 60)
+        for a, b in pairs[:args.limit]:
+            print(f"  {describe(index.cards[a])} + {describe(index.cards[b])}")
+        if len(pairs) > args.limit:
+            print(f"  ... and {len(pairs) - args.limit} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -79,13 +79,15 @@ def analyze_deck_format(total_cards, file_path):
 
     return expected, format_name
 
-def main():
-    if len(sys.argv) != 2:
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if len(argv) != 1:
         print("Usage: python count_deck_cards.py <deck_file_path>")
         print("Example: python count_deck_cards.py decks/my-deck.txt")
         sys.exit(1)
 
-    deck_file = sys.argv[1]
+    deck_file = argv[0]
 
     print(f"Counting cards in: {deck_file}")
     print("=" * 50)
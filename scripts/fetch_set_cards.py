@@ -5,88 +5,159 @@ Scryfall Set Cards Fetcher
 This script fetches all cards from a specific Magic: The Gathering set
 and saves them as JSON files in card-library/<set-name>/.
 
+Every received page is checkpointed to .cache/fetch-journal/ together with
+its next_page cursor, so an interrupted fetch resumes where it stopped when
+re-run. Set files are written atomically (temporary file + rename) inside
+the library's publish section (library_watcher.library_writer), so
+concurrent fetches are serialised and searches or validations running at the
+same time only ever read complete set files of one library generation.
+
 Usage:
-    python fetch_set_cards.py <set_code>
-    
+    python fetch_set_cards.py <set_code> [--restart]
+    python fetch_set_cards.py --refresh-library
+
 Example:
     python fetch_set_cards.py dmu
     python fetch_set_cards.py "Dominaria United"
 """
 
 import json
-import os
 import sys
 import time
 import requests
 from pathlib import Path
 import argparse
 
+from library_watcher import CACHE_DIR, CARD_LIBRARY_PATH, library_writer, scan_library, write_json_atomic, write_json_temp
+from scryfall_client import get_client
+
 # Configuration
-BASE_URL = "https://api.scryfall.com"
 SEARCH_ENDPOINT = "/cards/search"
-USER_AGENT = "MTG-Claude-Helper/1.0"
-REQUEST_DELAY = 0.1  # 100ms delay between requests
 
-# Headers required by Scryfall API
-HEADERS = {
-    "User-Agent": USER_AGENT,
-    "Accept": "application/json"
-}
+# Page checkpoints for interrupted fetches
+JOURNAL_DIR = CACHE_DIR / "fetch-journal"
+JOURNAL_MAX_AGE = 24 * 3600  # Older checkpoints are discarded (prices move)
+REFRESH_JOURNAL = JOURNAL_DIR / "refresh-library.json"
+
+class FetchJournal:
+    """
+    Checkpoints of one set fetch: a meta file with the query, and one file per
+    received page holding its cards and the next_page cursor.
+    """
+
+    def __init__(self, set_identifier, params=None):
+        key = "".join(c if c.isalnum() else '-' for c in set_identifier.lower())
+        self.path = JOURNAL_DIR / key
+        self.params = params
+
+    def resume(self):
+        """
+        Cards and cursor from the last contiguous checkpointed page.
+        Returns tuple of (cards, next_page, page_count); page_count is 0 when starting fresh.
+        """
+        meta_file = self.path / "meta.json"
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return [], None, 0
+
+        if meta.get('params') != self.params or time.time() - meta.get('started', 0) > JOURNAL_MAX_AGE:
+            self.clear()
+            return [], None, 0
+
+        cards = []
+        next_page = None
+        page_count = 0
+        while True:
+            try:
+                with open(self.path / f"page_{page_count + 1:04d}.json", 'r', encoding='utf-8') as f:
+                    page = json.load(f)
+            except (OSError, ValueError):
+                break
+            cards.extend(page['cards'])
+            next_page = page['next_page']
+            page_count += 1
+
+        return cards, next_page, page_count
 
-def fetch_cards_from_set(set_identifier):
-    """Fetch all cards from a specific set using Scryfall search API."""
+    def record_page(self, page_number, cards, next_page):
+        """Checkpoint one received page (and the cursor to the following one)"""
+        if page_number == 1:
+            self.clear()
+            self.path.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self.path / "meta.json", {'params': self.params, 'started': time.time()}, fsync=True)
+        write_json_atomic(self.path / f"page_{page_number:04d}.json", {'cards': cards, 'next_page': next_page},
+                          fsync=True)
+
+    def clear(self):
+        """Remove the checkpoints (after the set has been saved)"""
+        if self.path.exists():
+            for checkpoint in self.path.iterdir():
+                checkpoint.unlink()
+            self.path.rmdir()
+
+def fetch_cards_from_set(set_identifier, resume=True):
+    """
+    Fetch all cards from a specific set using Scryfall search API.
+    Pages are checkpointed as they arrive; with resume, a previous interrupted
+    fetch of the same set continues from its last checkpoint.
+    """
     print(f"Fetching cards from set: {set_identifier}")
     
     # Use set search syntax - works with both set codes and set names
     query = f"set:{set_identifier}"
+    params = {
+        'q': query,
+        'order': 'set',
+        'unique': 'cards'
+    }
     
-    all_cards = []
-    next_page = None
-    page_count = 0
+    client = get_client()
+    journal = FetchJournal(set_identifier, params)
+    all_cards, next_page, page_count = journal.resume() if resume else ([], None, 0)
+
+    if page_count:
+        print(f"Resuming from checkpoint: {page_count} pages ({len(all_cards)} cards) already fetched")
     
     try:
-        while True:
-            page_count += 1
-            print(f"Fetching page {page_count}...")
-            
-            # Build URL
-            if next_page:
-                url = next_page
-            else:
-                params = {
-                    'q': query,
-                    'order': 'set',
-                    'unique': 'cards'
-                }
-                response = requests.get(f"{BASE_URL}{SEARCH_ENDPOINT}", 
-                                      headers=HEADERS, params=params)
-            
-            if next_page:
-                response = requests.get(next_page, headers=HEADERS)
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Add cards from this page
-            if 'data' in data:
-                all_cards.extend(data['data'])
-                print(f"  Found {len(data['data'])} cards on page {page_count}")
-            
-            # Check if there are more pages
-            if data.get('has_more', False) and 'next_page' in data:
-                next_page = data['next_page']
-                time.sleep(REQUEST_DELAY)  # Respect rate limits
-            else:
-                break
+        if page_count and not next_page:
+            pass  # Every page was already checkpointed
+        else:
+            response = client.get(next_page) if next_page else client.get(SEARCH_ENDPOINT, params=params)
+
+            while True:
+                page_count += 1
+                print(f"Fetching page {page_count}...")
+
+                response.raise_for_status()
+                data = response.json()
+
+                # Add cards from this page
+                page_cards = data.get('data', [])
+                all_cards.extend(page_cards)
+                print(f"  Found {len(page_cards)} cards on page {page_count}")
+
+                # Check if there are more pages (the client spaces requests out)
+                next_page = data['next_page'] if data.get('has_more', False) and 'next_page' in data else None
+                journal.record_page(page_count, page_cards, next_page)
+
+                if next_page:
+                    response = client.get(next_page)
+                else:
+                    break
         
         print(f"Total cards found: {len(all_cards)}")
-        return all_cards, data.get('data', [{}])[0].get('set_name', set_identifier) if all_cards else set_identifier
+        return all_cards, all_cards[0].get('set_name', set_identifier) if all_cards else set_identifier
     
     except requests.RequestException as e:
-        if response.status_code == 404:
+        status = e.response.status_code if e.response is not None else None
+        if status == 404 and not all_cards:
             print(f"Set '{set_identifier}' not found. Please check the set code or name.")
         else:
             print(f"Error fetching cards: {e}")
+            if all_cards:
+                print(f"Progress saved ({len(all_cards)} cards); re-run to resume from page {page_count}.")
         return None, None
 
 def create_set_directory(set_name):
@@ -109,12 +180,8 @@ def save_cards(cards, set_dir, set_name):
     # Get set code for filename
     set_code = cards[0].get('set') if cards else 'unknown'
     
-    # Save complete set as one file with set code
     all_cards_file = set_dir / f"all_cards_{set_code}.json"
-    with open(all_cards_file, 'w', encoding='utf-8') as f:
-        json.dump(cards, f, indent=2, ensure_ascii=False)
-    
-    print(f"Saved all {len(cards)} cards to {all_cards_file}")
+    summary_file = set_dir / f"set_info_{set_code}.json"
     
     # Create summary file
     summary = {
@@ -127,48 +194,138 @@ def save_cards(cards, set_dir, set_name):
         'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
     }
     
-    summary_file = set_dir / f"set_info_{set_code}.json"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    # Write both files aside, then publish them together as one library generation
+    staged = [(write_json_temp(all_cards_file, cards, indent=2, fsync=True), all_cards_file),
+              (write_json_temp(summary_file, summary, indent=2, fsync=True), summary_file)]
+    with library_writer() as publish:
+        for tmp_path, path in staged:
+            publish(tmp_path, path)
     
+    print(f"Saved all {len(cards)} cards to {all_cards_file}")
     print(f"Created set summary: {summary_file}")
 
-def main():
+def fetch_and_save_set(set_identifier, resume=True):
+    """
+    Fetch a set, save it to the card library and drop its checkpoints.
+    Returns tuple of (cards, set_name, set_dir), or None if the fetch failed.
+    """
+    cards, set_name = fetch_cards_from_set(set_identifier, resume=resume)
+    if not cards:
+        return None
+
+    set_dir = create_set_directory(set_name)
+    save_cards(cards, set_dir, set_name)
+    FetchJournal(set_identifier).clear()
+    return cards, set_name, set_dir
+
+def record_price_history(cards):
+    """Capture prices in the local price history (requires numpy)"""
+    try:
+        from price_history import record_prices
+        print(f"Recorded {record_prices(cards)} price changes in .data/price-history/")
+    except ImportError:
+        print("Skipping price history (numpy not installed)")
+
+def library_set_codes():
+    """Set codes of every all_cards_<code>.json file in the card library"""
+    return sorted({rel_path.split('/')[-1][len("all_cards_"):-len(".json")]
+                   for rel_path in scan_library(CARD_LIBRARY_PATH)})
+
+def refresh_library(resume=True):
+    """
+    Re-fetch every set in the card library. Finished sets are recorded in a
+    refresh journal, so an interrupted refresh skips them when re-run.
+    Returns list of set codes that failed.
+    """
+    set_codes = library_set_codes()
+    done = []
+    if resume and REFRESH_JOURNAL.exists():
+        try:
+            with open(REFRESH_JOURNAL, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if time.time() - state.get('started', 0) <= JOURNAL_MAX_AGE:
+                done = state.get('done', [])
+        except (OSError, ValueError):
+            pass
+
+    state = {'started': time.time(), 'done': done}
+    if done:
+        print(f"Resuming library refresh: {len(done)}/{len(set_codes)} sets already refreshed")
+
+    JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+    failed = []
+    for number, set_code in enumerate(set_codes, 1):
+        if set_code in done:
+            continue
+        print(f"\n[{number}/{len(set_codes)}] {set_code.upper()}")
+        result = fetch_and_save_set(set_code, resume=resume)
+        if result is None:
+            failed.append(set_code)
+            continue
+        record_price_history(result[0])
+        done.append(set_code)
+        write_json_atomic(REFRESH_JOURNAL, state, fsync=True)
+
+    if not failed and REFRESH_JOURNAL.exists():
+        REFRESH_JOURNAL.unlink()
+    return failed
+
+def main(argv=None):
     """Main execution function."""
+    argv = sys.argv[1:] if argv is None else argv
+
     parser = argparse.ArgumentParser(description='Fetch all cards from a Magic: The Gathering set')
-    parser.add_argument('set_identifier', help='Set code (e.g., "dmu") or set name (e.g., "Dominaria United")')
+    parser.add_argument('set_identifier', nargs='?',
+                        help='Set code (e.g., "dmu") or set name (e.g., "Dominaria United")')
+    parser.add_argument('--refresh-library', action='store_true',
+                        help='Re-fetch every set already in the card library')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore checkpoints from an interrupted fetch and start from page 1')
     
-    if len(sys.argv) < 2:
+    if len(argv) < 1:
         print("Usage: python fetch_set_cards.py <set_code_or_name>")
         print("Examples:")
         print("  python fetch_set_cards.py dmu")
         print('  python fetch_set_cards.py "Dominaria United"')
+        print("  python fetch_set_cards.py --refresh-library")
         sys.exit(1)
     
-    args = parser.parse_args()
-    set_identifier = args.set_identifier
+    args = parser.parse_args(argv)
+    if not args.set_identifier and not args.refresh_library:
+        parser.error("a set code or name (or --refresh-library) is required")
     
     print("MTG Set Cards Fetcher")
     print("=" * 40)
+
+    try:
+        if args.refresh_library:
+            failed = refresh_library(resume=not args.restart)
+            print(f"\nNetwork: {get_client().summary()}")
+            if failed:
+                print(f"Failed to refresh {len(failed)} set(s): {', '.join(code.upper() for code in failed)}")
+                print("Re-run to retry them; refreshed sets are skipped.")
+                sys.exit(1)
+            print("Library refresh complete")
+            return
+
+        # Fetch and save cards
+        result = fetch_and_save_set(args.set_identifier, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("\nInterrupted. Fetched pages are checkpointed; re-run the same command to resume.")
+        sys.exit(130)
     
-    # Fetch cards
-    cards, set_name = fetch_cards_from_set(set_identifier)
-    
-    if not cards:
+    if result is None:
         print("No cards found or error occurred.")
         sys.exit(1)
     
-    # Create directory
-    set_dir = create_set_directory(set_name)
-    print(f"Created directory: {set_dir}")
-    
-    # Save cards
-    save_cards(cards, set_dir, set_name)
+    cards, set_name, set_dir = result
+    record_price_history(cards)
     
+    print(f"Network: {get_client().summary()}")
     print(f"\nSuccessfully saved {len(cards)} cards from {set_name}")
     print(f"Files saved in: {set_dir}/")
     print(f"  - all_cards_{cards[0].get('set', 'unknown')}.json (complete set)")
     print(f"  - set_info_{cards[0].get('set', 'unknown')}.json (summary)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+MTG Goldfish Simulator
+
+Monte Carlo simulation of a deck's opening hands and first turns against an
+empty board ("goldfishing"), to check whether its land and ramp counts
+actually produce castable hands.
+
+The decklist is encoded as NumPy arrays of card attributes (land, colors a
+land or mana source produces, mana value, colors needed, ramp flag), and
+every trial is a row of one batch: shuffles, land drops, available mana and
+colors are computed for 100k+ games at once with array operations. Trials
+can be spread over worker processes for larger runs.
+
+Model (simplified on purpose):
+- keep a 7-card hand with between --min-lands and --max-lands lands
+- play one land per turn in the order drawn
+- mana sources (rocks, dorks, land-search ramp) are cast greedily, cheapest
+  first, within the turn's mana and only when its colors cover their colored
+  cost; each adds one mana (of its colors) from the next turn
+- a spell is castable when its mana value fits the available mana and each
+  colored symbol of its cost has a source (hybrid and Phyrexian symbols are
+  ignored)
+- fetch lands produce the basic land types they can find; lands that find
+  any basic produce every color
+
+Reported: keep rate, land drops, average mana, on-curve plays per turn, and
+color-screw probability (holding a spell there is mana for, but not colors).
+
+Usage:
+    python scripts/goldfish.py <deck_file> [--trials N] [--turns T] [--draw] [--workers N]
+
+Example:
+    python scripts/goldfish.py decks/my-deck.txt --trials 200000 --workers 4
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from card_index import load_card_index
+
+COLOR_BITS = {'W': 1, 'U': 2, 'B': 4, 'R': 8, 'G': 16}
+ALL_COLORS = 31
+BASIC_LAND_COLORS = {'plains': 'W', 'island': 'U', 'swamp': 'B', 'mountain': 'R', 'forest': 'G'}
+
+HAND_SIZE = 7
+DEFAULT_TRIALS = 100_000
+DEFAULT_TURNS = 4
+BATCH_SIZE = 50_000  # Trials per array batch (bounds memory)
+RAMP_MAX_CMC = 3
+
+# Oracle text of land-search ramp (Rampant Growth, Cultivate...)
+RAMP_PHRASES = ['search your library for a land', 'search your library for a basic land',
+                'search your library for up to', 'put a land']
+
+
+def color_mask(symbols) -> int:
+    mask = 0
+    for symbol in symbols:
+        mask |= COLOR_BITS.get(symbol, 0)
+    return mask
+
+
+def front_face(card) -> Dict:
+    faces = card.get('card_faces') or []
+    return faces[0] if faces else {}
+
+
+def mana_value(mana_cost: str) -> int:
+    """Mana value of a cost string ({X} counts as 0)"""
+    value = 0
+    for symbol in re.findall(r'\{([^}]+)\}', mana_cost):
+        if symbol.isdigit():
+            value += int(symbol)
+        elif symbol not in ('X', 'Y', 'Z'):
+            value += 1
+    return value
+
+
+def fetched_colors(oracle_text: str) -> int:
+    """Colors a land-searching land or spell can find"""
+    text = oracle_text.lower()
+    if 'basic land card' in text and not any(basic in text for basic in BASIC_LAND_COLORS):
+        return ALL_COLORS
+    return color_mask(color for basic, color in BASIC_LAND_COLORS.items() if basic in text)
+
+
+def card_attributes(card) -> Tuple[bool, int, int, int, bool, int]:
+    """
+    Simulation attributes of one card.
+
+    Returns:
+        (is_land, land colors, mana value, colors needed, is_ramp, ramp colors)
+    """
+    face = front_face(card)
+    type_line = (face.get('type_line') or card.get('type_line', '')).lower()
+    oracle_text = face.get('oracle_text') or card.get('oracle_text', '')
+    produced = color_mask(card.get('produced_mana') or [])
+
+    if 'land' in type_line:
+        if not produced and 'search your library' in oracle_text.lower():
+            produced = fetched_colors(oracle_text)
+        return True, produced, 0, 0, False, 0
+
+    mana_cost = face.get('mana_cost') if face.get('mana_cost') is not None else card.get('mana_cost', '')
+    cmc = mana_value(mana_cost) if face else int(card.get('cmc') or 0)
+    needed = color_mask(re.findall(r'\{([WUBRG])\}', mana_cost))
+
+    ramp_colors = 0
+    is_ramp = False
+    if cmc <= RAMP_MAX_CMC:
+        if card.get('produced_mana'):
+            is_ramp, ramp_colors = True, produced
+        elif any(phrase in oracle_text.lower() for phrase in RAMP_PHRASES) and 'battlefield' in oracle_text.lower():
+            is_ramp, ramp_colors = True, fetched_colors(oracle_text) or ALL_COLORS
+    return False, 0, cmc, needed, is_ramp, ramp_colors
+
+
+def encode_deck(deck: List[Tuple[int, str]], card_data=None):
+    """
+    Expand a parsed deck into one array slot per card copy.
+
+    Returns:
+        (dict of attribute arrays, list of card names not in the library)
+    """
+    card_data = card_data if card_data is not None else load_card_index()
+    rows = []
+    unknown = []
+    for quantity, card_name in deck:
+        library_name = card_data.find(card_name)
+        if library_name is None:
+            unknown.append(card_name)
+            # Unknown cards take up a slot but are never cast
+            attributes = (False, 0, -1, 0, False, 0)
+        else:
+            attributes = card_attributes(card_data[library_name])
+        rows.extend([attributes] * quantity)
+
+    columns = list(zip(*rows)) if rows else [[]] * 6
+    arrays = {
+        'land': np.array(columns[0], dtype=bool),
+        'land_colors': np.array(columns[1], dtype=np.uint8),
+        'cmc': np.array(columns[2], dtype=np.int16),
+        'needed': np.array(columns[3], dtype=np.uint8),
+        'ramp': np.array(columns[4], dtype=bool),
+        'ramp_colors': np.array(columns[5], dtype=np.uint8),
+    }
+    return arrays, unknown
+
+
+def draw_orders(rng: np.random.Generator, trials: int, deck_size: int, cards: int) -> np.ndarray:
+    """(trials, cards) slot indices of the top cards of each shuffled deck (partial Fisher-Yates)"""
+    order = np.tile(np.arange(deck_size, dtype=np.int16), (trials, 1))
+    rows = np.arange(trials)
+    for position in range(cards):
+        swap = position + (rng.random(trials) * (deck_size - position)).astype(np.intp)
+        top = order[rows, position].copy()
+        order[rows, position] = order[rows, swap]
+        order[rows, swap] = top
+    return order[:, :cards]
+
+
+def simulate_batch(deck: Dict[str, np.ndarray], trials: int, turns: int, on_draw: bool,
+                   min_lands: int, max_lands: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Counters of one batch of games (summed over games, per turn where applicable)"""
+    drawn_by = [HAND_SIZE + turn - 1 + on_draw for turn in range(1, turns + 1)]
+    order = draw_orders(rng, trials, len(deck['land']), min(drawn_by[-1], len(deck['land'])))
+    visible_count = order.shape[1]
+
+    land = deck['land'][order]
+    land_colors = deck['land_colors'][order]
+    cmc = deck['cmc'][order]
+    needed = deck['needed'][order]
+    ramp = deck['ramp'][order]
+    ramp_colors = deck['ramp_colors'][order]
+    spell = ~land & (cmc >= 0)
+
+    opening_lands = land[:, :HAND_SIZE].sum(axis=1)
+    keep = (opening_lands >= min_lands) & (opening_lands <= max_lands)
+    land_rank = np.cumsum(land, axis=1)
+    positions = np.arange(visible_count)
+
+    counters = {
+        'trials': np.array(trials),
+        'kept': np.array(keep.sum()),
+        'opening_lands': np.array(opening_lands.sum()),
+        'land_drop': np.zeros(turns, dtype=np.int64),
+        'mana': np.zeros(turns, dtype=np.int64),
+        'on_curve': np.zeros(turns, dtype=np.int64),
+        'color_screw': np.zeros(turns, dtype=np.int64),
+    }
+
+    cast = np.zeros(land.shape, dtype=bool)  # Mana sources cast on earlier turns
+    for turn in range(1, turns + 1):
+        in_hand = positions < min(drawn_by[turn - 1], visible_count)
+        lands_seen = (land & in_hand).sum(axis=1)
+        lands_played = np.minimum(lands_seen, turn)
+        played = land & in_hand & (land_rank <= turn)
+        colors = (np.bitwise_or.reduce(np.where(played, land_colors, 0), axis=1)
+                  | np.bitwise_or.reduce(np.where(cast, ramp_colors, 0), axis=1))
+        mana = lands_played + cast.sum(axis=1)
+
+        affordable = spell & in_hand & (cmc <= mana[:, None])
+        colors_ok = (needed & ~colors[:, None]) == 0
+        curve_play = (affordable & colors_ok & (cmc == turn)).any(axis=1)
+        screwed = (affordable & ~colors_ok).any(axis=1)
+
+        counters['land_drop'][turn - 1] = (keep & (lands_seen >= turn)).sum()
+        counters['mana'][turn - 1] = mana[keep].sum()
+        counters['on_curve'][turn - 1] = (keep & curve_play).sum()
+        counters['color_screw'][turn - 1] = (keep & screwed).sum()
+
+        # Cast mana sources cheapest first while this turn's mana lasts; they produce from the next turn
+        castable = ramp & in_hand & ~cast & colors_ok
+        by_cost = np.argsort(np.where(castable, cmc, np.iinfo(np.int16).max), axis=1, kind='stable')
+        castable_sorted = np.take_along_axis(castable, by_cost, axis=1)
+        spent = np.cumsum(np.where(castable_sorted, np.take_along_axis(cmc, by_cost, axis=1), 0), axis=1)
+        cast_now = np.zeros_like(cast)
+        np.put_along_axis(cast_now, by_cost, castable_sorted & (spent <= mana[:, None]), axis=1)
+        cast |= cast_now
+
+    return counters
+
+
+def simulate(deck: Dict[str, np.ndarray], trials: int, turns: int = DEFAULT_TURNS, on_draw: bool = False,
+             min_lands: int = 2, max_lands: int = 5, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Run trials in batches and sum their counters"""
+    rng = np.random.default_rng(seed)
+    totals = None
+    remaining = trials
+    while remaining > 0:
+        batch = min(BATCH_SIZE, remaining)
+        counters = simulate_batch(deck, batch, turns, on_draw, min_lands, max_lands, rng)
+        totals = counters if totals is None else {key: totals[key] + counters[key] for key in totals}
+        remaining -= batch
+    return totals
+
+
+def simulate_parallel(deck: Dict[str, np.ndarray], trials: int, workers: int, seed: Optional[int] = None,
+                      **options) -> Dict[str, np.ndarray]:
+    """Split trials over worker processes, each with an independent random stream"""
+    if workers <= 1:
+        return simulate(deck, trials, seed=seed, **options)
+
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shares = [trials // workers + (1 if worker < trials % workers else 0) for worker in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(simulate, deck, share, seed=worker_seed, **options)
+                   for share, worker_seed in zip(shares, seeds) if share]
+        results = [future.result() for future in futures]
+
+    totals = results[0]
+    for counters in results[1:]:
+        totals = {key: totals[key] + counters[key] for key in totals}
+    return totals
+
+
+def load_deck(file_path) -> List[Tuple[int, str]]:
+    """Library cards of a deck (the commander of a Commander deck stays in the command zone)"""
+    from commander_deck_validator import parse_deck_file
+    from check_deck_price import parse_decklist
+
+    commander, main_deck, _ = parse_deck_file(file_path)
+    if commander and main_deck:
+        return [(quantity, card_name) for card_name, quantity in main_deck.items()]
+    main_deck, _ = parse_decklist(file_path)
+    return main_deck
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Goldfish a deck: opening hands, land drops and castable curve')
+    parser.add_argument('deck_file', help='Deck file path')
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS, help=f'Games to simulate (default: {DEFAULT_TRIALS})')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS, help=f'Turns per game (default: {DEFAULT_TURNS})')
+    parser.add_argument('--draw', action='store_true', help='Simulate being on the draw')
+    parser.add_argument('--min-lands', type=int, default=2, help='Fewest lands in a kept 7 (default: 2)')
+    parser.add_argument('--max-lands', type=int, default=5, help='Most lands in a kept 7 (default: 5)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    args = parser.parse_args(argv)
+
+    deck_list = load_deck(args.deck_file)
+    deck, unknown = encode_deck(deck_list)
+    deck_size = len(deck['land'])
+    if deck_size < HAND_SIZE + args.turns:
+        print(f"Error: {deck_size} cards is too few to simulate {args.turns} turns")
+        return
+
+    start = time.perf_counter()
+    totals = simulate_parallel(deck, args.trials, args.workers, seed=args.seed, turns=args.turns,
+                               on_draw=args.draw, min_lands=args.min_lands, max_lands=args.max_lands)
+    elapsed = time.perf_counter() - start
+
+    trials = int(totals['trials'])
+    kept = int(totals['kept'])
+    keep_rate = kept / trials
+    lands = int(deck['land'].sum())
+    ramp = int(deck['ramp'].sum())
+
+    print(f"\n{'='*60}")
+    print(f"GOLDFISH SIMULATION ({trials:,} games, on the {'draw' if args.draw else 'play'})")
+    print(f"{'='*60}")
+    print(f"Deck: {args.deck_file} ({deck_size} cards, {lands} lands, {ramp} ramp)")
+    if unknown:
+        print(f"[WARNING] {len(unknown)} card(s) not in the library (never cast): {', '.join(unknown[:5])}")
+    print(f"{'='*60}")
+
+    print("OPENING HAND:")
+    print(f"  Keepable 7 ({args.min_lands}-{args.max_lands} lands): {keep_rate:.1%}")
+    print(f"  Keepable by the first mulligan:   {1 - (1 - keep_rate) ** 2:.1%}")
+    print(f"  Average lands in opening 7:       {int(totals['opening_lands']) / trials:.2f}")
+
+    print(f"\nKEPT HANDS BY TURN:")
+    print(f"  {'Turn':>4} {'Land drop':>10} {'Avg mana':>9} {'On curve':>9} {'Color screw':>12}")
+    for turn in range(args.turns):
+        share = lambda key: int(totals[key][turn]) / kept if kept else 0.0
+        print(f"  {turn + 1:>4} {share('land_drop'):>10.1%} {share('mana'):>9.2f} "
+              f"{share('on_curve'):>9.1%} {share('color_screw'):>12.1%}")
+
+    print(f"\nOn curve = a spell of exactly that mana value is castable; color screw = a spell is affordable")
+    print(f"but a color of its cost is missing. Simulated in {elapsed * 1000:.0f}ms"
+          f"{f' on {args.workers} workers' if args.workers > 1 else ''}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+MTG Card Library Watcher
+
+Keeps an in-memory index of the card-library directory current without
+re-reading the whole library. Each poll stats every all_cards_*.json file and
+only parses the files that were added or changed since the previous poll;
+removed files are dropped from the index.
+
+Cards are held as the parsed Scryfall dicts, which is fastest for commands
+that scan the library once. A long-lived watcher (the watch command) passes
+compact=True to hold card_record.Card records instead (about a tenth of the
+memory, at the cost of converting every card on load).
+
+The watcher exposes a version counter that increases whenever the index
+changes, so callers can key their own caches on it. For caches that outlive
+the process, library_fingerprint() gives a stable digest of the library state.
+
+Concurrent fetches and queries:
+- writers (fetch_set_cards.py) publish through library_writer(): an
+  exclusive lock (flock, or msvcrt on Windows) serialises them, every file
+  is replaced atomically, and a generation counter (card-library/.generation)
+  is odd while a set is being published and even once it is complete
+- library_fingerprint() reads the counter before and after its scan
+  (seqlock style), so it never describes a half-published set
+- a replaced card file is kept (hard-linked) under card-library/.retired/
+  for RETIRED_MAX_AGE, so an index built on the previous generation can
+  still open the exact version it describes (open_version) instead of
+  reading another file's bytes at its offsets
+- readers take a file's stat from the open descriptor (open_pinned), so the
+  stat they record always matches the content they read
+
+Usage:
+    python scripts/library_watcher.py [--interval SECONDS]
+
+Example:
+    python scripts/library_watcher.py --interval 5
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from card_record import Card
+
+# Project layout (resolved relative to this script, not the working directory)
+PROJECT_ROOT = Path(__file__).parent.parent
+CARD_LIBRARY_PATH = PROJECT_ROOT / "card-library"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+DATA_DIR = PROJECT_ROOT / ".data"  # Generated stores that are not rebuildable caches
+
+# Writer coordination files inside the card library
+GENERATION_FILE = ".generation"
+WRITE_LOCK_FILE = ".write.lock"
+RETIRED_DIR = ".retired"
+PUBLISH_WAIT = 30.0  # Longest a fingerprint waits for a publish in progress (seconds)
+RETIRED_MAX_AGE = 3600  # How long replaced card file versions stay readable (seconds)
+
+
+class LibraryVersionError(OSError):
+    """The card file version an index was built from is no longer available"""
+
+
+def scan_library(library_path: Path = CARD_LIBRARY_PATH) -> Dict[str, Tuple[int, int]]:
+    """
+    Stat every all_cards_*.json file in the library.
+
+    Returns:
+        dict: relative file path -> (mtime_ns, size)
+    """
+    stats = {}
+    library_path = Path(library_path)
+
+    if not library_path.exists():
+        return stats
+
+    with os.scandir(library_path) as set_dirs:
+        for set_dir in set_dirs:
+            if not set_dir.is_dir() or set_dir.name.startswith('.'):
+                continue
+            with os.scandir(set_dir.path) as files:
+                for entry in files:
+                    if entry.name.startswith("all_cards_") and entry.name.endswith(".json"):
+                        st = entry.stat()
+                        stats[f"{set_dir.name}/{entry.name}"] = (st.st_mtime_ns, st.st_size)
+
+    return stats
+
+
+def library_generation(library_path: Path = CARD_LIBRARY_PATH) -> int:
+    """Publish counter of the library (odd while a writer is publishing)"""
+    try:
+        with open(Path(library_path) / GENERATION_FILE, 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def set_library_generation(library_path: Path, generation: int) -> None:
+    write_atomic(Path(library_path) / GENERATION_FILE, str(generation).encode('utf-8'))
+
+
+def lock_file(lock, shared: bool = False, blocking: bool = True) -> bool:
+    """
+    Lock an open lock file: flock where available, else (Windows) an msvcrt
+    lock on its first byte, which is always exclusive.
+
+    Returns:
+        bool: False if blocking is off and another process holds the lock
+    """
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        lock.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+    try:
+        fcntl.flock(lock, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        return False
+    return True
+
+
+def unlock_file(lock) -> None:
+    """Release a lock taken with lock_file()"""
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """Exclusive lock on lock_path for the duration of the block (other holders wait)"""
+    with open(lock_path, 'a') as lock:
+        lock_file(lock)
+        try:
+            yield
+        finally:
+            unlock_file(lock)
+
+
+def writer_active(library_path: Path = CARD_LIBRARY_PATH) -> bool:
+    """Whether a writer currently holds the library's publish lock"""
+    try:
+        lock = open(Path(library_path) / WRITE_LOCK_FILE, 'r')
+    except FileNotFoundError:
+        return False
+    with lock:
+        if not lock_file(lock, shared=True, blocking=False):
+            return True
+        unlock_file(lock)
+    return False
+
+
+def repair_generation(library_path: Path = CARD_LIBRARY_PATH) -> None:
+    """Close the publish a killed writer left open (odd generation, lock free)"""
+    with open(Path(library_path) / WRITE_LOCK_FILE, 'a') as lock:
+        if not lock_file(lock, blocking=False):
+            return  # A new writer got there first
+        try:
+            generation = library_generation(library_path)
+            if generation % 2:
+                set_library_generation(library_path, generation + 1)
+        finally:
+            unlock_file(lock)
+
+
+@contextmanager
+def library_writer(library_path: Path = CARD_LIBRARY_PATH):
+    """
+    Exclusive publish section for changing card files. Writers wait for each
+    other; readers are never blocked. Yields publish(tmp_path, path), which
+    renames a fully written temporary file into place and retires the
+    version it replaces.
+    """
+    library_path = Path(library_path)
+    library_path.mkdir(parents=True, exist_ok=True)
+    with file_lock(library_path / WRITE_LOCK_FILE):
+        generation = library_generation(library_path)
+        published = generation + 2 + generation % 2
+        retired_dir = library_path / RETIRED_DIR / str(published)
+
+        def publish(tmp_path: Path, path: Path) -> None:
+            path = Path(path)
+            if path.exists():
+                retired = retired_dir / os.path.relpath(path, library_path)
+                retired.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, retired)
+                except OSError:
+                    pass  # No hard links here: readers of the old version get LibraryVersionError
+            os.replace(tmp_path, path)
+
+        set_library_generation(library_path, published - 1)
+        try:
+            yield publish
+        finally:
+            set_library_generation(library_path, published)
+            prune_retired(library_path)
+
+
+def prune_retired(library_path: Path, max_age: float = RETIRED_MAX_AGE) -> None:
+    """Delete retired card file versions older than max_age"""
+    retired_root = Path(library_path) / RETIRED_DIR
+    if not retired_root.exists():
+        return
+    cutoff = time.time() - max_age
+    for generation_dir in retired_root.iterdir():
+        if generation_dir.stat().st_mtime < cutoff:
+            shutil.rmtree(generation_dir, ignore_errors=True)
+
+
+def temp_path(path: Path) -> Path:
+    """Process-unique temporary name next to path (same suffix, so numpy does not add one)"""
+    path = Path(path)
+    return path.with_name(f".{path.stem}.{os.getpid()}.tmp{path.suffix}")
+
+
+def write_temp(path: Path, data: bytes, fsync: bool = False) -> Path:
+    """
+    Write bytes to a process-unique temporary file next to path.
+    With fsync, the data is on disk before the caller renames it into place.
+
+    Returns:
+        Path: the temporary file
+    """
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    return tmp_path
+
+
+def write_atomic(path: Path, data: bytes, fsync: bool = False) -> None:
+    """Write bytes to a temporary file, then rename it into place"""
+    os.replace(write_temp(path, data, fsync), path)
+
+
+def write_json_temp(path: Path, data: Any, indent: Optional[int] = None, fsync: bool = False) -> Path:
+    """write_temp() of a JSON document (UTF-8, non-ASCII kept as is)"""
+    return write_temp(path, json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8'), fsync)
+
+
+def write_json_atomic(path: Path, data: Any, indent: Optional[int] = None, fsync: bool = False) -> None:
+    """Write JSON to a process-unique temporary file, then rename it into place"""
+    os.replace(write_json_temp(path, data, indent, fsync), path)
+
+
+def prune_cache(pattern: str, max_age: float = RETIRED_MAX_AGE, cache_dir: Path = CACHE_DIR) -> None:
+    """
+    Delete cache files matching pattern that were superseded more than
+    max_age ago. A file is superseded when the next newer file of the same
+    pattern is written; until then processes still on the previous library
+    generation may open it (printing tables and text columns are opened lazily).
+    """
+    files = []
+    for path in Path(cache_dir).glob(pattern):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    files.sort()
+    cutoff = time.time() - max_age
+    for (_, path), (superseded, _) in zip(files, files[1:]):
+        if superseded < cutoff:
+            path.unlink(missing_ok=True)
+
+
+def library_fingerprint(library_path: Path = CARD_LIBRARY_PATH) -> str:
+    """
+    Digest of the library file listing, sizes and mtimes (changes whenever any set changes).
+    Taken between publishes: the scan is repeated if a writer published meanwhile.
+    An odd generation whose writer is gone (killed mid-publish) is repaired.
+    """
+    deadline = time.monotonic() + PUBLISH_WAIT
+    while True:
+        generation = library_generation(library_path)
+        if generation % 2 and time.monotonic() < deadline:
+            if writer_active(library_path):
+                time.sleep(0.01)
+            else:
+                repair_generation(library_path)
+            continue
+        stats = scan_library(library_path)
+        if library_generation(library_path) == generation or time.monotonic() >= deadline:
+            break
+
+    digest = hashlib.sha1()
+    for rel_path, (mtime_ns, size) in sorted(stats.items()):
+        digest.update(f"{rel_path}:{mtime_ns}:{size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def open_pinned(path: Path):
+    """
+    Open a card file for reading with the stat of the opened file itself.
+    Files are replaced atomically, so the descriptor keeps reading the version
+    described by the stat even if a writer publishes a new one.
+
+    Returns:
+        (binary file object, (mtime_ns, size))
+    """
+    f = open(path, 'rb')
+    st = os.fstat(f.fileno())
+    return f, (st.st_mtime_ns, st.st_size)
+
+
+def open_version(library_path: Path, rel_path: str, stat):
+    """
+    open_pinned() of the version of a card file with the given (mtime_ns, size):
+    the current file, or its retired copy if a writer has replaced it since.
+
+    Raises:
+        LibraryVersionError: if that version is no longer kept
+    """
+    library_path = Path(library_path)
+    stat = tuple(stat)
+    try:
+        f, current = open_pinned(library_path / rel_path)
+    except FileNotFoundError:
+        pass
+    else:
+        if current == stat:
+            return f, current
+        f.close()
+
+    retired_root = library_path / RETIRED_DIR
+    generations = sorted((int(name) for name in os.listdir(retired_root) if name.isdigit()),
+                         reverse=True) if retired_root.exists() else []
+    for generation in generations:
+        try:
+            f, retired = open_pinned(retired_root / str(generation) / rel_path)
+        except FileNotFoundError:
+            continue
+        if retired == stat:
+            return f, retired
+        f.close()
+    raise LibraryVersionError(f"{rel_path} has changed since the card index was built")
+
+
+def read_card_file(path: Path) -> List[Dict[str, Any]]:
+    """Read one all_cards_*.json file (either a list of cards or a Scryfall list object)"""
+    return read_pinned_card_file(path)[0]
+
+
+def read_pinned_card_file(path: Path) -> Tuple[List[Dict[str, Any]], Tuple[int, int]]:
+    """read_card_file() plus the (mtime_ns, size) of the version that was read"""
+    f, stat = open_pinned(path)
+    with f:
+        set_data = json.loads(f.read().decode('utf-8'))
+    return parse_card_file(set_data), stat
+
+
+def parse_card_file(set_data) -> List[Dict[str, Any]]:
+    if isinstance(set_data, list):
+        return set_data
+    if isinstance(set_data, dict) and 'data' in set_data:
+        return set_data['data']
+    raise ValueError("unexpected card file structure")
+
+
+class LibraryWatcher:
+    """Incrementally maintained index of every card in the card library"""
+
+    def __init__(self, library_path: Optional[Path] = None, compact: bool = False):
+        self.library_path = Path(library_path) if library_path else CARD_LIBRARY_PATH
+        self.compact = compact
+        self.version = 0
+        self.errors: List[Tuple[str, str]] = []
+
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._files: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_name: Optional[Dict[str, Dict[str, Any]]] = None
+        self._file_names: Dict[str, Dict[str, Dict[str, Any]]] = {}  # rel path -> {name: last printing there}
+        self._name_files: Optional[Dict[str, Set[str]]] = None  # name -> rel paths holding it (built on first change)
+        self._pending: Set[str] = set()  # Files changed since by_name() was last brought up to date
+
+    def poll(self) -> Dict[str, List[str]]:
+        """
+        Ingest new, changed or removed card files.
+
+        Files that fail to parse (e.g. half-written) keep their previous
+        contents and are retried on the next poll.
+
+        Returns:
+            dict: {'added': [...], 'changed': [...], 'removed': [...]} relative paths
+        """
+        changes = {'added': [], 'changed': [], 'removed': []}
+        self.errors = []
+
+        current = scan_library(self.library_path)
+
+        for rel_path in sorted(set(self._stats) - set(current)):
+            del self._stats[rel_path]
+            del self._files[rel_path]
+            self._pending.add(rel_path)
+            changes['removed'].append(rel_path)
+
+        for rel_path, stat in sorted(current.items()):
+            previous = self._stats.get(rel_path)
+            if previous == stat:
+                continue
+
+            try:
+                # The stat of the version actually read (a writer may have published since the scan)
+                cards, stat = read_pinned_card_file(self.library_path / rel_path)
+                if self.compact:
+                    cards = [Card.from_dict(card) for card in cards]
+            except (OSError, ValueError) as e:
+                self.errors.append((rel_path, str(e)))
+                continue
+
+            self._stats[rel_path] = stat
+            self._files[rel_path] = cards
+            self._pending.add(rel_path)
+            changes['changed' if previous else 'added'].append(rel_path)
+
+        if any(changes.values()):
+            self.version += 1
+
+        return changes
+
+    def watch(self, interval: float = 2.0,
+              callback: Optional[Callable[[Dict[str, List[str]]], None]] = None) -> None:
+        """Poll forever, calling callback(changes) whenever the library changes"""
+        while True:
+            changes = self.poll()
+            if callback and any(changes.values()):
+                callback(changes)
+            time.sleep(interval)
+
+    def files(self) -> List[str]:
+        """Relative paths of every indexed card file"""
+        return sorted(self._files)
+
+    def file_cards(self, rel_path: str) -> List[Dict[str, Any]]:
+        """Cards loaded from one card file"""
+        return self._files.get(rel_path, [])
+
+    def cards(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every indexed card (printing), in file order"""
+        for rel_path in sorted(self._files):
+            yield from self._files[rel_path]
+
+    def card_count(self) -> int:
+        """Number of indexed printings"""
+        return sum(len(cards) for cards in self._files.values())
+
+    def _index_names(self, rel_path: str) -> Dict[str, Dict[str, Any]]:
+        """Last printing of each name in one file (recorded for by_name() updates)"""
+        names = {}
+        for card in self._files[rel_path]:
+            card_name = card.get('name', '')
+            if card_name:
+                names[card_name] = card
+        self._file_names[rel_path] = names
+        return names
+
+    def by_name(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Name-keyed view of the library (later files win). Built on first use,
+        then updated only for the names of files that changed since.
+        """
+        if self._by_name is None:
+            self._by_name = {}
+            for rel_path in sorted(self._files):
+                self._by_name.update(self._index_names(rel_path))
+            self._pending = set()
+        if not self._pending:
+            return self._by_name
+
+        if self._name_files is None:
+            self._name_files = {}
+            for rel_path, names in self._file_names.items():
+                for card_name in names:
+                    self._name_files.setdefault(card_name, set()).add(rel_path)
+
+        affected: Dict[str, None] = {}
+        for rel_path in sorted(self._pending):
+            for card_name in self._file_names.pop(rel_path, {}):
+                self._name_files[card_name].discard(rel_path)
+                affected[card_name] = None
+            if rel_path in self._files:
+                for card_name in self._index_names(rel_path):
+                    self._name_files.setdefault(card_name, set()).add(rel_path)
+                    affected[card_name] = None
+        self._pending = set()
+
+        for card_name in affected:
+            holders = self._name_files.get(card_name)
+            if holders:
+                self._by_name[card_name] = self._file_names[max(holders)][card_name]
+            else:
+                self._by_name.pop(card_name, None)
+                self._name_files.pop(card_name, None)
+        return self._by_name
+
+
+_shared_library: Optional[LibraryWatcher] = None
+
+
+def get_library() -> LibraryWatcher:
+    """Process-wide watcher shared by all commands, polled so it reflects the current library"""
+    global _shared_library
+
+    if _shared_library is None:
+        _shared_library = LibraryWatcher()
+    _shared_library.poll()
+    return _shared_library
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Watch the card library and report incremental changes')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls (default: 2)')
+    args = parser.parse_args(argv)
+
+    watcher = LibraryWatcher(compact=True)
+
+    start = time.time()
+    changes = watcher.poll()
+    print(f"Indexed {watcher.card_count()} cards from {len(changes['added'])} files "
+          f"in {time.time() - start:.2f}s (version {watcher.version})")
+    for rel_path, error in watcher.errors:
+        print(f"  Warning: Could not load {rel_path}: {error}")
+
+    def report(changes):
+        print(f"Library version {watcher.version}: {watcher.card_count()} cards")
+        for kind in ('added', 'changed', 'removed'):
+            for rel_path in changes[kind]:
+                print(f"  {kind}: {rel_path}")
+        for rel_path, error in watcher.errors:
+            print(f"  Warning: Could not load {rel_path}: {error}")
+
+    print(f"Watching {watcher.library_path} (Ctrl-C to stop)...")
+    try:
+        watcher.watch(args.interval, report)
+    except KeyboardInterrupt:
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+MTG Helper - unified command line entry point
+
+One command for every helper script. Subcommand modules (and heavy
+dependencies such as requests and numpy) are imported only when that
+subcommand runs, so trivial commands start fast. All commands in a process
+share one card-library index (library_watcher.get_library).
+
+Usage:
+    python scripts/mtg.py <command> [arguments...]
+
+Commands:
+    search     Search cards by name, rules text or type    (search_cards.py)
+    validate   Validate a Commander deck                   (commander_deck_validator.py)
+    count      Count cards in a deck file                  (count_deck_cards.py)
+    price      Check a deck against the $30 budget         (check_deck_price.py)
+    fetch      Fetch a set from Scryfall                   (fetch_set_cards.py)
+    rules      Search rules and format documents           (rules_index.py)
+    bans       Banned/restricted status of cards           (banned_list.py)
+    rulings    Card rulings for a deck or search           (rulings.py)
+    card       Look up a card or printing by offset index  (card_index.py)
+    complete   Card name prefix completion                 (autocomplete.py)
+    sets       Set code/name catalog                       (set_catalog.py)
+    regex      Regex search over rules text                (regex_search.py)
+    cache      Query result cache status                   (query_cache.py)
+    watch      Watch the card library for changes          (library_watcher.py)
+    matrix     Card attribute analytics                    (card_matrix.py)
+    recommend  Commander card recommendations              (recommend.py)
+    commanders Commander candidates by color identity      (commander_index.py)
+    history    Local price history                         (price_history.py)
+    budget     Cheapest printings and budget substitutes   (budget_optimizer.py)
+    collection Collection coverage of decklists            (collection.py)
+    goldfish   Opening-hand and mana simulation            (goldfish.py)
+    cassettes  Record/replay Scryfall responses            (scryfall_cassettes.py)
+    startup    Measure cold-start time against the budget
+
+Example:
+    python scripts/mtg.py search "Lightning Bolt" --set lea
+    python scripts/mtg.py validate decks/my-commander-deck.txt
+
+To run it as `mtg`, add an alias or symlink, e.g.:
+    ln -s "$PWD/scripts/mtg.py" ~/.local/bin/mtg
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Subcommand -> (module, help text). Modules are imported on demand.
+COMMANDS = {
+    'search': ('search_cards', 'Search cards by name, rules text or type'),
+    'validate': ('commander_deck_validator', 'Validate a Commander deck'),
+    'count': ('count_deck_cards', 'Count cards in a deck file'),
+    'price': ('check_deck_price', 'Check a deck against the $30 Value Vintage budget'),
+    'fetch': ('fetch_set_cards', 'Fetch all cards of a set from Scryfall'),
+    'rules': ('rules_index', 'Search the rules and format documents'),
+    'bans': ('banned_list', 'Banned/restricted status of cards by format'),
+    'rulings': ('rulings', 'Rulings of a deck, search result or card from the local store'),
+    'card': ('card_index', 'Look up a card, printing or oracle id through the offset index'),
+    'complete': ('autocomplete', 'Complete a card name prefix (ranked by EDHREC)'),
+    'sets': ('set_catalog', 'Look up set codes and names in the local catalog'),
+    'regex': ('regex_search', 'Regex search over every card\'s rules text'),
+    'cache': ('query_cache', 'Show or clear the query result cache'),
+    'watch': ('library_watcher', 'Watch the card library for changes'),
+    'matrix': ('card_matrix', 'Mana curve, type and set analytics from the card matrix'),
+    'recommend': ('recommend', 'Commander card recommendations for a deck'),
+    'commanders': ('commander_index', 'Commander candidates by color identity and pairings'),
+    'history': ('price_history', 'Local price history of decks and cards'),
+    'budget': ('budget_optimizer', 'Cheapest printings and budget substitutes for a deck'),
+    'collection': ('collection', 'Collection coverage and cost to complete decklists'),
+    'goldfish': ('goldfish', 'Opening-hand and mana development simulation'),
+    'cassettes': ('scryfall_cassettes', 'Record/replay Scryfall responses for offline runs'),
+}
+
+# Cold-start budget: milliseconds allowed on top of a bare interpreter start
+STARTUP_BUDGET_MS = {
+    '--help': 50,
+    'count': 50,
+}
+
+
+def run_command(command, argv):
+    """Import the subcommand's module and run its main() with the remaining arguments"""
+    import importlib
+
+    module_name, _ = COMMANDS[command]
+    module = importlib.import_module(module_name)
+    return module.main(argv)
+
+
+def median_runtime(args, runs):
+    """Median wall time in milliseconds of running a command in a fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def measure_startup(runs=5):
+    """Time trivial commands in fresh interpreters; returns True if all are within budget"""
+    script = os.path.abspath(__file__)
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as deck:
+        deck.write("1x Sol Ring\n59x Island\n")
+    try:
+        baseline = median_runtime([sys.executable, '-c', 'pass'], runs)
+        checks = {
+            '--help': [sys.executable, script, '--help'],
+            'count': [sys.executable, script, 'count', deck.name],
+        }
+
+        print(f"STARTUP TIMES (median of {runs}, bare interpreter {baseline:.0f}ms):")
+        within_budget = True
+        for label, args in checks.items():
+            overhead = median_runtime(args, runs) - baseline
+            ok = overhead <= STARTUP_BUDGET_MS[label]
+            within_budget &= ok
+            print(f"  mtg {label:<8} +{overhead:>5.0f}ms  (budget +{STARTUP_BUDGET_MS[label]}ms)  "
+                  f"{'OK' if ok else 'OVER BUDGET'}")
+    finally:
+        os.unlink(deck.name)
+
+    return within_budget
+
+
+def main():
+    # Script subcommands own their options (including --help), so hand them everything after the name
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        run_command(argv[0], argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        prog='mtg',
+        description='MTG Helper command line tools',
+        epilog="Run 'mtg <command> --help' or 'mtg <command>' for command usage."
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='<command>')
+
+    for command, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(command, help=help_text)
+
+    startup_parser = subparsers.add_parser('startup', help='Measure cold-start time against the budget')
+    startup_parser.add_argument('--runs', type=int, default=5, help='Runs per command (default: 5)')
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.command == 'startup':
+        sys.exit(0 if measure_startup(args.runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+MTG Local Price History
+
+Append-only, columnar time series of card prices stored in .data/price-history/:
+
+- cards.tsv        card dictionary: Scryfall id, oracle id, name, set, lang
+                   (row number = card code)
+- <column>.bin     one raw NumPy array per column (day, card, usd, usd_foil,
+                   eur, tix), appended in lock step
+
+Only prices that changed since a card's previous record are appended, so a
+daily ingest of an unchanged library costs almost nothing. Queries read the
+columns with np.fromfile and answer "as of" lookups with searchsorted.
+A torn append (e.g. Ctrl-C) is ignored by truncating to the shortest column,
+and cut off by the next writer. Writers (concurrent fetches and price checks)
+take an exclusive lock on the store and read what others appended first.
+
+Prices are captured by fetch_set_cards.py after every fetch, by
+check_deck_price.py for every printing it looks up, and by the ingest command,
+which dates each set's prices by when the set was fetched (set_info fetched_at).
+
+Usage:
+    python scripts/price_history.py ingest
+    python scripts/price_history.py deck <deck_file_path> [--days 90] [--step 7]
+    python scripts/price_history.py risers [--pct 20] [--days 90] [--top 25]
+    python scripts/price_history.py card "<card name>" [--days 90]
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from library_watcher import DATA_DIR, LibraryWatcher, file_lock
+
+HISTORY_DIR = DATA_DIR / "price-history"
+LOCK_FILE = ".lock"
+
+PRICE_FIELDS = ['usd', 'usd_foil', 'eur', 'tix']
+COLUMNS = {'day': np.int32, 'card': np.int32, **{field: np.float32 for field in PRICE_FIELDS}}
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# Basic lands are free in $30 Value Vintage (same rule as check_deck_price.py)
+FREE_BASICS = {"plains", "island", "swamp", "mountain", "forest"}
+
+
+def to_day(date: datetime.date) -> int:
+    """Days since 1970-01-01"""
+    return (date - EPOCH).days
+
+
+def from_day(day: int) -> datetime.date:
+    """Inverse of to_day()"""
+    return EPOCH + datetime.timedelta(days=int(day))
+
+
+def today() -> int:
+    """Current UTC day number"""
+    return to_day(datetime.datetime.now(datetime.timezone.utc).date())
+
+
+def fetched_day(set_dir: Path) -> Optional[int]:
+    """Day a set directory was fetched, from the fetched_at of its set_info file (None if unknown)"""
+    for info_file in sorted(set_dir.glob("set_info_*.json")):
+        try:
+            fetched_at = json.loads(info_file.read_text(encoding='utf-8'))['fetched_at']
+            return to_day(datetime.datetime.strptime(fetched_at, '%Y-%m-%d %H:%M:%S UTC').date())
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return None
+
+
+def parse_price(value) -> float:
+    """Scryfall price string to float (NaN when missing)"""
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PriceHistory:
+    """Append-only columnar price store"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else HISTORY_DIR
+        self.card_ids: List[str] = []
+        self.card_info: List[Tuple[str, str, str, str]] = []  # (oracle_id, name, set, lang)
+        self.codes: Dict[str, int] = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Read the card dictionary and every column"""
+        self.card_ids, self.card_info, self.codes = [], [], {}
+        self.columns = {column: np.zeros(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+        self._latest = np.zeros((0, len(PRICE_FIELDS)), dtype=np.float32)
+        self._latest_day = np.zeros(0, dtype=np.int32)
+        self._dictionary_end = 0
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Read the dictionary lines and records appended since the last read"""
+        dictionary = self.path / "cards.tsv"
+        if dictionary.exists():
+            with open(dictionary, 'rb') as f:
+                f.seek(self._dictionary_end)
+                for line in f:
+                    fields = line.decode('utf-8', 'replace').rstrip('\n').split('\t')
+                    if not line.endswith(b'\n') or len(fields) != 5:
+                        break  # torn final line
+                    self.codes[fields[0]] = len(self.card_ids)
+                    self.card_ids.append(fields[0])
+                    self.card_info.append(tuple(fields[1:]))
+                    self._dictionary_end += len(line)
+        self._grow_latest()
+
+        start = len(self)
+        appended = {}
+        for column, dtype in COLUMNS.items():
+            column_file = self.path / f"{column}.bin"
+            appended[column] = (np.fromfile(column_file, dtype=dtype, offset=start * np.dtype(dtype).itemsize)
+                                if column_file.exists() else np.zeros(0, dtype=dtype))
+
+        # A torn append (shorter columns) or records of cards not in the dictionary read yet are left for later
+        length = min(len(values) for values in appended.values())
+        unknown = np.nonzero(appended['card'][:length] >= len(self.card_ids))[0]
+        if len(unknown):
+            length = int(unknown[0])
+        if length:
+            self._append_columns({column: values[:length] for column, values in appended.items()})
+
+    def _grow_latest(self) -> None:
+        """Extend the latest-price table to every card in the dictionary"""
+        if len(self._latest) < len(self.card_ids):
+            grown = np.full((len(self.card_ids), len(PRICE_FIELDS)), np.nan, dtype=np.float32)
+            grown[:len(self._latest)] = self._latest
+            self._latest = grown
+            grown_day = np.full(len(self.card_ids), np.iinfo(np.int32).min, dtype=np.int32)
+            grown_day[:len(self._latest_day)] = self._latest_day
+            self._latest_day = grown_day
+
+    def _append_columns(self, new_columns: Dict[str, np.ndarray]) -> None:
+        """Add records to the in-memory columns and the latest-price table"""
+        for column, values in new_columns.items():
+            self.columns[column] = np.concatenate([self.columns[column], values])
+
+        cards, days = new_columns['card'], new_columns['day']
+        if len(cards):
+            # Each card's record with the latest day wins (the last appended among equal days);
+            # a backdated record (e.g. ingest of an old fetch) does not replace a newer one
+            order = np.lexsort((np.arange(len(cards)), days, cards))
+            rows = order[np.append(cards[order][1:] != cards[order][:-1], True)]
+            rows = rows[days[rows] >= self._latest_day[cards[rows]]]
+            self._latest_day[cards[rows]] = days[rows]
+            for index, field in enumerate(PRICE_FIELDS):
+                self._latest[cards[rows], index] = new_columns[field][rows]
+
+    def __len__(self):
+        return len(self.columns['day'])
+
+    def last_prices(self) -> np.ndarray:
+        """(n_cards, n_price_fields) array of each card's latest-dated recorded prices (NaN if none)"""
+        return self._latest
+
+    def record(self, cards: Iterable[Dict[str, Any]], day: Optional[int] = None) -> int:
+        """
+        Append the prices of the given card records (changed prices only).
+        Writers in other processes are serialised by a lock on the store, and
+        each one first reads what the others appended, so card codes stay
+        unique and the columns stay aligned.
+
+        Returns:
+            int: number of price records appended
+        """
+        day = today() if day is None else day
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        with file_lock(self.path / LOCK_FILE):
+            self._catch_up()
+            self._truncate_torn()
+            return self._record(cards, day)
+
+    def _truncate_torn(self) -> None:
+        """Cut what a killed writer left past the last complete dictionary line and record"""
+        dictionary = self.path / "cards.tsv"
+        if dictionary.exists() and dictionary.stat().st_size > self._dictionary_end:
+            os.truncate(dictionary, self._dictionary_end)
+        for column, dtype in COLUMNS.items():
+            column_file = self.path / f"{column}.bin"
+            size = len(self) * np.dtype(dtype).itemsize
+            if column_file.exists() and column_file.stat().st_size > size:
+                os.truncate(column_file, size)
+
+    def _record(self, cards: Iterable[Dict[str, Any]], day: int) -> int:
+        new_cards = []
+        codes, prices = [], []
+        for card in cards:
+            card_id = card.get('id')
+            if not card_id:
+                continue
+            code = self.codes.get(card_id)
+            if code is None:
+                code = len(self.card_ids)
+                info = (card.get('oracle_id') or '', card.get('name', '').replace('\t', ' '),
+                        card.get('set', ''), card.get('lang', 'en'))
+                self.codes[card_id] = code
+                self.card_ids.append(card_id)
+                self.card_info.append(info)
+                new_cards.append((card_id,) + info)
+            card_prices = card.get('prices') or {}
+            codes.append(code)
+            prices.append([parse_price(card_prices.get(field)) for field in PRICE_FIELDS])
+
+        if new_cards:
+            lines = ''.join('\t'.join(fields) + '\n' for fields in new_cards).encode('utf-8')
+            with open(self.path / "cards.tsv", 'ab') as f:
+                f.write(lines)
+            self._dictionary_end += len(lines)
+
+        codes = np.array(codes, dtype=np.int32)
+        prices = np.array(prices, dtype=np.float32).reshape(-1, len(PRICE_FIELDS))
+
+        # Skip cards whose prices are unchanged since their last record on or before this day (NaN == NaN)
+        self._grow_latest()
+        previous = self._latest[codes]
+        backdated = np.nonzero(self._latest_day[codes] > day)[0]
+        if len(backdated):
+            as_of_day = np.array([day], dtype=np.int64)
+            for index, field in enumerate(PRICE_FIELDS):
+                previous[backdated, index] = self.as_of(codes[backdated], as_of_day, field)[:, 0]
+        same = (prices == previous) | (np.isnan(prices) & np.isnan(previous))
+        changed = ~same.all(axis=1)
+        codes, prices = codes[changed], prices[changed]
+        if len(codes) == 0:
+            return 0
+
+        new_columns = {
+            'day': np.full(len(codes), day, dtype=np.int32),
+            'card': codes,
+            **{field: prices[:, index].astype(COLUMNS[field]) for index, field in enumerate(PRICE_FIELDS)},
+        }
+        for column, values in new_columns.items():
+            with open(self.path / f"{column}.bin", 'ab') as f:
+                values.tofile(f)
+        self._append_columns(new_columns)
+
+        return len(codes)
+
+    def as_of(self, codes: np.ndarray, days: np.ndarray, field: str = 'usd') -> np.ndarray:
+        """
+        Price of each card as of each day (last record on or before that day).
+
+        Returns:
+            (len(codes), len(days)) array, NaN where no record exists yet
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        result = np.full((len(codes), len(days)), np.nan, dtype=np.float32)
+        if not len(self) or not len(codes):
+            return result
+
+        # Sort records by (card, day, append order) via one composite key
+        day_span = int(max(self.columns['day'].max(), days.max())) + 1
+        keys = self.columns['card'].astype(np.int64) * day_span + self.columns['day']
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+
+        queries = (codes[:, None] * day_span + days[None, :]).ravel()
+        positions = np.searchsorted(sorted_keys, queries, side='right') - 1
+        valid = positions >= 0
+        records = order[np.where(valid, positions, 0)]
+        valid &= self.columns['card'][records] == np.repeat(codes, len(days))
+
+        values = np.where(valid, self.columns[field][records], np.nan)
+        return values.reshape(len(codes), len(days)).astype(np.float32)
+
+    def name_groups(self, english_only: bool = True) -> Tuple[np.ndarray, List[str]]:
+        """
+        Group card codes by lowercase card name.
+
+        Returns:
+            (group index per card code, -1 for excluded printings; group names)
+        """
+        group_index = {}
+        groups = np.full(len(self.card_ids), -1, dtype=np.int64)
+        for code, (_, name, _, lang) in enumerate(self.card_info):
+            if english_only and lang != 'en':
+                continue
+            key = name.lower()
+            if key not in group_index:
+                group_index[key] = len(group_index)
+            groups[code] = group_index[key]
+        names = [None] * len(group_index)
+        for code, (_, name, _, _) in enumerate(self.card_info):
+            if groups[code] >= 0 and names[groups[code]] is None:
+                names[groups[code]] = name
+        return groups, names
+
+    def cheapest_as_of(self, codes: np.ndarray, groups: np.ndarray, n_groups: int,
+                       days: np.ndarray) -> np.ndarray:
+        """(n_groups, len(days)) cheapest USD price across each group's printings"""
+        values = self.as_of(codes, days)
+        cheapest = np.full((n_groups, len(days)), np.inf, dtype=np.float32)
+        np.fmin.at(cheapest, groups, values)
+        cheapest[np.isinf(cheapest)] = np.nan
+        return cheapest
+
+    def deck_history(self, deck: List[Tuple[int, str]], days: int = 90, step: int = 1):
+        """
+        Total cheapest-printing price of a deck for each sampled day.
+
+        Args:
+            deck: list of (quantity, card_name)
+
+        A date on which some card has no price recorded yet gets a NaN
+        total rather than one that silently counts that card as free.
+
+        Returns:
+            (list of dates, totals array, unpriced card count per date,
+             list of names without price history)
+        """
+        end = today()
+        sample_days = np.arange(end - days, end + 1, step, dtype=np.int64)
+        if sample_days[-1] != end:
+            sample_days = np.append(sample_days, end)
+
+        groups, group_names = self.name_groups()
+        group_of_name = {name.lower(): index for index, name in enumerate(group_names)}
+
+        totals = np.zeros(len(sample_days), dtype=np.float64)
+        unpriced = np.zeros(len(sample_days), dtype=np.int64)
+        wanted = {}
+        missing = []
+        for quantity, card_name in deck:
+            key = card_name.lower()
+            if key in FREE_BASICS:
+                continue
+            if key not in group_of_name:
+                missing.append(card_name)
+                continue
+            wanted[group_of_name[key]] = wanted.get(group_of_name[key], 0) + quantity
+
+        if wanted:
+            wanted_groups = np.array(list(wanted.keys()), dtype=np.int64)
+            quantities = np.array(list(wanted.values()), dtype=np.float64)
+            local_group = np.full(len(group_names), -1, dtype=np.int64)
+            local_group[wanted_groups] = np.arange(len(wanted_groups))
+
+            codes = np.nonzero(np.isin(groups, wanted_groups))[0]
+            cheapest = self.cheapest_as_of(codes, local_group[groups[codes]], len(wanted_groups), sample_days)
+            totals = (cheapest * quantities[:, None]).sum(axis=0, dtype=np.float64)
+            unpriced = np.isnan(cheapest).sum(axis=0)
+
+        return [from_day(day) for day in sample_days], totals, unpriced, missing
+
+    def risers(self, pct: float = 20.0, days: int = 90) -> List[Tuple[str, float, float, float]]:
+        """
+        Cards whose cheapest English printing rose by more than pct percent.
+
+        Returns:
+            list of (name, old_price, new_price, percent_change), largest rise first
+        """
+        end = today()
+        groups, group_names = self.name_groups()
+        codes = np.nonzero(groups >= 0)[0]
+        if not len(codes):
+            return []
+
+        cheapest = self.cheapest_as_of(codes, groups[codes], len(group_names),
+                                       np.array([end - days, end], dtype=np.int64))
+        old, new = cheapest[:, 0], cheapest[:, 1]
+        valid = (old > 0) & ~np.isnan(new)
+        change = np.full(len(old), np.nan, dtype=np.float64)
+        change[valid] = (new[valid] - old[valid]) / old[valid] * 100
+        rising = np.nonzero(change > pct)[0]
+        rising = rising[np.argsort(-change[rising])]
+        return [(group_names[i], float(old[i]), float(new[i]), float(change[i])) for i in rising]
+
+
+def record_prices(cards: Iterable[Dict[str, Any]], history: Optional[PriceHistory] = None) -> int:
+    """Capture the prices of freshly fetched card records (used by the fetch and price scripts)"""
+    history = history or PriceHistory()
+    return history.record(cards)
+
+
+def ingest_library(history: PriceHistory, library: LibraryWatcher) -> int:
+    """
+    Record the prices of every card in the library, each set dated by when
+    it was fetched (the card file's modification day if the set has no
+    set_info file).
+
+    Returns:
+        int: number of price records appended
+    """
+    files_by_day: Dict[int, List[str]] = {}
+    for rel_path in library.files():
+        path = library.library_path / rel_path
+        day = fetched_day(path.parent)
+        if day is None:
+            try:
+                day = to_day(datetime.datetime.fromtimestamp(path.stat().st_mtime, datetime.timezone.utc).date())
+            except OSError:
+                day = today()
+        files_by_day.setdefault(day, []).append(rel_path)
+
+    appended = 0
+    for day, rel_paths in sorted(files_by_day.items()):
+        appended += history.record((card for rel_path in rel_paths for card in library.file_cards(rel_path)), day)
+    return appended
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local append-only card price history')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('ingest', help='Snapshot the prices of every card in the local library')
+
+    deck_parser = subparsers.add_parser('deck', help='Deck price over time')
+    deck_parser.add_argument('deck_file', help='Deck file path')
+    deck_parser.add_argument('--days', type=int, default=90, help='Days of history (default: 90)')
+    deck_parser.add_argument('--step', type=int, default=7, help='Days between rows (default: 7)')
+
+    risers_parser = subparsers.add_parser('risers', help='Cards whose cheapest printing rose')
+    risers_parser.add_argument('--pct', type=float, default=20.0, help='Minimum rise in percent (default: 20)')
+    risers_parser.add_argument('--days', type=int, default=90, help='Comparison window (default: 90)')
+    risers_parser.add_argument('--top', type=int, default=25, help='Number of cards to show (default: 25)')
+
+    card_parser = subparsers.add_parser('card', help='Cheapest price history of one card')
+    card_parser.add_argument('card_name', help='Exact card name')
+    card_parser.add_argument('--days', type=int, default=90, help='Days of history (default: 90)')
+
+    args = parser.parse_args(argv)
+    history = PriceHistory()
+
+    if args.command == 'ingest':
+        library = LibraryWatcher()
+        library.poll()
+        start = time.perf_counter()
+        appended = ingest_library(history, library)
+        print(f"Recorded {appended} changed prices in {time.perf_counter() - start:.2f}s "
+              f"({len(history)} records, {len(history.card_ids)} printings tracked)")
+        return
+
+    start = time.perf_counter()
+
+    if args.command == 'deck':
+        from check_deck_price import parse_decklist
+
+        main_deck, sideboard = parse_decklist(args.deck_file)
+        dates, totals, unpriced, missing = history.deck_history(main_deck + sideboard, args.days, args.step)
+        elapsed = time.perf_counter() - start
+
+        print(f"DECK PRICE HISTORY: {args.deck_file} (last {args.days} days, {elapsed * 1000:.1f}ms)")
+        print("-" * 40)
+        for date, total, count in zip(dates, totals, unpriced):
+            if count:
+                print(f"  {date.isoformat()}  incomplete ({count} card(s) not priced yet)")
+            else:
+                print(f"  {date.isoformat()}  ${total:>9.2f}")
+        if missing:
+            print(f"\n[WARNING] {len(missing)} card(s) have no price history:")
+            for card_name in missing:
+                print(f"  - {card_name}")
+
+    elif args.command == 'risers':
+        risers = history.risers(args.pct, args.days)
+        elapsed = time.perf_counter() - start
+
+        print(f"CARDS UP MORE THAN {args.pct:.0f}% IN {args.days} DAYS: {len(risers)} ({elapsed * 1000:.1f}ms)")
+        print("-" * 70)
+        for name, old, new, change in risers[:args.top]:
+            print(f"  {name:<40} ${old:>7.2f} -> ${new:>7.2f}  (+{change:.0f}%)")
+
+    elif args.command == 'card':
+        dates, totals, _, missing = history.deck_history([(1, args.card_name)], args.days, 1)
+        if missing:
+            print(f"No price history for: {args.card_name}")
+            return
+        print(f"PRICE HISTORY: {args.card_name} (cheapest English printing)")
+        previous = None
+        for date, total in zip(dates, totals):
+            if not math.isnan(total) and total != previous:
+                print(f"  {date.isoformat()}  ${total:.2f}")
+                previous = total
+
+
+if __name__ == "__main__":
+    main()
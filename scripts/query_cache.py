@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+MTG Query Result Cache
+
+Persistent on-disk cache for repeated queries (card searches, deck
+validations). Entries live in .cache/query-cache/<library fingerprint>/,
+so fetching or changing any set invalidates them automatically; directories
+for older library states are removed on the next write.
+
+Each entry is one JSON file. Reads refresh the file's mtime, and writes
+evict the least recently used entries until the cache fits its size bound.
+
+Usage:
+    python scripts/query_cache.py [--clear]
+
+Example:
+    from query_cache import QueryCache
+    cache = QueryCache()
+    result = cache.get(['search', query])
+    if result is None:
+        result = run_query()
+        cache.put(['search', query], result)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, List, Optional
+
+from library_watcher import CACHE_DIR, library_fingerprint
+
+QUERY_CACHE_DIR = CACHE_DIR / "query-cache"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+CACHE_VERSION = 1
+
+
+def content_hash(path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it cannot be read"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class QueryCache:
+    """Size-bounded LRU cache of JSON results, scoped to the current library state"""
+
+    def __init__(self, fingerprint: Optional[str] = None, max_bytes: int = MAX_CACHE_BYTES):
+        self.fingerprint = fingerprint or library_fingerprint()
+        self.max_bytes = max_bytes
+        self.path = QUERY_CACHE_DIR / f"v{CACHE_VERSION}_{self.fingerprint}"
+
+    def entry_path(self, key: List[Any]):
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return self.path / f"{digest}.json"
+
+    def get(self, key: List[Any]) -> Optional[Any]:
+        """Cached value for a key (marking it recently used), or None"""
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('key') != key:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['value']
+
+    def put(self, key: List[Any], value: Any) -> bool:
+        """Store a value; returns False if it alone exceeds the size bound"""
+        data = json.dumps({'key': key, 'value': value}, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return False
+
+        if not self.path.exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.remove_stale()
+
+        path = self.entry_path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return True
+
+    def entries(self):
+        """(mtime, size, path) of every entry, least recently used first"""
+        entries = []
+        if self.path.exists():
+            with os.scandir(self.path) as files:
+                for entry in files:
+                    if entry.name.endswith('.json'):
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits; returns the number removed"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def remove_stale(self) -> None:
+        """Remove the entries of other library states"""
+        for other in QUERY_CACHE_DIR.iterdir():
+            if other.is_dir() and other != self.path:
+                shutil.rmtree(other, ignore_errors=True)
+
+    def clear(self) -> None:
+        shutil.rmtree(QUERY_CACHE_DIR, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show or clear the query result cache')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached result')
+    args = parser.parse_args(argv)
+
+    cache = QueryCache()
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {QUERY_CACHE_DIR}")
+        return
+
+    entries = cache.entries()
+    size = sum(entry_size for _, entry_size, _ in entries)
+    print(f"Query cache: {cache.path}")
+    print(f"  {len(entries)} entries, {size / 1024:.1f} KiB of {cache.max_bytes / 1024 / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+MTG Commander Card Recommender
+
+Suggests cards for a Commander deck by text similarity. Every oracle card's
+rules text and type line are turned into an L2-normalised TF-IDF vector
+(unigrams and bigrams) stored as a CSR sparse matrix. A deck's profile is the
+sum of its cards' vectors; candidates are scored against it in one sparse
+matrix-vector product, then filtered to the commander's color identity and
+the format's legal cards.
+
+Besides the overall top picks, cards are suggested for every role the
+validator's best-practice check finds lacking (ramp, card draw, removal).
+
+The model is cached in .cache/ keyed by the library fingerprint.
+
+Usage:
+    python scripts/recommend.py <deck_file_path> [--top N] [--role ramp|draw|removal] [--format FORMAT]
+
+Example:
+    python scripts/recommend.py decks/my-commander-deck.txt --top 15
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from card_matrix import (
+    BASIC_LANDS, NON_CARD_LAYOUTS, ROLE_DRAW, ROLE_RAMP, ROLE_REMOVAL,
+    card_role_flags, card_type_flags, color_mask,
+)
+from library_watcher import (CACHE_DIR, LibraryWatcher, library_fingerprint, prune_cache, temp_path,
+                             write_json_atomic)
+
+# Formats tracked in the legality bitmask (legal or restricted)
+FORMATS = [
+    'commander', 'vintage', 'legacy', 'modern', 'pioneer', 'standard',
+    'pauper', 'paupercommander', 'oathbreaker', 'brawl', 'duel', 'predh',
+]
+
+ROLES = {'ramp': ROLE_RAMP, 'draw': ROLE_DRAW, 'removal': ROLE_REMOVAL}
+
+# Minimum role counts from check_best_practices
+ROLE_TARGETS = {'ramp': 8, 'draw': 6, 'removal': 6}
+
+MIN_DOCUMENT_FREQUENCY = 2
+MAX_DOCUMENT_RATIO = 0.5
+
+CACHE_VERSION = 2
+
+TOKEN_PATTERN = re.compile(r"\{[^}]+\}|[a-z0-9+\-/']+")
+REMINDER_TEXT = re.compile(r"\([^)]*\)")
+
+
+def card_text(card) -> str:
+    """Rules text and type line of all faces, with the card's own name replaced"""
+    faces = card.get('card_faces') or [card]
+    parts = []
+    for face in faces:
+        parts.append(face.get('type_line', card.get('type_line', '')))
+        parts.append(face.get('oracle_text', ''))
+
+    text = '\n'.join(parts)
+    for face in faces:
+        face_name = face.get('name', '')
+        if face_name:
+            text = text.replace(face_name, 'CARDNAME')
+    return REMINDER_TEXT.sub('', text)
+
+
+def tokenize(text: str) -> List[str]:
+    """Unigram and bigram terms for a rules text"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def legality_mask(legalities) -> int:
+    """Bitmask of FORMATS in which the card is legal or restricted"""
+    mask = 0
+    for index, format_name in enumerate(FORMATS):
+        if (legalities or {}).get(format_name) in ('legal', 'restricted'):
+            mask |= 1 << index
+    return mask
+
+
+class CardRecommender:
+    """TF-IDF model over every oracle card in the library"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], names: List[str], type_lines: List[str]):
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.data = arrays['data']
+        self.idf = arrays['idf']
+        self.identity = arrays['identity']
+        self.legality = arrays['legality']
+        self.roles = arrays['roles']
+        self.types = arrays['types']
+        self.price = arrays['price']
+        self.edhrec_rank = arrays['edhrec_rank']
+
+        self.names = names
+        self.type_lines = type_lines
+        self.name_rows = {name: row for row, name in enumerate(names)}
+
+        # Row id of every stored value, for bincount-based sparse products
+        self.row_ids = np.repeat(np.arange(len(names), dtype=np.int32), np.diff(self.indptr))
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_cards(cls, cards) -> 'CardRecommender':
+        """Build the model from Scryfall card dicts (one row per oracle card)"""
+        oracle_cards = {}
+        prices = {}
+
+        for card in cards:
+            if card.get('layout') in NON_CARD_LAYOUTS:
+                continue
+            oracle_id = card.get('oracle_id') or ((card.get('card_faces') or [{}])[0].get('oracle_id'))
+            if not oracle_id:
+                continue
+
+            price = (card.get('prices') or {}).get('usd')
+            if price and not card.get('digital'):
+                prices[oracle_id] = min(prices.get(oracle_id, math.inf), float(price))
+
+            # Prefer an English paper printing as the representative record
+            current = oracle_cards.get(oracle_id)
+            if current is None or (current.get('lang') != 'en' and card.get('lang') == 'en'):
+                oracle_cards[oracle_id] = card
+
+        documents = []
+        document_frequency = {}
+        for card in oracle_cards.values():
+            counts = {}
+            for term in tokenize(card_text(card)):
+                counts[term] = counts.get(term, 0) + 1
+            documents.append(counts)
+            for term in counts:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+
+        n_documents = len(documents)
+        max_frequency = MAX_DOCUMENT_RATIO * n_documents
+        vocabulary = {}
+        idf = []
+        for term, frequency in document_frequency.items():
+            if MIN_DOCUMENT_FREQUENCY <= frequency <= max_frequency:
+                vocabulary[term] = len(idf)
+                idf.append(math.log((1 + n_documents) / (1 + frequency)) + 1)
+        idf = np.array(idf, dtype=np.float32)
+
+        indptr = [0]
+        indices = []
+        data = []
+        for counts in documents:
+            terms = [(vocabulary[term], count) for term, count in counts.items() if term in vocabulary]
+            terms.sort()
+            row_indices = np.array([t for t, _ in terms], dtype=np.int32)
+            row_data = np.array([1 + math.log(c) for _, c in terms], dtype=np.float32) * idf[row_indices]
+            norm = np.linalg.norm(row_data)
+            if norm > 0:
+                row_data /= norm
+            indices.append(row_indices)
+            data.append(row_data)
+            indptr.append(indptr[-1] + len(terms))
+
+        representatives = list(oracle_cards.items())
+        arrays = {
+            'indptr': np.array(indptr, dtype=np.int64),
+            'indices': np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            'data': np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+            'idf': idf,
+            'identity': np.array([color_mask(c.get('color_identity')) for _, c in representatives], dtype=np.uint8),
+            'legality': np.array([legality_mask(c.get('legalities')) for _, c in representatives], dtype=np.uint32),
+            'roles': np.array([card_role_flags(c) for _, c in representatives], dtype=np.uint8),
+            'types': np.array([card_type_flags(c.get('type_line', '')) for _, c in representatives], dtype=np.uint16),
+            'price': np.array([prices.get(oracle_id, math.nan) for oracle_id, _ in representatives], dtype=np.float32),
+            'edhrec_rank': np.array([c.get('edhrec_rank') or -1 for _, c in representatives], dtype=np.int32),
+        }
+        names = [c.get('name', '') for _, c in representatives]
+        type_lines = [c.get('type_line', '') for _, c in representatives]
+        return cls(arrays, names, type_lines)
+
+    def save(self, path) -> None:
+        """Save arrays as .npz and strings as a JSON sidecar"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(path.with_suffix('.npz'))
+        np.savez(tmp_path, indptr=self.indptr, indices=self.indices, data=self.data,
+                 idf=self.idf, identity=self.identity, legality=self.legality, roles=self.roles,
+                 types=self.types, price=self.price, edhrec_rank=self.edhrec_rank)
+        os.replace(tmp_path, path.with_suffix('.npz'))
+        write_json_atomic(path.with_suffix('.json'), {'names': self.names, 'type_lines': self.type_lines})
+
+    @classmethod
+    def load(cls, path) -> 'CardRecommender':
+        """Load a model written by save()"""
+        with np.load(path.with_suffix('.npz')) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+        with open(path.with_suffix('.json'), 'r', encoding='utf-8') as f:
+            strings = json.load(f)
+        return cls(arrays, strings['names'], strings['type_lines'])
+
+    def profile(self, card_quantities: Dict[str, int]) -> np.ndarray:
+        """Dense vocabulary-sized profile: sum of the deck's card vectors"""
+        vector = np.zeros(len(self.idf), dtype=np.float32)
+        for name, quantity in card_quantities.items():
+            row = self.name_rows.get(name)
+            if row is None or name in BASIC_LANDS:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            np.add.at(vector, self.indices[start:end], self.data[start:end])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def scores(self, profiles: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of every card to one or more profiles.
+
+        Args:
+            profiles: (vocabulary,) or (n_profiles, vocabulary) array
+
+        Returns:
+            (n_cards,) or (n_profiles, n_cards) array
+        """
+        single = profiles.ndim == 1
+        profiles = np.atleast_2d(profiles)
+        results = np.empty((len(profiles), len(self)), dtype=np.float32)
+        for index, profile in enumerate(profiles):
+            contributions = self.data * profile[self.indices]
+            results[index] = np.bincount(self.row_ids, weights=contributions, minlength=len(self))
+        return results[0] if single else results
+
+    def candidate_mask(self, identity: int, format_name: str = 'commander',
+                       exclude=(), role: Optional[str] = None) -> np.ndarray:
+        """Cards inside the color identity, legal in the format and not excluded"""
+        format_bit = 1 << FORMATS.index(format_name)
+        mask = ((self.identity & ~np.uint8(identity)) == 0) & ((self.legality & format_bit) != 0)
+        if role:
+            mask &= (self.roles & ROLES[role]) != 0
+        for name in exclude:
+            row = self.name_rows.get(name)
+            if row is not None:
+                mask[row] = False
+        return mask
+
+    def recommend(self, commander: str, main_deck: Dict[str, int], top_n: int = 10,
+                  format_name: str = 'commander', roles: Optional[List[Optional[str]]] = None):
+        """
+        Top-N most similar candidate rows for the deck, once per requested role.
+
+        Returns:
+            dict: role (None for overall) -> list of (row, score)
+        """
+        roles = roles or [None]
+        deck = dict(main_deck)
+        deck[commander] = 1
+        identity_row = self.name_rows.get(commander)
+        identity = int(self.identity[identity_row]) if identity_row is not None else 0
+
+        similarity = self.scores(self.profile(deck))
+        results = {}
+        for role in roles:
+            mask = self.candidate_mask(identity, format_name, exclude=deck, role=role)
+            candidates = np.nonzero(mask)[0]
+            if len(candidates) == 0:
+                results[role] = []
+                continue
+            candidate_scores = similarity[candidates]
+            top = min(top_n, len(candidates))
+            best = np.argpartition(-candidate_scores, top - 1)[:top]
+            best = best[np.argsort(-candidate_scores[best])]
+            results[role] = [(int(candidates[i]), float(candidate_scores[i])) for i in best]
+        return results
+
+
+def load_recommender(library: Optional[LibraryWatcher] = None) -> CardRecommender:
+    """Load the recommender from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library.library_path) if library else library_fingerprint()
+    cache_path = CACHE_DIR / f"recommender_v{CACHE_VERSION}_{fingerprint}"
+
+    if cache_path.with_suffix('.npz').exists() and cache_path.with_suffix('.json').exists():
+        try:
+            return CardRecommender.load(cache_path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if library is None:
+        library = LibraryWatcher()
+    library.poll()
+    recommender = CardRecommender.from_cards(library.cards())
+
+    recommender.save(cache_path)
+    for suffix in ('.npz', '.json'):
+        prune_cache(f"recommender_v*_*{suffix}")
+    return recommender
+
+
+def lacking_roles(recommender: CardRecommender, main_deck: Dict[str, int]) -> List[str]:
+    """Roles below the best-practice minimums, counted from the model's role flags"""
+    counts = dict.fromkeys(ROLES, 0)
+    for name, quantity in main_deck.items():
+        row = recommender.name_rows.get(name)
+        if row is None:
+            continue
+        for role, flag in ROLES.items():
+            if recommender.roles[row] & flag:
+                counts[role] += quantity
+    return [role for role, target in ROLE_TARGETS.items() if counts[role] < target]
+
+
+def print_recommendations(recommender: CardRecommender, ranked) -> None:
+    """Print (row, score) pairs as a table"""
+    for rank, (row, score) in enumerate(ranked, 1):
+        price = recommender.price[row]
+        price_text = f"${price:.2f}" if not math.isnan(price) else "n/a"
+        print(f"  {rank:>2}. {recommender.names[row]:<40} {score:.3f}  {price_text:>8}  {recommender.type_lines[row]}")
+
+
+def main(argv=None):
+    from commander_deck_validator import parse_deck_file
+
+    parser = argparse.ArgumentParser(description='Recommend cards for a Commander deck by text similarity')
+    parser.add_argument('deck_file', help='Deck file path')
+    parser.add_argument('--top', type=int, default=10, help='Number of recommendations (default: 10)')
+    parser.add_argument('--role', choices=sorted(ROLES), help='Only recommend cards in this role')
+    parser.add_argument('--format', dest='format_name', default='commander', choices=FORMATS,
+                        help='Format legality filter (default: commander)')
+    args = parser.parse_args(argv)
+
+    commander, main_deck, errors = parse_deck_file(args.deck_file)
+    for error in errors:
+        print(f"  ERROR: {error}")
+    if not commander:
+        print("Error: No commander found - Commander section missing or unclear")
+        return
+
+    recommender = load_recommender()
+    if commander not in recommender.name_rows:
+        print(f"Warning: Commander not found in database: {commander}")
+
+    roles = [args.role] if args.role else [None] + lacking_roles(recommender, main_deck)
+
+    start = time.perf_counter()
+    results = recommender.recommend(commander, main_deck, args.top, args.format_name, roles)
+    elapsed = time.perf_counter() - start
+
+    print(f"RECOMMENDATIONS FOR: {commander} ({len(recommender)} candidate cards, {elapsed * 1000:.1f}ms)")
+    role_labels = {'ramp': 'RAMP', 'draw': 'CARD DRAW', 'removal': 'REMOVAL'}
+    for role, ranked in results.items():
+        print()
+        print(f"{role_labels[role] + ' ' if role else ''}TOP {len(ranked)}:")
+        print_recommendations(recommender, ranked)
+
+
+if __name__ == "__main__":
+    main()
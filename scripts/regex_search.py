@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+MTG Parallel Regex Search
+
+Raw regular-expression search over every printing in the library (name,
+oracle text and type line, like search_cards.py), for queries no word index
+can answer, such as "deals \\d+ damage to any target".
+
+The searchable text of every printing is written once per library state to
+a text column in .cache/ (records separated by NUL), next to a row table
+holding each record's text offset and its location in the card files. A
+search scans the memory-mapped column in-process; with --workers N it
+splits the rows into chunks, scans them in a process pool and merges the
+matching rows back in library order. Each worker memory-maps the column
+itself, so only chunk bounds and matching row numbers are sent between
+processes; a worker decodes its chunk's slice of the column to str before
+matching, so patterns keep full Unicode semantics (case folding, \\w, .).
+Starting a pool costs more than a single scan of this library, so it only
+pays off for repeated searches. Only the matching records that are
+displayed are decoded from the card files.
+
+Usage:
+    python scripts/regex_search.py "<pattern>" [--workers N] [--limit N]
+    python scripts/regex_search.py --benchmark ["<pattern>"] [--max-workers N]
+    python scripts/search_cards.py "<pattern>" --regex
+
+Example:
+    python scripts/regex_search.py "deals \\d+ damage to any target"
+    python scripts/regex_search.py --benchmark --max-workers 8
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from card_index import CardIndex, load_card_index
+from card_record import Card
+from library_watcher import CACHE_DIR, CARD_LIBRARY_PATH, library_fingerprint, prune_cache
+
+COLUMN_VERSION = 1
+SEPARATOR = '\x00'
+CHUNKS_PER_WORKER = 4
+BENCHMARK_PATTERN = r'deals \d+ damage to any target'
+
+
+def searchable_text(card) -> str:
+    """Text a search matches against (same fields as search_cards.search_cards)"""
+    text = ' '.join([card.get('name', ''), card.get('oracle_text', ''), card.get('type_line', '')])
+    return text.replace(SEPARATOR, ' ')
+
+
+def build_text_column(card_data: CardIndex, text_file, rows_file) -> None:
+    """
+    Write the text column and row table of the library.
+
+    Row table: int64 array of [text offset, file number, byte offset, byte length]
+    per printing, in card file order; file numbers are card_data.files positions.
+    """
+    # Records are read from the file versions card_data was built from, even if a set was re-fetched since
+    entries = sorted(entry for printings in card_data.names.values() for entry in printings)
+    rows = []
+    text_offset = 0
+
+    tmp_text = text_file.with_name(f".{text_file.name}.{os.getpid()}.tmp")
+    with open(tmp_text, 'wb') as out:
+        data_file, data = None, b''
+        for file_number, offset, length in entries:
+            if file_number != data_file:
+                data_file, data = file_number, card_data.read_bytes(file_number)
+            card = json.loads(data[offset:offset + length])
+            encoded = (searchable_text(card) + SEPARATOR).encode('utf-8')
+            out.write(encoded)
+            rows.append((text_offset, file_number, offset, length))
+            text_offset += len(encoded)
+
+    tmp_rows = rows_file.with_name(f".{rows_file.name}.{os.getpid()}.tmp.npy")
+    np.save(tmp_rows, np.array(rows, dtype=np.int64).reshape(-1, 4))
+    os.replace(tmp_text, text_file)
+    os.replace(tmp_rows, rows_file)
+
+
+# Column mapped by the current process, keyed by its files (set in pool workers by open_column)
+_column: Optional[Tuple[Tuple[str, str], mmap.mmap, np.ndarray]] = None
+
+
+def open_column(text_file, rows_file) -> None:
+    global _column
+
+    key = (str(text_file), str(rows_file))
+    if _column is not None and _column[0] == key:
+        return
+    with open(text_file, 'rb') as f:
+        text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+    _column = (key, text, np.load(rows_file, mmap_mode='r'))
+
+
+def scan_chunk(pattern: str, flags: int, first: int, last: int) -> List[int]:
+    """Rows in [first, last) whose text matches pattern (the chunk's slice is decoded once)"""
+    _, text, rows = _column
+    start = int(rows[first, 0])
+    end = int(rows[last, 0]) if last < len(rows) else len(text)
+    search = re.compile(pattern, flags).search
+    records = text[start:end].decode('utf-8').split(SEPARATOR)
+    return [first + i for i, record in enumerate(records[:last - first]) if search(record)]
+
+
+def chunk_bounds(row_count: int, chunks: int) -> List[Tuple[int, int]]:
+    edges = np.linspace(0, row_count, max(1, min(chunks, row_count)) + 1).astype(int)
+    return [(int(first), int(last)) for first, last in zip(edges[:-1], edges[1:]) if last > first]
+
+
+class RegexSearch:
+    """Chunked regex scans of the library text column, optionally over a process pool"""
+
+    def __init__(self, card_data: Optional[CardIndex] = None, library_path=CARD_LIBRARY_PATH):
+        fingerprint = library_fingerprint(library_path)
+        self.card_data = card_data if card_data is not None else load_card_index(library_path, fingerprint)
+        self.text_file = CACHE_DIR / f"regex_text_v{COLUMN_VERSION}_{fingerprint}.txt"
+        self.rows_file = CACHE_DIR / f"regex_rows_v{COLUMN_VERSION}_{fingerprint}.npy"
+
+        if not (self.text_file.exists() and self.rows_file.exists()):
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            build_text_column(self.card_data, self.text_file, self.rows_file)
+            for pattern in ("regex_text_v*.txt", "regex_rows_v*.npy"):
+                prune_cache(pattern)
+
+        self.rows = np.load(self.rows_file, mmap_mode='r')
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def pool(self, workers: int) -> ProcessPoolExecutor:
+        """Worker pool with the column mapped in every worker (kept for repeated searches)"""
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=open_column,
+                                             initargs=(self.text_file, self.rows_file))
+            self._pool_workers = workers
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def search(self, pattern: str, workers: Optional[int] = None, flags: int = re.IGNORECASE) -> List[int]:
+        """
+        Rows matching pattern, in library order.
+
+        Raises:
+            re.error: if pattern is not a valid regular expression
+        """
+        re.compile(pattern, flags)
+        workers = workers or 1
+        if workers == 1:
+            open_column(self.text_file, self.rows_file)
+            return scan_chunk(pattern, flags, 0, len(self.rows)) if len(self.rows) else []
+
+        pool = self.pool(workers)
+        futures = [pool.submit(scan_chunk, pattern, flags, first, last)
+                   for first, last in chunk_bounds(len(self.rows), workers * CHUNKS_PER_WORKER)]
+        matches = []
+        for future in futures:
+            matches.extend(future.result())
+        return matches
+
+    def cards(self, rows: List[int]) -> List[Card]:
+        """Decode the card records of the given rows"""
+        return [self.card_data.read([int(value) for value in self.rows[row, 1:]]) for row in rows]
+
+
+def benchmark(searcher: RegexSearch, pattern: str, max_workers: int, repeats: int = 3) -> None:
+    """Time the same search on 1, 2, 4... workers (pools are started before timing)"""
+    counts = sorted({1, max_workers} | {2 ** i for i in range(1, max_workers.bit_length()) if 2 ** i < max_workers})
+    print(f"Pattern: {pattern!r} over {len(searcher):,} printings ({os.cpu_count()} CPU(s) available)")
+    print(f"  {'Workers':>7} {'Time':>9} {'Speed-up':>9} {'Efficiency':>11}")
+
+    baseline = None
+    for workers in counts:
+        searcher.search(pattern, workers)  # Warm-up: starts the pool and pages in the column
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            matches = searcher.search(pattern, workers)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"  {workers:>7} {best * 1000:>7.0f}ms {baseline / best:>8.2f}x {baseline / best / workers:>10.0%}")
+    searcher.close()
+    print(f"  ({len(matches)} matches)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Search card text with a regular expression')
+    parser.add_argument('pattern', nargs='?', help='Regular expression (case-insensitive)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1, no pool)')
+    parser.add_argument('--limit', type=int, default=20, help='Matching cards to list (default: 20)')
+    parser.add_argument('--benchmark', action='store_true', help='Compare search times across worker counts')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help='Largest worker count to benchmark (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    if not args.pattern and not args.benchmark:
+        parser.error('a pattern is required')
+
+    searcher = RegexSearch()
+    if args.benchmark:
+        benchmark(searcher, args.pattern or BENCHMARK_PATTERN, args.max_workers)
+        return
+
+    start = time.perf_counter()
+    try:
+        rows = searcher.search(args.pattern, args.workers)
+    except re.error as e:
+        print(f"Error: invalid regular expression: {e}")
+        return
+    elapsed = time.perf_counter() - start
+    searcher.close()
+
+    for card in searcher.cards(rows[:args.limit]):
+        print(f"{card.get('name', '')} ({card.get('set', '').upper()}) - {card.get('type_line', '')}")
+    if len(rows) > args.limit:
+        print(f"... and {len(rows) - args.limit} more")
+    print(f"({len(rows)} matching printings of {len(searcher):,} in {elapsed * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+MTG Rules and Formats Search
+
+Indexes the rules and format reference documents for instant lookup:
+
+- Each markdown file is split into addressable sections by heading hierarchy
+  (e.g. "Comprehensive Rules Summary > The Stack > Resolution:").
+- Section text is tokenised into a keyword inverted index and ranked with
+  BM25; words in a section's headings count extra.
+- The compiled index is cached in .cache/ keyed by the SHA-256 of the source
+  documents, so the markdown is only re-parsed after it changes.
+
+Usage:
+    python scripts/rules_index.py "<query>" [--top N] [--doc rules|formats|color-identity|banned]
+
+Example:
+    python scripts/rules_index.py "state-based actions"
+    python scripts/rules_index.py "commander damage" --doc formats
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from library_watcher import CACHE_DIR, PROJECT_ROOT, write_json_atomic
+
+# Indexed documents: short name -> path relative to the project root
+DOCUMENTS = {
+    'rules': 'rules/comprehensive-rules-summary.md',
+    'formats': 'formats/formats.md',
+    'color-identity': 'formats/commander-color-identity.md',
+    'banned': 'formats/banned-restricted.md',
+}
+
+INDEX_CACHE_FILE = CACHE_DIR / "rules_index.json"
+INDEX_VERSION = 1
+
+# BM25 parameters and heading boost
+BM25_K1 = 1.2
+BM25_B = 0.75
+HEADING_WEIGHT = 3
+
+SNIPPET_LINES = 4
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'has', 'have',
+    'if', 'in', 'into', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'then',
+    'there', 'this', 'to', 'was', 'what', 'when', 'which', 'with', 'you', 'your',
+}
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def normalize_term(word: str) -> str:
+    """Lowercase word with possessives and simple plurals removed"""
+    word = word.lower()
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) > 4 and word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Index terms of a piece of text"""
+    return [term for term in (normalize_term(w) for w in WORD_PATTERN.findall(text.lower()))
+            if term and term not in STOPWORDS]
+
+
+def split_sections(doc_name: str, text: str) -> List[Dict[str, Any]]:
+    """
+    Split a markdown document into sections by heading hierarchy.
+
+    Returns:
+        list of {'doc', 'line', 'path', 'body'} where path is the list of
+        enclosing headings and line is the 1-based heading line
+    """
+    sections = []
+    headings: List[str] = []
+    current = {'doc': doc_name, 'line': 1, 'path': [], 'body': []}
+    in_code_block = False
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if line.strip().startswith('```'):
+            in_code_block = not in_code_block
+
+        match = None if in_code_block else HEADING_PATTERN.match(line)
+        if match:
+            if current['path'] or any(body.strip() for body in current['body']):
+                sections.append(current)
+            level = len(match.group(1))
+            headings = headings[:level - 1] + [match.group(2)]
+            current = {'doc': doc_name, 'line': line_number, 'path': list(headings), 'body': []}
+        else:
+            current['body'].append(line)
+
+    if current['path'] or any(body.strip() for body in current['body']):
+        sections.append(current)
+
+    for section in sections:
+        section['body'] = '\n'.join(section['body']).strip()
+    return sections
+
+
+def documents_hash() -> str:
+    """SHA-256 over every indexed document's contents"""
+    digest = hashlib.sha256(f"v{INDEX_VERSION}".encode('utf-8'))
+    for doc_name, rel_path in DOCUMENTS.items():
+        digest.update(doc_name.encode('utf-8'))
+        path = PROJECT_ROOT / rel_path
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_index() -> Dict[str, Any]:
+    """Parse the documents and compile the inverted index"""
+    sections = []
+    for doc_name, rel_path in DOCUMENTS.items():
+        path = PROJECT_ROOT / rel_path
+        if path.exists():
+            sections.extend(split_sections(doc_name, path.read_text(encoding='utf-8')))
+
+    postings: Dict[str, List[List[int]]] = {}
+    lengths = []
+    for section_id, section in enumerate(sections):
+        counts: Dict[str, int] = {}
+        for term in tokenize(section['body']):
+            counts[term] = counts.get(term, 0) + 1
+        for term in tokenize(' '.join(section['path'])):
+            counts[term] = counts.get(term, 0) + HEADING_WEIGHT
+        for term, count in counts.items():
+            postings.setdefault(term, []).append([section_id, count])
+        lengths.append(sum(counts.values()))
+
+    return {
+        'sections': sections,
+        'postings': postings,
+        'lengths': lengths,
+        'average_length': sum(lengths) / len(lengths) if lengths else 0.0,
+    }
+
+
+def load_index() -> Dict[str, Any]:
+    """Load the compiled index from cache, rebuilding it when any document changed"""
+    key = documents_hash()
+
+    if INDEX_CACHE_FILE.exists():
+        try:
+            with open(INDEX_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return cached['index']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index = build_index()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(INDEX_CACHE_FILE, {'key': key, 'index': index})
+    return index
+
+
+def search_rules(query: str, top_n: int = 5, doc: Optional[str] = None,
+                 index: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Rank sections for a query with BM25.
+
+    Returns:
+        list of {'score', 'section'} dicts, best first
+    """
+    index = index or load_index()
+    sections = index['sections']
+    lengths = index['lengths']
+    average_length = index['average_length'] or 1.0
+    n_sections = len(sections)
+
+    scores: Dict[int, float] = {}
+    for term in set(tokenize(query)):
+        postings = index['postings'].get(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (n_sections - len(postings) + 0.5) / (len(postings) + 0.5))
+        for section_id, count in postings:
+            if doc and sections[section_id]['doc'] != doc:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[section_id] / average_length)
+            scores[section_id] = scores.get(section_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+    return [{'score': score, 'section': sections[section_id]} for section_id, score in ranked]
+
+
+def section_snippet(section: Dict[str, Any], query: str, max_lines: int = SNIPPET_LINES) -> List[str]:
+    """The body lines that best match the query"""
+    terms = set(tokenize(query))
+    lines = [line for line in section['body'].splitlines() if line.strip()]
+    if not lines:
+        return []
+
+    hits = [len(terms & set(tokenize(line))) for line in lines]
+    best_start = max(range(len(lines)), key=lambda i: sum(hits[i:i + max_lines]))
+    return lines[best_start:best_start + max_lines]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Search the rules and format documents')
+    parser.add_argument('query', help='Search terms')
+    parser.add_argument('--top', type=int, default=5, help='Number of sections to show (default: 5)')
+    parser.add_argument('--doc', choices=sorted(DOCUMENTS), help='Only search one document')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = search_rules(args.query, args.top, args.doc)
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print(f"No sections found matching '{args.query}'")
+        return
+
+    print(f"Found {len(results)} section(s) matching '{args.query}' ({elapsed * 1000:.1f}ms):")
+    for result in results:
+        section = result['section']
+        print()
+        print(f"[{result['score']:.2f}] {' > '.join(section['path'])}")
+        print(f"       {DOCUMENTS[section['doc']]}:{section['line']}")
+        for line in section_snippet(section, args.query):
+            print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
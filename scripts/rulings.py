@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+MTG Local Rulings Store
+
+Card rulings from Scryfall's "rulings" bulk file, stored in .data/rulings/ so a
+whole deck's rulings can be looked up without one API call per card:
+
+- rulings_<digest>.jsonl  every ruling as one [published_at, source, comment]
+                          JSON line, grouped by oracle_id
+- index.json              oracle_id -> [byte offset, byte length] of its
+                          group, and the name of the current data file
+
+A lookup reads the index and seeks to each card's group, so printing the
+rulings of a 100-card deck takes milliseconds. Rulings belong to the oracle
+card, so every printing (and the name in any deck list) shares them.
+
+Each ingest writes a new data file and then swaps the index in atomically,
+so a lookup running during an ingest sees either the old or the new store: a
+loaded store holds its data file open, and replaced data files are only
+deleted an hour after they were superseded.
+
+Usage:
+    python scripts/rulings.py ingest <rulings bulk file>
+    python scripts/rulings.py download
+    python scripts/rulings.py deck <deck_file_path>
+    python scripts/rulings.py search "<query>" [--set <set>] [--regex]
+    python scripts/rulings.py card "<card name>"
+
+Example:
+    python scripts/rulings.py ingest ~/Downloads/rulings-20250101.json
+    python scripts/rulings.py deck decks/my-deck.txt
+"""
+
+import argparse
+import hashlib
+import json
+import textwrap
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from library_watcher import DATA_DIR, prune_cache, write_atomic
+
+RULINGS_DIR = DATA_DIR / "rulings"
+INDEX_FILE = "index.json"
+STORE_VERSION = 1
+BULK_DATA_ENDPOINT = "/bulk-data/rulings"
+
+Ruling = Tuple[str, str, str]  # (published_at, source, comment)
+
+
+class RulingsStore:
+    """oracle_id-keyed rulings read by offset from the data file"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else RULINGS_DIR
+        self.index: Dict[str, List[int]] = {}
+        self.info: Dict[str, object] = {}
+        self.data_file: Optional[Path] = None
+        self._data = None
+
+    def load(self) -> bool:
+        """Read the index; returns False if nothing has been ingested yet"""
+        try:
+            with open(self.path / INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if index.get('version') != STORE_VERSION:
+            return False
+        try:
+            data = open(self.path / index['data'], 'rb')
+        except OSError:
+            return False
+        self.close()
+        self.index = index['oracle']
+        self.info = {key: value for key, value in index.items() if key != 'oracle'}
+        self.data_file, self._data = self.path / index['data'], data
+        return True
+
+    def close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, oracle_id) -> bool:
+        return oracle_id in self.index
+
+    def rulings(self, oracle_ids: Iterable[str]) -> Dict[str, List[Ruling]]:
+        """Rulings of every given oracle id that has any (ids are read in file order)"""
+        wanted = sorted({oracle_id for oracle_id in oracle_ids if oracle_id in self.index},
+                        key=lambda oracle_id: self.index[oracle_id][0])
+        found = {}
+        if not wanted:
+            return found
+        for oracle_id in wanted:
+            offset, length = self.index[oracle_id]
+            self._data.seek(offset)
+            found[oracle_id] = [tuple(json.loads(line)) for line in self._data.read(length).splitlines()]
+        return found
+
+    def ingest(self, entries: Iterable[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Replace the store with the given Scryfall ruling objects.
+
+        Returns:
+            (rulings stored, oracle ids with rulings)
+        """
+        grouped: Dict[str, List[Ruling]] = {}
+        for entry in entries:
+            oracle_id = entry.get('oracle_id')
+            if oracle_id and entry.get('comment'):
+                grouped.setdefault(oracle_id, []).append(
+                    (entry.get('published_at', ''), entry.get('source', ''), entry['comment']))
+
+        index = {}
+        chunks = []
+        offset = 0
+        for oracle_id in sorted(grouped):
+            chunk = ''.join(json.dumps(list(ruling), ensure_ascii=False) + '\n'
+                            for ruling in sorted(grouped[oracle_id])).encode('utf-8')
+            index[oracle_id] = [offset, len(chunk)]
+            chunks.append(chunk)
+            offset += len(chunk)
+        data = b''.join(chunks)
+
+        # A new data file per content, then the index swap makes it current
+        self.path.mkdir(parents=True, exist_ok=True)
+        data_name = f"rulings_{hashlib.sha1(data).hexdigest()[:16]}.jsonl"
+        write_atomic(self.path / data_name, data, fsync=True)
+        count = sum(len(rulings) for rulings in grouped.values())
+        info = {'version': STORE_VERSION, 'data': data_name, 'ingested': time.time(), 'rulings': count}
+        write_atomic(self.path / INDEX_FILE, json.dumps({**info, 'oracle': index}).encode('utf-8'), fsync=True)
+
+        # Lookups that read the previous index may still open its data file
+        prune_cache("rulings_*.jsonl", cache_dir=self.path)
+        self.close()
+        self.index, self.info = index, info
+        self.data_file, self._data = self.path / data_name, open(self.path / data_name, 'rb')
+        return count, len(index)
+
+
+def download_bulk_rulings() -> List[Dict[str, str]]:
+    """Current rulings bulk file from Scryfall (two requests through the shared client)"""
+    from scryfall_client import get_client
+
+    client = get_client()
+    response = client.get(BULK_DATA_ENDPOINT)
+    response.raise_for_status()
+    download_uri = response.json()['download_uri']
+    print(f"Downloading {download_uri}...")
+    response = client.get(download_uri, timeout=300)
+    response.raise_for_status()
+    return response.json()
+
+
+def deck_cards(deck_file) -> List[Tuple[str, Optional[str]]]:
+    """(library name, oracle id) of every distinct card in a decklist"""
+    from card_index import load_card_index
+    from check_deck_price import parse_decklist
+
+    card_data = load_card_index()
+    main_deck, sideboard = parse_decklist(deck_file)
+    cards = {}
+    for _, card_name in main_deck + sideboard:
+        library_name = card_data.find(card_name)
+        if library_name is None:
+            cards.setdefault(card_name, None)
+        else:
+            cards.setdefault(library_name, card_data.oracle_id_of(library_name))
+    return list(cards.items())
+
+
+def search_result_cards(query: str, set_filter: Optional[str], regex: bool) -> List[Tuple[str, Optional[str]]]:
+    """(name, oracle id) of every distinct card a search matches"""
+    from search_cards import search_cards
+
+    cards = {}
+    for card in search_cards(query, set_filter, regex):
+        cards.setdefault(card.get('oracle_id') or card.get('name', ''), card.get('name', ''))
+    return [(card_name, key if key != card_name else None) for key, card_name in cards.items()]
+
+
+def print_rulings(store: RulingsStore, cards: List[Tuple[str, Optional[str]]], title: str) -> None:
+    start = time.perf_counter()
+    found = store.rulings(oracle_id for _, oracle_id in cards if oracle_id)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'='*60}")
+    print(f"RULINGS: {title}")
+    print(f"{'='*60}")
+    for card_name, oracle_id in cards:
+        rulings = found.get(oracle_id, [])
+        if not rulings:
+            continue
+        print(f"\n{card_name} ({len(rulings)} ruling{'s' if len(rulings) != 1 else ''})")
+        for published_at, source, comment in rulings:
+            lines = textwrap.wrap(comment, 72) or ['']
+            print(f"  {published_at} [{source}] {lines[0]}")
+            for line in lines[1:]:
+                print(f"  {'':>10}  {'':{len(source) + 2}}{line}")
+
+    unknown = [card_name for card_name, oracle_id in cards if not oracle_id]
+    without = len(cards) - len(found) - len(unknown)
+    print(f"\n{'='*60}")
+    print(f"{sum(len(rulings) for rulings in found.values())} rulings for {len(found)} of {len(cards)} cards "
+          f"({without} without rulings) in {elapsed * 1000:.1f}ms")
+    if unknown:
+        print(f"[WARNING] Not in the card library: {', '.join(unknown)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local card rulings from the Scryfall bulk file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='Load a Scryfall rulings bulk file into .data/rulings/')
+    ingest_parser.add_argument('bulk_file', help='Rulings bulk JSON file (a list of ruling objects)')
+
+    subparsers.add_parser('download', help='Download the current rulings bulk file and ingest it')
+
+    deck_parser = subparsers.add_parser('deck', help='Rulings of every card in a decklist')
+    deck_parser.add_argument('deck_file', help='Deck file path')
+
+    search_parser = subparsers.add_parser('search', help='Rulings of every card a search matches')
+    search_parser.add_argument('query', help='Search text (as search_cards.py)')
+    search_parser.add_argument('--set', dest='set_filter', help='Only cards from this set')
+    search_parser.add_argument('--regex', action='store_true', help='Treat the query as a regular expression')
+
+    card_parser = subparsers.add_parser('card', help='Rulings of one card')
+    card_parser.add_argument('card_name', help='Card name')
+
+    args = parser.parse_args(argv)
+    store = RulingsStore()
+
+    if args.command in ('ingest', 'download'):
+        start = time.perf_counter()
+        if args.command == 'ingest':
+            with open(args.bulk_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        else:
+            entries = download_bulk_rulings()
+        count, cards = store.ingest(entries)
+        print(f"Stored {count} rulings for {cards} cards in {store.path}/ ({time.perf_counter() - start:.2f}s)")
+        return
+
+    if not store.load():
+        print(f"No rulings store in {store.path}/")
+        print("Run: python scripts/rulings.py download  (or ingest <rulings bulk file>)")
+        return
+
+    if args.command == 'deck':
+        print_rulings(store, deck_cards(args.deck_file), args.deck_file)
+    elif args.command == 'search':
+        print_rulings(store, search_result_cards(args.query, args.set_filter, args.regex), f"search '{args.query}'")
+    elif args.command == 'card':
+        from card_index import load_card_index
+
+        card_data = load_card_index()
+        library_name = card_data.find(args.card_name)
+        oracle_id = card_data.oracle_id_of(library_name) if library_name else None
+        print_rulings(store, [(library_name or args.card_name, oracle_id)], library_name or args.card_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Scryfall Cassettes: Record and Replay
+
+Lets the network-bound scripts (set fetching, price checks, validator card
+lookups) run without Scryfall, for benchmarks and regression checks:
+
+- record: every final response the client receives is stored as a cassette
+  (one JSON file per distinct request) in .cache/cassettes/
+- replay: the client talks to a local stand-in server that answers from the
+  cassettes, with a configurable simulated latency and error rate (injected
+  errors are 503s, which the client retries like real ones)
+
+Requests are matched on method, path, query parameters (in any order) and
+JSON body. Absolute URLs inside recorded responses (next_page links) are
+rewritten to point at the stand-in, so paging works offline. Which requests
+fail is decided from the request and its repeat count rather than a random
+stream, so replays are deterministic even with concurrent requests.
+
+Modes are selected with environment variables read by scryfall_client:
+    SCRYFALL_MODE=record|replay       (default: live)
+    SCRYFALL_CASSETTE_DIR=<dir>       (default: .cache/cassettes)
+    SCRYFALL_REPLAY_LATENCY=<ms>      (default: 0)
+    SCRYFALL_REPLAY_ERROR_RATE=<0-1>  (default: 0)
+
+Usage:
+    python scripts/scryfall_cassettes.py [--list]
+    python scripts/scryfall_cassettes.py --serve [--port N] [--latency MS] [--error-rate P]
+    python scripts/scryfall_cassettes.py --bench [--latency MS] [--error-rate P] [--threads N] [--repeat N] [--spacing MS]
+
+Example:
+    SCRYFALL_MODE=record python scripts/fetch_set_cards.py blb
+    SCRYFALL_MODE=replay SCRYFALL_REPLAY_LATENCY=80 python scripts/fetch_set_cards.py blb
+    python scripts/scryfall_cassettes.py --bench --latency 50 --error-rate 0.05 --threads 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+CASSETTE_DIR = Path(os.environ.get("SCRYFALL_CASSETTE_DIR",
+                                   Path(__file__).parent.parent / ".cache" / "cassettes"))
+BASE_URL_PLACEHOLDER = "{{scryfall_api_url}}"
+
+# Responses worth replaying (transient errors are retried, not recorded)
+RECORDED_STATUSES = range(200, 500)
+RECORDED_HEADERS = ("Content-Type",)
+
+
+def request_key(method: str, path: str, body: Optional[bytes] = None) -> str:
+    """Canonical form of a request: method, path, sorted query and normalised JSON body"""
+    parts = urlsplit(path)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {parts.path}{'?' + query if query else ''}"
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+        except ValueError:
+            body = body.decode('utf-8', 'replace') if isinstance(body, bytes) else body
+        key += f"\n{body}"
+    return key
+
+
+class CassetteStore:
+    """Directory of recorded request/response pairs, one file per request key"""
+
+    def __init__(self, cassette_dir=None):
+        self.cassette_dir = Path(cassette_dir) if cassette_dir else CASSETTE_DIR
+
+    def path(self, key: str) -> Path:
+        return self.cassette_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def save(self, key: str, status: int, headers: Dict[str, str], body: str) -> None:
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'request': key, 'status': status, 'headers': headers, 'body': body}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def record(self, response, base_url: str) -> None:
+        """Store a requests.Response (absolute API URLs in its body become placeholders)"""
+        if response.status_code not in RECORDED_STATUSES:
+            return
+        request = response.request
+        path = request.path_url
+        base_path = urlsplit(base_url).path.rstrip('/')
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        self.save(request_key(request.method, path, request.body), response.status_code, headers,
+                  response.text.replace(base_url, BASE_URL_PLACEHOLDER))
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def cassettes(self) -> Iterator[Dict[str, Any]]:
+        if self.cassette_dir.exists():
+            for path in sorted(self.cassette_dir.glob("*.json")):
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+
+
+def injected_failure(key: str, count: int, error_rate: float) -> bool:
+    """Deterministic coin flip per (request, repeat number)"""
+    if error_rate <= 0:
+        return False
+    digest = hashlib.sha1(f"{key}#{count}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32 < error_rate
+
+
+class CassetteServer(ThreadingHTTPServer):
+    """Local stand-in for the Scryfall API that answers from a cassette store"""
+
+    daemon_threads = True
+
+    def __init__(self, store: CassetteStore, latency: float = 0.0, error_rate: float = 0.0, port: int = 0):
+        self.store = store
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hits: Dict[str, int] = {}
+        self.counts = {'served': 0, 'missing': 0, 'injected': 0}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", port), CassetteHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> 'CassetteServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def respond(self, key: str) -> Tuple[int, Dict[str, str], str]:
+        with self.lock:
+            self.hits[key] = count = self.hits.get(key, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if injected_failure(key, count, self.error_rate):
+            outcome, status, headers = 'injected', 503, {}
+            body = json.dumps({'object': 'error', 'code': 'unavailable', 'status': 503,
+                               'details': 'Injected replay failure'})
+        else:
+            cassette = self.store.load(key)
+            if cassette is None:
+                outcome, status, headers = 'missing', 404, {}
+                body = json.dumps({'object': 'error', 'code': 'not_found', 'status': 404,
+                                   'details': f"No recorded response for {key.splitlines()[0]}"})
+            else:
+                outcome, status, headers = 'served', cassette['status'], cassette['headers']
+                body = cassette['body'].replace(BASE_URL_PLACEHOLDER, self.url)
+
+        with self.lock:
+            self.counts[outcome] += 1
+        return status, headers, body
+
+
+class CassetteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def handle_request(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, text = self.server.respond(request_key(method, self.path, body))
+
+        payload = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", headers.get("Content-Type", "application/json"))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+def replay_settings() -> Dict[str, float]:
+    """Simulated latency (seconds) and error rate from the environment"""
+    return {
+        'latency': float(os.environ.get("SCRYFALL_REPLAY_LATENCY", 0)) / 1000,
+        'error_rate': float(os.environ.get("SCRYFALL_REPLAY_ERROR_RATE", 0)),
+    }
+
+
+def start_replay_server(cassette_dir=None, latency: Optional[float] = None,
+                        error_rate: Optional[float] = None, port: int = 0) -> CassetteServer:
+    """Start a stand-in server in a background thread (settings default to the environment)"""
+    settings = replay_settings()
+    return CassetteServer(CassetteStore(cassette_dir),
+                          settings['latency'] if latency is None else latency,
+                          settings['error_rate'] if error_rate is None else error_rate,
+                          port).start()
+
+
+def bench(store: CassetteStore, latency: float, error_rate: float, threads: int, repeat: int,
+          spacing: Optional[float] = None) -> None:
+    """Replay every cassette through ScryfallClient and report throughput"""
+    from scryfall_client import REQUEST_DELAY, RateLimiter, ScryfallClient
+
+    requests_to_send = []
+    for cassette in store.cassettes():
+        request_line, _, body = cassette['request'].partition('\n')
+        method, path = request_line.split(' ', 1)
+        requests_to_send.append((method, path, body or None))
+    if not requests_to_send:
+        print(f"No cassettes in {store.cassette_dir} (record some with SCRYFALL_MODE=record)")
+        return
+
+    server = start_replay_server(store.cassette_dir, latency, error_rate)
+    client = ScryfallClient(server.url, rate_limiter=RateLimiter(REQUEST_DELAY if spacing is None else spacing))
+
+    def send(request):
+        method, path, body = request
+        headers = {"Content-Type": "application/json"} if body else None
+        client.request(method, path, data=body, headers=headers).close()
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(send, requests_to_send * repeat))
+    finally:
+        server.shutdown()
+        server.server_close()
+    elapsed = time.perf_counter() - start
+
+    calls = len(requests_to_send) * repeat
+    interval = client.rate_limiter.interval
+    print(f"Replayed {calls} requests ({len(requests_to_send)} cassettes x {repeat}) on {threads} thread(s)")
+    print(f"  latency {latency * 1000:.0f}ms, error rate {error_rate:.0%}, client spacing {interval * 1000:.0f}ms")
+    print(f"  {elapsed:.2f}s, {calls / elapsed:.1f} requests/s")
+    print(f"  Server: {server.counts['served']} served, {server.counts['injected']} injected errors, "
+          f"{server.counts['missing']} missing")
+    print(f"  Client: {client.summary()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record and replay Scryfall responses')
+    parser.add_argument('--list', action='store_true', help='List recorded requests (default)')
+    parser.add_argument('--serve', action='store_true', help='Run the stand-in server in the foreground')
+    parser.add_argument('--bench', action='store_true', help='Replay every cassette and report throughput')
+    parser.add_argument('--port', type=int, default=0, help='Server port for --serve (default: any free port)')
+    parser.add_argument('--latency', type=float, help='Simulated latency per request in ms')
+    parser.add_argument('--error-rate', type=float, help='Share of requests answered with 503 (0-1)')
+    parser.add_argument('--threads', type=int, default=1, help='Concurrent requests for --bench (default: 1)')
+    parser.add_argument('--repeat', type=int, default=1, help='Replays of each cassette for --bench (default: 1)')
+    parser.add_argument('--spacing', type=float,
+                        help='Client request spacing in ms for --bench (default: the live rate limit)')
+    args = parser.parse_args(argv)
+
+    store = CassetteStore()
+    settings = replay_settings()
+    latency = settings['latency'] if args.latency is None else args.latency / 1000
+    error_rate = settings['error_rate'] if args.error_rate is None else args.error_rate
+
+    if args.bench:
+        bench(store, latency, error_rate, args.threads, args.repeat,
+              None if args.spacing is None else args.spacing / 1000)
+        return
+
+    if args.serve:
+        server = CassetteServer(store, latency, error_rate, args.port)
+        print(f"Replaying {store.cassette_dir} at {server.url} "
+              f"(latency {latency * 1000:.0f}ms, error rate {error_rate:.0%})")
+        print(f"Point scripts at it with SCRYFALL_API_URL={server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"\n{server.counts['served']} served, {server.counts['injected']} injected errors, "
+                  f"{server.counts['missing']} missing")
+        return
+
+    cassettes = list(store.cassettes())
+    for cassette in cassettes:
+        print(f"{cassette['status']}  {cassette['request'].splitlines()[0]}")
+    print(f"{len(cassettes)} cassette(s) in {store.cassette_dir}")
+
+
+if __name__ == "__main__":
+    main()
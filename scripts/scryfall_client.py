@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Scryfall HTTP Client
+
+Shared network layer for every script that talks to Scryfall:
+
+- One requests.Session per process, so connections are kept alive and pooled
+  instead of paying a TCP/TLS handshake per call.
+- A rate limiter shared by all threads (Scryfall asks for 50-100ms between calls).
+- Bounded retries with jittered exponential backoff on connection errors,
+  timeouts, HTTP 429 and 5xx responses. Retry-After is honoured when present.
+- Per-call latency metrics (status, attempts, elapsed time) with a summary.
+
+The API base URL can be pointed at a local stand-in server with the
+SCRYFALL_API_URL environment variable. SCRYFALL_MODE=record stores every
+response as a cassette and SCRYFALL_MODE=replay answers from the cassettes
+through a local stand-in with simulated latency and errors, for offline
+benchmarks (see scryfall_cassettes.py).
+
+Example:
+    from scryfall_client import get_client
+    response = get_client().get("/cards/named", params={"exact": "Sol Ring"})
+"""
+
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+BASE_URL = os.environ.get("SCRYFALL_API_URL", "https://api.scryfall.com").rstrip("/")
+MODES = ("live", "record", "replay")
+USER_AGENT = "MTG-Claude-Helper/1.0"
+REQUEST_DELAY = 0.1  # 100ms between requests, shared across threads
+REQUEST_TIMEOUT = 30
+
+# Retry policy
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds; doubled each attempt
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POOL_SIZE = 10
+
+# Headers required by Scryfall API
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/json"
+}
+
+
+class RateLimiter:
+    """Spaces out requests shared by several threads"""
+
+    def __init__(self, interval=REQUEST_DELAY):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CallMetric(NamedTuple):
+    """One logical call (including its retries)"""
+    method: str
+    url: str
+    status: Optional[int]
+    attempts: int
+    elapsed: float
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ScryfallClient:
+    """Pooled, rate-limited, retrying HTTP client"""
+
+    def __init__(self, base_url: str = BASE_URL, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, rate_limiter: Optional[RateLimiter] = None,
+                 pool_size: int = POOL_SIZE, recorder=None):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder  # CassetteStore in record mode
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.pool_size = pool_size
+        self.metrics: List[CallMetric] = []
+
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The shared requests.Session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    session.headers.update(HEADERS)
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def url(self, path_or_url: str) -> str:
+        """Absolute URL for an API path (absolute URLs such as next_page pass through)"""
+        if path_or_url.startswith(("http://", "https://")):
+            return path_or_url
+        return f"{self.base_url}{path_or_url}"
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered exponential backoff for a 0-based retry number"""
+        delay = min(BACKOFF_MAX, self.backoff_base * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def request(self, method: str, path_or_url: str, **kwargs):
+        """
+        Send a request, retrying connection errors, timeouts, 429 and 5xx.
+
+        Returns the final response (which may still be an error status once
+        retries are exhausted); raises requests.RequestException if the last
+        attempt failed without a response.
+        """
+        import requests
+
+        url = self.url(path_or_url)
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            self.rate_limiter.wait()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self._record(method, url, None, attempt + 1, start)
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = retry_after_seconds(response.headers.get("Retry-After"))
+                time.sleep(min(BACKOFF_MAX, delay) if delay is not None else self.backoff(attempt))
+                response.close()
+                attempt += 1
+                continue
+
+            self._record(method, url, response.status_code, attempt + 1, start)
+            if self.recorder is not None:
+                self.recorder.record(response, self.base_url)
+            return response
+
+    def get(self, path_or_url: str, **kwargs):
+        return self.request("GET", path_or_url, **kwargs)
+
+    def post(self, path_or_url: str, **kwargs):
+        return self.request("POST", path_or_url, **kwargs)
+
+    def _record(self, method: str, url: str, status: Optional[int], attempts: int, start: float) -> None:
+        metric = CallMetric(method, url, status, attempts, time.perf_counter() - start)
+        with self._lock:
+            self.metrics.append(metric)
+
+    def stats(self) -> Dict[str, Any]:
+        """Call count, retries, failures and latency percentiles (seconds)"""
+        with self._lock:
+            metrics = list(self.metrics)
+        latencies = sorted(metric.elapsed for metric in metrics)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            'calls': len(metrics),
+            'retries': sum(metric.attempts - 1 for metric in metrics),
+            'failures': sum(1 for metric in metrics if metric.status is None or metric.status >= 400),
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'max': latencies[-1] if latencies else 0.0,
+        }
+
+    def summary(self) -> str:
+        """One-line description of the calls made so far"""
+        stats = self.stats()
+        return (f"{stats['calls']} requests, {stats['retries']} retries, {stats['failures']} failed, "
+                f"latency p50 {stats['p50'] * 1000:.0f}ms / p95 {stats['p95'] * 1000:.0f}ms / "
+                f"max {stats['max'] * 1000:.0f}ms")
+
+
+_shared_client: Optional[ScryfallClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_client() -> ScryfallClient:
+    """Process-wide client shared by all commands and threads (live, recording or replaying per SCRYFALL_MODE)"""
+    global _shared_client
+
+    with _shared_client_lock:
+        if _shared_client is None:
+            mode = os.environ.get("SCRYFALL_MODE", "live").lower()
+            if mode not in MODES:
+                raise ValueError(f"SCRYFALL_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+            if mode == "replay":
+                from scryfall_cassettes import start_replay_server
+                _shared_client = ScryfallClient(start_replay_server().url)
+            elif mode == "record":
+                from scryfall_cassettes import CassetteStore
+                _shared_client = ScryfallClient(recorder=CassetteStore())
+            else:
+                _shared_client = ScryfallClient()
+        return _shared_client
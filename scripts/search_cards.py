@@ -2,54 +2,50 @@
 """
 MTG Card Search Script for Claude Code /search command
 Searches through the local card database efficiently
+
+With --set, only the matching set files are opened (via the set catalog);
+the set can be given by code or by name. Results are kept in the persistent
+query cache until the library changes (--no-cache bypasses it).
+
+--complete <prefix> prints type-ahead card name completions instead
+(see autocomplete.py).
+
+--regex treats the query as a regular expression instead of literal text;
+library-wide regex searches scan a cached, memory-mapped text column (see
+regex_search.py) and are listed in library order.
 """
 
-import json
-import os
 import sys
 import re
-from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from library_watcher import get_library
+from query_cache import QueryCache
+from set_catalog import load_set_catalog
+
+DISPLAY_LIMIT = 10  # Results shown (and cached) per search
+
 def load_card_data() -> List[Dict[str, Any]]:
-    """Load all card data from the card-library directory"""
-    cards = []
-    
-    # Find the project root directory (where this script is located)
-    script_dir = Path(__file__).parent
-    project_root = script_dir.parent
-    card_library_path = project_root / "card-library"
-    
-    if not card_library_path.exists():
-        return cards
-    
-    # Find all all_cards_*.json files
-    for json_file in card_library_path.rglob("all_cards_*.json"):
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                set_data = json.load(f)
-                if isinstance(set_data, list):
-                    cards.extend(set_data)
-                elif isinstance(set_data, dict) and 'data' in set_data:
-                    cards.extend(set_data['data'])
-        except (json.JSONDecodeError, FileNotFoundError, KeyError):
-            continue
-    
-    return cards
-
-def search_cards(query: str, set_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Search for cards matching the query"""
-    cards = load_card_data()
+    """Load all card data from the card-library directory (shared, incrementally updated index)"""
+    return list(get_library().cards())
+
+def search_cards(query: str, set_filter: Optional[str] = None, regex: bool = False) -> List[Dict[str, Any]]:
+    """Search for cards matching the query (a regular expression if regex is set)"""
+    if regex and not set_filter:
+        from regex_search import RegexSearch
+        searcher = RegexSearch()
+        rows = searcher.search(query)
+        searcher.close()
+        return searcher.cards(rows)
+
+    # Set-scoped searches read only that set's partition of the library
+    cards = load_set_catalog().load_cards(set_filter) if set_filter else load_card_data()
     results = []
     
     # Create case-insensitive regex pattern
-    pattern = re.compile(re.escape(query), re.IGNORECASE)
+    pattern = re.compile(query if regex else re.escape(query), re.IGNORECASE)
     
     for card in cards:
-        # Skip if set filter specified and doesn't match
-        if set_filter and card.get('set', '').lower() != set_filter.lower():
-            continue
-            
         # Search in card name, oracle text, and type line
         searchable_text = ' '.join([
             card.get('name', ''),
@@ -59,6 +55,9 @@ def search_cards(query: str, set_filter: Optional[str] = None) -> List[Dict[str,
         
         if pattern.search(searchable_text):
             results.append(card)
+
+    if regex:
+        return results
     
     # Sort results by exact match first, then alphabetically
     def sort_key(card):
@@ -74,6 +73,32 @@ def search_cards(query: str, set_filter: Optional[str] = None) -> List[Dict[str,
     results.sort(key=sort_key)
     return results
 
+def search_cards_cached(query: str, set_filter: Optional[str] = None, limit: int = DISPLAY_LIMIT,
+                        regex: bool = False):
+    """
+    Search through the persistent query cache.
+    Returns tuple of (total matches, first `limit` results)
+    """
+    cache = QueryCache()
+    key = ['search', query, (set_filter or '').lower(), limit] + (['regex'] if regex else [])
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['total'], cached['cards']
+
+    if regex and not set_filter:
+        # Only the displayed matches are decoded from the card files
+        from regex_search import RegexSearch
+        searcher = RegexSearch()
+        rows = searcher.search(query)
+        searcher.close()
+        results = searcher.cards(rows[:limit])
+        cache.put(key, {'total': len(rows), 'cards': [dict(card) for card in results]})
+        return len(rows), results
+
+    results = search_cards(query, set_filter, regex)
+    cache.put(key, {'total': len(results), 'cards': [dict(card) for card in results[:limit]]})
+    return len(results), results[:limit]
+
 def format_mana_symbols(mana_cost: str) -> str:
     """Convert mana cost to readable symbols"""
     if not mana_cost:
@@ -187,27 +212,55 @@ def format_card_output(card: Dict[str, Any]) -> str:
     
     return output
 
-def main():
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python search_cards.py <card_name> [--set <set_code>]")
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if len(argv) < 1:
+        print("Usage: python search_cards.py <card_name> [--set <set_code>] [--regex] [--no-cache]")
+        print("       python search_cards.py --complete <prefix> [--limit N]")
         sys.exit(1)
+
+    if argv[0] == '--complete':
+        from autocomplete import DEFAULT_LIMIT, complete
+
+        if len(argv) < 2:
+            print("Error: --complete requires a name prefix")
+            sys.exit(1)
+        limit = DEFAULT_LIMIT
+        if '--limit' in argv:
+            try:
+                limit = int(argv[argv.index('--limit') + 1])
+            except (IndexError, ValueError):
+                print("Error: --limit requires a number")
+                sys.exit(1)
+        for card_name in complete(argv[1], limit):
+            print(card_name)
+        return
     
     # Parse arguments
-    query = sys.argv[1]
+    query = argv[0]
     set_filter = None
+    use_cache = '--no-cache' not in argv
+    regex = '--regex' in argv
     
-    if '--set' in sys.argv:
+    if '--set' in argv:
         try:
-            set_index = sys.argv.index('--set')
-            set_filter = sys.argv[set_index + 1]
+            set_index = argv.index('--set')
+            set_filter = argv[set_index + 1]
         except (IndexError, ValueError):
             print("Error: --set requires a set code")
             sys.exit(1)
     
     # Perform search
-    results = search_cards(query, set_filter)
+    try:
+        if use_cache:
+            total, results = search_cards_cached(query, set_filter, regex=regex)
+        else:
+            results = search_cards(query, set_filter, regex)
+            total = len(results)
+    except re.error as e:
+        print(f"Error: invalid regular expression '{query}': {e}")
+        sys.exit(1)
     
     if not results:
         print(f"No cards found matching '{query}'")
@@ -216,18 +269,19 @@ def main():
         sys.exit(0)
     
     # Display results
-    print(f"Found {len(results)} card(s) matching '{query}':")
+    print(f"Found {total} card(s) matching '{query}':")
     if set_filter:
         print(f"(filtered to set: {set_filter})")
     print()
     
-    for i, card in enumerate(results[:10]):  # Limit to 10 results
+    shown = results[:DISPLAY_LIMIT]
+    for i, card in enumerate(shown):
         print(format_card_output(card))
-        if i < len(results) - 1 and i < 9:
+        if i < len(shown) - 1:
             print("---")
     
-    if len(results) > 10:
-        print(f"... and {len(results) - 10} more results")
+    if total > DISPLAY_LIMIT:
+        print(f"... and {total - DISPLAY_LIMIT} more results")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
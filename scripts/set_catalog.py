@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+MTG Set Catalog
+
+Maps every set code and set name in the card library to its directory and
+card file, built from the per-set set_info_<code>.json summaries (set
+directories without a summary are catalogued from their all_cards_<code>.json
+file name). Set-scoped operations use it to open only the matching set files
+instead of loading the whole library.
+
+The catalog is cached in .cache/ keyed by the library fingerprint, so it is
+rebuilt whenever a set is fetched or changed.
+
+Usage:
+    python scripts/set_catalog.py [<set code or name>]
+
+Example:
+    python scripts/set_catalog.py dmu
+    python scripts/set_catalog.py "Dominaria United"
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+from card_record import Card
+from library_watcher import (CACHE_DIR, CARD_LIBRARY_PATH, library_fingerprint, prune_cache, read_card_file,
+                             write_json_atomic)
+
+CACHE_VERSION = 1
+
+
+def build_catalog(library_path=CARD_LIBRARY_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the set summaries of every set directory.
+
+    Returns:
+        dict: lowercase set code -> {'code', 'name', 'dir', 'file', 'total_cards'}
+              where file is the card file path relative to the library (or None)
+    """
+    catalog = {}
+    if not library_path.exists():
+        return catalog
+
+    with os.scandir(library_path) as set_dirs:
+        for set_dir in set_dirs:
+            if not set_dir.is_dir():
+                continue
+
+            card_files = {}
+            summaries = []
+            with os.scandir(set_dir.path) as files:
+                for entry in files:
+                    if entry.name.startswith("all_cards_") and entry.name.endswith(".json"):
+                        card_files[entry.name[len("all_cards_"):-len(".json")].lower()] = entry.name
+                    elif entry.name.startswith("set_info_") and entry.name.endswith(".json"):
+                        summaries.append(entry.path)
+
+            for summary_path in summaries:
+                try:
+                    with open(summary_path, 'r', encoding='utf-8') as f:
+                        summary = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                code = str(summary.get('set_code', '')).lower()
+                if not code:
+                    continue
+                catalog[code] = {
+                    'code': code,
+                    'name': summary.get('set_name', set_dir.name),
+                    'dir': set_dir.name,
+                    'file': f"{set_dir.name}/{card_files[code]}" if code in card_files else None,
+                    'total_cards': summary.get('total_cards', 0),
+                }
+
+            for code, file_name in card_files.items():
+                if code not in catalog:
+                    catalog[code] = {
+                        'code': code,
+                        'name': set_dir.name.replace('-', ' ').title(),
+                        'dir': set_dir.name,
+                        'file': f"{set_dir.name}/{file_name}",
+                        'total_cards': None,
+                    }
+
+    return catalog
+
+
+class SetCatalog:
+    """Set code/name lookups over the card library"""
+
+    def __init__(self, sets: Dict[str, Dict[str, Any]], library_path=CARD_LIBRARY_PATH):
+        self.sets = sets
+        self.library_path = library_path
+        self._by_name: Dict[str, List[str]] = {}
+        for code, entry in sets.items():
+            for key in {str(entry['name']).lower(), entry['dir'].lower()}:
+                self._by_name.setdefault(key, []).append(code)
+
+    def __len__(self):
+        return len(self.sets)
+
+    def resolve(self, identifier: str) -> List[Dict[str, Any]]:
+        """Catalog entries for a set code, set name or set directory name"""
+        key = identifier.strip().lower()
+        if key in self.sets:
+            return [self.sets[key]]
+        return [self.sets[code] for code in sorted(self._by_name.get(key, []))]
+
+    def files_for(self, identifier: str) -> List[str]:
+        """Card files (relative to the library) of the matching sets"""
+        return [entry['file'] for entry in self.resolve(identifier) if entry['file']]
+
+    def load_cards(self, identifier: str) -> List[Card]:
+        """Cards of the matching sets (as compact records), reading only their files"""
+        codes = {entry['code'] for entry in self.resolve(identifier)}
+        cards = []
+        for rel_path in self.files_for(identifier):
+            try:
+                set_cards = read_card_file(self.library_path / rel_path)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load {rel_path}: {e}")
+                continue
+            cards.extend(Card.from_dict(card) for card in set_cards if card.get('set', '').lower() in codes)
+        return cards
+
+
+def load_set_catalog(library_path=CARD_LIBRARY_PATH) -> SetCatalog:
+    """Load the set catalog from cache, rebuilding it if the library changed"""
+    fingerprint = library_fingerprint(library_path)
+    cache_file = CACHE_DIR / f"set_catalog_v{CACHE_VERSION}_{fingerprint}.json"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return SetCatalog(json.load(f), library_path)
+        except (OSError, ValueError):
+            pass
+
+    sets = build_catalog(library_path)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(cache_file, sets)
+    prune_cache("set_catalog_v*_*.json")
+    return SetCatalog(sets, library_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List or look up sets in the card library')
+    parser.add_argument('set_identifier', nargs='?', help='Set code, set name or directory name')
+    args = parser.parse_args(argv)
+
+    catalog = load_set_catalog()
+    entries = catalog.resolve(args.set_identifier) if args.set_identifier else \
+        sorted(catalog.sets.values(), key=lambda entry: entry['code'])
+
+    if not entries:
+        print(f"No set matching '{args.set_identifier}' in the card library ({len(catalog)} sets)")
+        return
+
+    for entry in entries:
+        total = entry['total_cards'] if entry['total_cards'] is not None else '?'
+        print(f"  {entry['code'].upper():<6} {entry['name']:<45} {total:>5} cards  {entry['file'] or '(no card file)'}")
+    if not args.set_identifier:
+        print(f"{len(entries)} sets")
+
+
+if __name__ == "__main__":
+    main()
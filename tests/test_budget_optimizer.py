@@ -0,0 +1,111 @@
+import pytest
+
+from banned_list import BanTable, parse_banned_list
+from budget_optimizer import BudgetOptimizer, assign_printings
+from recommend import CardRecommender
+
+
+class FixedSubstitutes(BudgetOptimizer):
+    """Planner with canned substitute rankings instead of the recommender model"""
+
+    def __init__(self, options):
+        self.options = options
+        self.requested = None
+
+    def substitutes(self, card_names, deck, alternatives=3):
+        self.requested = list(card_names)
+        return {name: self.options.get(name, []) for name in card_names}
+
+
+PRINTINGS = {
+    'mox diamond': [40.0, 'Mox Diamond', 'sth', '138'],
+    'force of will': [80.0, 'Force of Will', 'all', '28'],
+    'counterspell': [1.0, 'Counterspell', 'mh2', '267'],
+    'brainstorm': [0.5, 'Brainstorm', 'sta', '13'],
+}
+
+
+def test_assign_printings_uses_cheapest_printing_and_free_basics():
+    assignment, unpriced = assign_printings([(1, 'Force of Will'), (10, 'Island'), (1, 'Unknown Card')], PRINTINGS)
+    assert assignment == [(1, 'Force of Will', 80.0, ('all', '28')), (10, 'Island', 0.0, None)]
+    assert unpriced == ['Unknown Card']
+
+
+def test_plan_swaps_most_expensive_cards_until_under_budget():
+    assignment, _ = assign_printings([(1, 'Force of Will'), (1, 'Mox Diamond'), (4, 'Brainstorm')], PRINTINGS)
+    planner = FixedSubstitutes({
+        'Force of Will': [('Daze', 0.5, 0.6), ('Foil', 1.0, 0.4)],
+        'Mox Diamond': [('Chrome Mox', 5.0, 0.5)],
+    })
+
+    _, swaps, total = planner.plan(assignment, budget_limit=50.0)
+
+    assert planner.requested == ['Force of Will', 'Mox Diamond', 'Brainstorm']  # Most expensive (quantity x price) first
+    assert [(swap[1], swap[3]) for swap in swaps] == [('Force of Will', 'Daze')]
+    assert swaps[0][5] == pytest.approx(79.5)
+    assert total == pytest.approx(80.0 + 40.0 + 2.0 - 79.5)
+
+
+def test_plan_without_swaps_when_already_under_budget():
+    assignment, _ = assign_printings([(4, 'Brainstorm'), (1, 'Counterspell')], PRINTINGS)
+    _, swaps, total = FixedSubstitutes({'Counterspell': [('Daze', 0.5, 0.9)]}).plan(assignment, budget_limit=30.0)
+    assert swaps == []
+    assert total == pytest.approx(3.0)
+
+
+def test_plan_trades_similarity_for_price_when_still_over_budget():
+    assignment, _ = assign_printings([(1, 'Force of Will'), (1, 'Mox Diamond')], PRINTINGS)
+    planner = FixedSubstitutes({
+        'Force of Will': [('Pact of Negation', 20.0, 0.7), ('Daze', 0.5, 0.5)],
+        'Mox Diamond': [('Chrome Mox', 15.0, 0.6), ('Lotus Petal', 0.5, 0.3)],
+    })
+
+    _, swaps, total = planner.plan(assignment, budget_limit=20.0)
+
+    # Closest substitutes leave $35; the cheaper alternative with the largest extra saving goes in first
+    assert [(swap[1], swap[3]) for swap in swaps] == [('Force of Will', 'Daze'), ('Mox Diamond', 'Chrome Mox')]
+    assert total == pytest.approx(15.5)
+    assert swaps[0][5] == pytest.approx(79.5)
+
+
+def test_plan_reports_remaining_cost_when_no_substitutes_exist():
+    assignment, _ = assign_printings([(1, 'Force of Will')], PRINTINGS)
+    _, swaps, total = FixedSubstitutes({}).plan(assignment, budget_limit=30.0)
+    assert swaps == []
+    assert total == pytest.approx(80.0)
+
+
+def spell(name, oracle_text, price, type_line='Instant'):
+    return {'oracle_id': f"o-{name}", 'name': name, 'lang': 'en', 'type_line': type_line, 'oracle_text': oracle_text,
+            'color_identity': ['U'], 'legalities': {'vintage': 'legal'}, 'prices': {'usd': price}}
+
+
+LIBRARY = [
+    spell("Force of Will", "Counter target spell. Exile a blue card from your hand.", '80.00'),
+    spell("Mana Drain", "Counter target spell. Add mana.", '30.00'),
+    spell("Mental Misstep", "Counter target spell with mana value 1.", '2.00'),
+    spell("Counterspell", "Counter target spell.", '1.00'),
+    spell("Flying Fish", "Flying", '0.10', 'Creature'),
+    spell("Flying Bird", "Flying", '0.10', 'Creature'),
+    spell("Flying Drake", "Flying", '0.10', 'Creature'),
+    spell("Flying Sprite", "Flying", '0.10', 'Creature'),
+]
+
+VALUE_VINTAGE = BanTable(parse_banned_list(
+    "## $30 Value Vintage (Budget Vintage)\n\n### Banned Cards\n- Mana Drain\n\n### Restricted Cards\n- Mental Misstep\n"))
+
+
+@pytest.fixture(scope='module')
+def optimizer():
+    printing_index = {card['name'].lower(): [float(card['prices']['usd']), card['name'], 'tst', '1'] for card in LIBRARY}
+    return BudgetOptimizer(CardRecommender.from_cards(LIBRARY), printing_index, 'valuevintage', VALUE_VINTAGE)
+
+
+def test_substitutes_skip_banned_cards(optimizer):
+    options = optimizer.substitutes(["Force of Will"], [(1, "Force of Will")])
+    assert sorted(name for name, _, _ in options["Force of Will"]) == ["Counterspell", "Mental Misstep"]
+
+
+def test_restricted_substitutes_only_replace_single_copies(optimizer):
+    options = optimizer.substitutes(["Force of Will"], [(4, "Force of Will")])
+    assert [name for name, _, _ in options["Force of Will"]] == ["Counterspell"]
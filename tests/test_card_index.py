@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+import card_index
+from card_index import CardIndex, build_card_index, file_records, index_card_file, parse_printing_reference
+
+
+def printing(name, set_code, number, **fields):
+    return {'object': 'card', 'id': f"{set_code}-{number}", 'oracle_id': f"oracle-{name}", 'name': name,
+            'set': set_code, 'collector_number': str(number), 'type_line': 'Artifact', **fields}
+
+
+ALPHA = [
+    printing("Sol Ring", 'lea', 270, oracle_text="{T}: Add {C}{C}.", prices={'usd': '900.00'}),
+    printing("Jötun Grunt", 'lea', 1, oracle_text="Cumulative upkeep—Put two cards… «quoted»"),
+    printing("Fire // Ice", 'lea', 2, card_faces=[{'name': 'Fire'}, {'name': 'Ice'}]),
+]
+BETA = [
+    printing("Sol Ring", 'c21', 263, tcgplayer_id=12345, prices={'usd': '1.31'}),
+    printing("Æther Vial", 'c21', 5),
+]
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_index, 'SIDECAR_DIR', tmp_path / "cache" / "card-offsets")
+    library_path = tmp_path / "card-library"
+    (library_path / "alpha").mkdir(parents=True)
+    (library_path / "commander-2021").mkdir()
+    # A plain list with indentation and a Scryfall list object on one line
+    (library_path / "alpha" / "all_cards_lea.json").write_text(json.dumps(ALPHA, indent=2, ensure_ascii=False),
+                                                               encoding='utf-8')
+    (library_path / "commander-2021" / "all_cards_c21.json").write_text(
+        json.dumps({'object': 'list', 'has_more': False, 'data': BETA}, ensure_ascii=False), encoding='utf-8')
+    return library_path
+
+
+@pytest.mark.parametrize('rel_path, cards', [("alpha/all_cards_lea.json", ALPHA),
+                                             ("commander-2021/all_cards_c21.json", BETA)])
+def test_offsets_point_at_each_record(library, rel_path, cards):
+    records, stat = index_card_file(library / rel_path)
+    data = (library / rel_path).read_bytes()
+
+    assert [name for name, *_ in records] == [card['name'] for card in cards]
+    for (name, oracle_id, offset, length, _), card in zip(records, cards):
+        assert json.loads(data[offset:offset + length]) == card
+        assert oracle_id == card['oracle_id']
+    assert stat[1] == len(data)
+
+
+def test_sidecar_is_reused_until_the_file_changes(library, monkeypatch):
+    rel_path = "alpha/all_cards_lea.json"
+    records, stat = file_records(library, rel_path, (0, 0))
+
+    def fail(path):
+        raise AssertionError("re-indexed an unchanged file")
+
+    index_file = card_index.index_card_file
+    monkeypatch.setattr(card_index, 'index_card_file', fail)
+    assert file_records(library, rel_path, stat) == (records, stat)
+
+    monkeypatch.setattr(card_index, 'index_card_file', index_file)
+    (library / rel_path).write_text(json.dumps(ALPHA[:1]), encoding='utf-8')
+    changed = (stat[0] + 1, (library / rel_path).stat().st_size)
+    new_records, new_stat = file_records(library, rel_path, changed)
+    assert [name for name, *_ in new_records] == ["Sol Ring"]
+    assert new_stat[1] == (library / rel_path).stat().st_size
+
+
+def test_merged_index_reads_canonical_and_all_printings(library):
+    index = build_card_index(library)
+    assert index['errors'] == []
+    assert index['files'] == ["alpha/all_cards_lea.json", "commander-2021/all_cards_c21.json"]
+    assert len(index['stats']) == len(index['files'])
+
+    cards = CardIndex(index, library)
+    assert cards["Sol Ring"]['set'] == 'c21'  # Last printing in file order is canonical
+    assert [card['collector_number'] for card in cards.printings("Sol Ring")] == ['270', '263']
+    assert cards["Jötun Grunt"]['oracle_text'] == ALPHA[1]['oracle_text']
+    assert cards.find("fire") == "Fire // Ice"
+    assert cards.find("æther vial") == "Æther Vial"
+    assert cards.by_oracle_id("oracle-Æther Vial")['name'] == "Æther Vial"
+    cards.close()
+
+
+def test_unreadable_file_is_reported_not_indexed(library):
+    (library / "alpha" / "all_cards_bad.json").write_text("not json", encoding='utf-8')
+    index = build_card_index(library)
+    assert [rel_path for rel_path, _ in index['errors']] == ["alpha/all_cards_bad.json"]
+    assert "alpha/all_cards_bad.json" not in index['files']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Sol Ring", ("Sol Ring", None, None)),
+    ("  Sol Ring  ", ("Sol Ring", None, None)),
+    ("Sol Ring (C21) 263", ("Sol Ring", 'c21', '263')),
+    ("Sol Ring (C21)", ("Sol Ring", 'c21', None)),
+    ("Sol Ring (C21) 263 *F*", ("Sol Ring", 'c21', '263')),
+    ("Fire // Ice (MH2) 290", ("Fire // Ice", 'mh2', '290')),
+    ("Lightning Bolt (PLST) 2X2-117", ("Lightning Bolt", 'plst', '2X2-117')),
+    ("Jötun Grunt (CSP) 8", ("Jötun Grunt", 'csp', '8')),
+    ("Sol Ring (not a set code) 1", ("Sol Ring (not a set code) 1", None, None)),
+])
+def test_parse_printing_reference(text, expected):
+    assert parse_printing_reference(text) == expected
+
+
+def test_resolve_reference_prefers_the_exact_printing(library):
+    cards = CardIndex(build_card_index(library), library)
+    assert cards.resolve_reference("Sol Ring (LEA) 270")['set'] == 'lea'
+    assert cards.resolve_reference("Sol Ring (LEA)")['set'] == 'lea'
+    assert cards.resolve_reference("Sol Ring (LEA) 999")['set'] == 'lea'  # Unknown number: that set's printing
+    assert cards.resolve_reference("Sol Ring (XYZ) 1")['set'] == 'c21'  # Unknown set: canonical printing
+    assert cards.resolve_reference("sol ring")['set'] == 'c21'
+    assert cards.resolve_reference("Black Lotus (LEA) 232") is None
+    cards.close()
+
+
+def test_printing_lookups(library):
+    cards = CardIndex(build_card_index(library), library)
+    assert cards.printing('C21', '263')['prices']['usd'] == '1.31'
+    assert cards.by_id('lea-270')['collector_number'] == '270'
+    assert cards.find_printing('tcgplayer_id', 12345)['collector_number'] == '263'
+    assert cards.find_printing('tcgplayer_id', 99999) is None
+    cards.close()
+
+
+def test_printings_beyond_the_packed_range_are_stored_unpacked(library, monkeypatch):
+    # Room for offsets below 64 and lengths below 1024: later records of the indented file overflow
+    monkeypatch.setattr(card_index, 'OFFSET_BITS', 6)
+    monkeypatch.setattr(card_index, 'LENGTH_BITS', 10)
+    index = build_card_index(library)
+    table = index['printings']['id']
+    assert isinstance(table['lea-270'], int) and isinstance(table['lea-2'], list)
+
+    cards = CardIndex(json.loads(json.dumps(index)), library)
+    for card in ALPHA + BETA:
+        assert cards.by_id(card['id'])['name'] == card['name']
+    assert cards.printing('lea', '2')['name'] == "Fire // Ice"
+    cards.close()
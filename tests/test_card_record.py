@@ -0,0 +1,22 @@
+import card_record
+from card_record import Card
+
+
+def test_card_reads_like_the_scryfall_dict():
+    data = {'name': "Sol Ring", 'rarity': 'uncommon', 'colors': [], 'prices': {'usd': '1.31'},
+            'legalities': {'vintage': 'restricted'}, 'not_a_field': 1}
+    card = Card.from_dict(data)
+    assert card['name'] == "Sol Ring" and card.get('rarity') == 'uncommon'
+    assert card['prices']['usd'] == '1.31' and card['legalities'] == {'vintage': 'restricted'}
+    assert 'not_a_field' not in card and Card.from_dict(card) is card
+
+
+def test_shared_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(card_record, 'MAX_SHARED', 10)
+    monkeypatch.setattr(card_record, '_shared', {})
+
+    cards = [Card.from_dict({'name': f"Card {i}", 'prices': {'usd': str(i)}, 'colors': ['R']}) for i in range(50)]
+
+    assert len(card_record._shared) <= 10
+    assert [card['prices']['usd'] for card in cards] == [str(i) for i in range(50)]
+    assert cards[-1]['colors'] is cards[-2]['colors']
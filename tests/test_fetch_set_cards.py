@@ -0,0 +1,100 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetch_set_cards
+from fetch_set_cards import FetchJournal, fetch_cards_from_set
+from scryfall_client import RateLimiter, ScryfallClient
+
+PAGES = {
+    '/cards/search': ([{'name': "Card 1", 'set': 'tst', 'set_name': "Test Set"}], '/page/2'),
+    '/page/2': ([{'name': "Card 2", 'set': 'tst', 'set_name': "Test Set"}], '/page/3'),
+    '/page/3': ([{'name': "Card 3", 'set': 'tst', 'set_name': "Test Set"}], None),
+}
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """Stand-in for the paginated search API; paths in server.failing answer 500"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.server.requested.append(path)
+        if path in self.server.failing or path not in PAGES:
+            status, body = 500, {'object': 'error'}
+        else:
+            cards, next_page = PAGES[path]
+            status, body = 200, {'object': 'list', 'data': cards, 'has_more': next_page is not None}
+            if next_page:
+                body['next_page'] = f"http://127.0.0.1:{self.server.server_address[1]}{next_page}"
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SearchHandler)
+    server.requested, server.failing = [], set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = ScryfallClient(f"http://127.0.0.1:{server.server_address[1]}", max_retries=0,
+                            rate_limiter=RateLimiter(0.0))
+    monkeypatch.setattr(fetch_set_cards, 'get_client', lambda: client)
+    monkeypatch.setattr(fetch_set_cards, 'JOURNAL_DIR', tmp_path / "fetch-journal")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_interrupted_fetch_resumes_from_the_last_checkpoint(server):
+    server.failing.add('/page/3')
+    assert fetch_cards_from_set('tst') == (None, None)
+    assert server.requested == ['/cards/search', '/page/2', '/page/3']
+
+    server.failing.clear()
+    server.requested.clear()
+    cards, set_name = fetch_cards_from_set('tst')
+
+    assert server.requested == ['/page/3']
+    assert [card['name'] for card in cards] == ["Card 1", "Card 2", "Card 3"]
+    assert set_name == "Test Set"
+
+
+def test_fetch_with_every_page_checkpointed_makes_no_requests(server):
+    fetch_cards_from_set('tst')
+    server.requested.clear()
+
+    cards, _ = fetch_cards_from_set('tst')
+
+    assert server.requested == []
+    assert len(cards) == 3
+
+
+def test_restart_ignores_the_checkpoints(server):
+    server.failing.add('/page/2')
+    fetch_cards_from_set('tst')
+    server.failing.clear()
+    server.requested.clear()
+
+    cards, _ = fetch_cards_from_set('tst', resume=False)
+
+    assert server.requested == ['/cards/search', '/page/2', '/page/3']
+    assert len(cards) == 3
+
+
+def test_checkpoints_of_another_query_are_discarded(server):
+    FetchJournal('tst', {'q': 'set:other'}).record_page(1, [{'name': "Stale"}], None)
+
+    cards, _ = fetch_cards_from_set('tst')
+
+    assert server.requested[0] == '/cards/search'
+    assert [card['name'] for card in cards] == ["Card 1", "Card 2", "Card 3"]
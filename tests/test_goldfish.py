@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+import goldfish
+from goldfish import COLOR_BITS, simulate
+
+G, U = COLOR_BITS['G'], COLOR_BITS['U']
+
+
+def make_deck(rows):
+    """Attribute arrays from (is_land, land colors, mana value, colors needed, is_ramp, ramp colors) rows"""
+    columns = list(zip(*rows))
+    return {
+        'land': np.array(columns[0], dtype=bool),
+        'land_colors': np.array(columns[1], dtype=np.uint8),
+        'cmc': np.array(columns[2], dtype=np.int16),
+        'needed': np.array(columns[3], dtype=np.uint8),
+        'ramp': np.array(columns[4], dtype=bool),
+        'ramp_colors': np.array(columns[5], dtype=np.uint8),
+    }
+
+
+FOREST = (True, G, 0, 0, False, 0)
+BEARS = (False, 0, 2, G, False, 0)
+
+
+def test_keep_rate_matches_the_hypergeometric_probability():
+    deck = make_deck([FOREST] * 24 + [BEARS] * 36)
+    totals = simulate(deck, 200_000, seed=7)
+
+    expected = sum(math.comb(24, lands) * math.comb(36, 7 - lands) for lands in range(2, 6)) / math.comb(60, 7)
+    assert int(totals['kept']) / 200_000 == pytest.approx(expected, abs=0.005)
+
+
+@pytest.mark.parametrize('max_lands, keep_rate', [(5, 0.0), (7, 1.0)])
+def test_lands_only_deck(max_lands, keep_rate):
+    totals = simulate(make_deck([FOREST] * 40), 1000, max_lands=max_lands, seed=1)
+    assert int(totals['kept']) / 1000 == keep_rate
+    if keep_rate:
+        assert list(totals['mana'] / 1000) == [1, 2, 3, 4]
+
+
+def test_ramp_is_cast_cheapest_first_within_the_available_mana(monkeypatch):
+    # Draw the deck in list order
+    monkeypatch.setattr(goldfish, 'draw_orders',
+                        lambda rng, trials, deck_size, cards: np.tile(np.arange(cards, dtype=np.int16), (trials, 1)))
+    rock = (False, 0, 1, 0, True, 0)
+    green_ramp = (False, 0, 2, G, True, G)
+    blue_rock = (False, 0, 1, U, True, U)
+    deck = make_deck([FOREST, FOREST, rock, green_ramp, green_ramp, blue_rock, BEARS,
+                      FOREST, FOREST, FOREST, BEARS, BEARS])
+
+    totals = simulate(deck, 10, turns=4, seed=0)
+
+    # Turn 1: 1 land casts the rock. Turn 2: 2 lands + rock cast one green ramp (not both).
+    # Turn 3: 3 lands + 2 sources cast the other. The blue rock never has blue mana.
+    assert int(totals['kept']) == 10
+    assert list(totals['mana'] // 10) == [1, 3, 5, 7]
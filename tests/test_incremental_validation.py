@@ -0,0 +1,100 @@
+import copy
+
+import pytest
+
+import commander_deck_validator as validator
+from banned_list import BanTable, parse_banned_list
+
+
+def card(name, type_line, identity, oracle_text='', legality='legal'):
+    return {'name': name, 'type_line': type_line, 'color_identity': identity,
+            'oracle_text': oracle_text, 'legalities': {'commander': legality}}
+
+
+CARDS = {card_data['name']: card_data for card_data in [
+    card("Atraxa, Praetors' Voice", "Legendary Creature — Phyrexian Angel Horror", ['B', 'G', 'U', 'W'],
+         "Flying, vigilance, deathtouch, lifelink"),
+    card("Golos, Tireless Pilgrim", "Legendary Artifact Creature — Scout", [],
+         "When Golos enters, you may search your library for a land card", 'banned'),
+    card("Sol Ring", "Artifact", [], "{T}: Add {C}{C}. This adds mana."),
+    card("Cultivate", "Sorcery", ['G'], "Search your library for up to two basic land cards"),
+    card("Rhystic Study", "Enchantment", ['U'], "you may draw a card unless that player pays {1}"),
+    card("Swords to Plowshares", "Instant", ['W'], "Exile target creature."),
+    card("Llanowar Elves", "Creature — Elf Druid", ['G'], "{T}: Add {G}."),
+    card("Lightning Bolt", "Instant", ['R'], "Lightning Bolt deals 3 damage to target creature or player."),
+    card("Primeval Titan", "Creature — Giant", ['G'], "Trample", 'banned'),
+    card("Command Tower", "Land", [], "{T}: Add one mana of any color in your commander's color identity."),
+]}
+
+BAN_TABLE = BanTable(parse_banned_list("## Commander (EDH)\n\n### Banned Cards\n- Primeval Titan\n- Golos, Tireless Pilgrim\n"))
+
+BASE_DECK = {"Sol Ring": 1, "Cultivate": 1, "Rhystic Study": 1, "Swords to Plowshares": 1,
+             "Command Tower": 1, "Forest": 30, "Island": 30}
+
+EDITS = {
+    'unchanged': ("Atraxa, Praetors' Voice", {}),
+    'add cards': ("Atraxa, Praetors' Voice", {"Llanowar Elves": 1, "Lightning Bolt": 1}),
+    'remove cards': ("Atraxa, Praetors' Voice", {"Cultivate": 0, "Rhystic Study": 0}),
+    'change quantities': ("Atraxa, Praetors' Voice", {"Forest": 35, "Island": 28, "Sol Ring": 2}),
+    'banned card': ("Atraxa, Praetors' Voice", {"Primeval Titan": 1}),
+    'new commander': ("Golos, Tireless Pilgrim", {"Llanowar Elves": 1}),
+}
+
+
+def edited(deck, changes):
+    deck = dict(deck, **changes)
+    return {name: quantity for name, quantity in deck.items() if quantity}
+
+
+def full_validation(commander, main_deck):
+    facts = {name: validator.card_facts(CARDS, name) for name in [commander] + list(main_deck)}
+    return validator.evaluate_deck(commander, main_deck, facts, BAN_TABLE)
+
+
+@pytest.mark.parametrize('edit', sorted(EDITS))
+def test_incremental_matches_full_validation(monkeypatch, edit):
+    monkeypatch.setattr(validator, 'load_card_index', lambda *args, **kwargs: CARDS)
+
+    commander = "Atraxa, Praetors' Voice"
+    _, stats = full_validation(commander, BASE_DECK)
+    state = {
+        'commander': commander,
+        'main_deck': dict(BASE_DECK),
+        'facts': {name: validator.card_facts(CARDS, name) for name in [commander] + list(BASE_DECK)},
+        'composition': stats['deck_composition'],
+    }
+
+    new_commander, changes = EDITS[edit]
+    main_deck = edited(BASE_DECK, changes)
+    result = validator.revalidate_incrementally(copy.deepcopy(state), new_commander, main_deck, BAN_TABLE)
+
+    assert result is not None
+    violations, incremental_stats, _, _ = result
+    assert (violations, incremental_stats) == full_validation(new_commander, main_deck)
+
+
+def test_incremental_counts_changed_cards(monkeypatch):
+    monkeypatch.setattr(validator, 'load_card_index', lambda *args, **kwargs: CARDS)
+    commander = "Atraxa, Praetors' Voice"
+    state = {'commander': commander, 'main_deck': dict(BASE_DECK),
+             'facts': {name: validator.card_facts(CARDS, name) for name in [commander] + list(BASE_DECK)},
+             'composition': validator.deck_composition(
+                 {name: validator.card_facts(CARDS, name) for name in BASE_DECK}, BASE_DECK)}
+
+    main_deck = edited(BASE_DECK, {"Cultivate": 0, "Llanowar Elves": 1, "Forest": 29})
+    _, _, _, changed = validator.revalidate_incrementally(state, commander, main_deck, BAN_TABLE)
+    assert changed == 3
+
+
+def test_card_missing_from_library_needs_full_run(monkeypatch):
+    monkeypatch.setattr(validator, 'load_card_index', lambda *args, **kwargs: {})
+    commander = "Atraxa, Praetors' Voice"
+    state = {'commander': commander, 'main_deck': {}, 'facts': {commander: validator.card_facts(CARDS, commander)},
+             'composition': dict.fromkeys(validator.COMPOSITION_KEYS, 0)}
+    assert validator.revalidate_incrementally(state, commander, {"Sol Ring": 1}, BAN_TABLE) is None
+
+
+def test_fixture_ban_list_is_applied():
+    violations, _ = full_validation("Golos, Tireless Pilgrim", edited(BASE_DECK, {"Primeval Titan": 1}))
+    assert "Banned in Commander: Golos, Tireless Pilgrim" in violations
+    assert "Banned in Commander: Primeval Titan" in violations
@@ -0,0 +1,258 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import card_index
+import library_watcher
+from library_watcher import (
+    LibraryVersionError, library_fingerprint, library_generation, library_writer, open_version, prune_cache,
+    scan_library, set_library_generation,
+)
+
+
+def write_set(library_path, names, set_code='tst'):
+    path = library_path / "test-set" / f"all_cards_{set_code}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([{'name': name, 'set': set_code} for name in names]), encoding='utf-8')
+    return path
+
+
+def publish_set(library_path, names, set_code='tst'):
+    path = library_path / "test-set" / f"all_cards_{set_code}.json"
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps([{'name': name, 'set': set_code} for name in names]), encoding='utf-8')
+    with library_writer(library_path) as publish:
+        publish(tmp_path, path)
+    return path
+
+
+@pytest.fixture
+def library(tmp_path):
+    library_path = tmp_path / "card-library"
+    write_set(library_path, ["Sol Ring", "Mox Pearl"])
+    return library_path
+
+
+def test_each_publish_advances_the_generation_by_two(library):
+    assert library_generation(library) == 0
+    publish_set(library, ["Sol Ring"])
+    assert library_generation(library) == 2
+    publish_set(library, ["Mox Pearl"])
+    assert library_generation(library) == 4
+
+
+def test_fingerprint_changes_with_a_publish(library):
+    before = library_fingerprint(library)
+    assert library_fingerprint(library) == before
+    publish_set(library, ["Sol Ring", "Mox Pearl", "Black Lotus"])
+    assert library_fingerprint(library) != before
+
+
+def test_fingerprint_waits_for_a_publish_in_progress(library):
+    started, published = threading.Event(), threading.Event()
+
+    def writer():
+        path = library / "test-set" / "all_cards_tst.json"
+        tmp_path = path.with_name(".all_cards_tst.json.tmp")
+        tmp_path.write_text(json.dumps([{'name': "Black Lotus"}]), encoding='utf-8')
+        with library_writer(library) as publish:
+            started.set()
+            time.sleep(0.2)
+            publish(tmp_path, path)
+            write_set(library, ["Ancestral Recall"], 'two')
+        published.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started.wait()
+    assert library_generation(library) % 2 == 1
+
+    fingerprint = library_fingerprint(library)
+    assert published.is_set()  # The scan never saw the half-published state
+    thread.join()
+    assert fingerprint == library_fingerprint(library)
+
+
+def test_fingerprint_rescans_when_a_writer_published_during_the_scan(library, monkeypatch):
+    scans = []
+
+    def scan_during_publish(library_path):
+        stats = scan_library(library_path)
+        if not scans:
+            write_set(library, ["Black Lotus"], 'new')
+            set_library_generation(library, library_generation(library) + 2)
+        scans.append(stats)
+        return stats
+
+    monkeypatch.setattr(library_watcher, 'scan_library', scan_during_publish)
+    fingerprint = library_fingerprint(library)
+    monkeypatch.undo()
+
+    assert len(scans) == 2
+    assert fingerprint == library_fingerprint(library)
+
+
+def test_generation_left_odd_by_a_killed_writer_is_repaired(library):
+    set_library_generation(library, 3)
+    start = time.monotonic()
+    library_fingerprint(library)
+    assert time.monotonic() - start < 1.0
+    assert library_generation(library) == 4
+
+
+class FakeMsvcrt:
+    """msvcrt.locking stand-in: fails non-blocking locks while another process 'holds' the lock"""
+    LK_UNLCK, LK_NBLCK = 0, 2
+
+    def __init__(self):
+        self.held_elsewhere = False
+        self.locked = 0
+
+    def locking(self, fd, mode, nbytes):
+        if mode == self.LK_UNLCK:
+            self.locked -= 1
+        elif self.held_elsewhere:
+            raise OSError(13, "Permission denied")
+        else:
+            self.locked += 1
+
+
+@pytest.fixture
+def without_flock(monkeypatch):
+    msvcrt = FakeMsvcrt()
+    monkeypatch.setitem(sys.modules, 'fcntl', None)  # import fcntl raises ImportError, as on Windows
+    monkeypatch.setitem(sys.modules, 'msvcrt', msvcrt)
+    return msvcrt
+
+
+def test_killed_writer_is_repaired_without_flock(library, without_flock):
+    set_library_generation(library, 3)
+    start = time.monotonic()
+    library_fingerprint(library)
+    assert time.monotonic() - start < 1.0
+    assert library_generation(library) == 4
+    assert without_flock.locked == 0
+
+
+def test_active_writer_is_detected_without_flock(library, without_flock):
+    publish_set(library, ["Black Lotus"])
+    assert library_generation(library) == 2 and without_flock.locked == 0
+
+    set_library_generation(library, 3)
+    without_flock.held_elsewhere = True
+    assert library_watcher.writer_active(library)
+    library_watcher.repair_generation(library)
+    assert library_generation(library) == 3
+
+
+def test_replaced_version_stays_readable(library):
+    rel_path = "test-set/all_cards_tst.json"
+    stat = scan_library(library)[rel_path]
+    old_data = (library / rel_path).read_bytes()
+    publish_set(library, ["Black Lotus"])
+
+    f, opened = open_version(library, rel_path, stat)
+    with f:
+        assert f.read() == old_data
+    assert opened == stat
+
+    with pytest.raises(LibraryVersionError):
+        open_version(library, rel_path, (1, 1))
+
+
+def test_card_index_keeps_reading_its_generation(library, tmp_path, monkeypatch):
+    monkeypatch.setattr(card_index, 'SIDECAR_DIR', tmp_path / "card-offsets")
+    cards = card_index.CardIndex(card_index.build_card_index(library), library)
+
+    publish_set(library, ["Black Lotus", "Time Walk", "Mox Sapphire", "Sol Ring"])
+
+    assert cards["Mox Pearl"]['name'] == "Mox Pearl"
+    assert cards["Sol Ring"]['name'] == "Sol Ring"
+    cards.close()
+    fresh = card_index.CardIndex(card_index.build_card_index(library), library)
+    assert "Mox Pearl" not in fresh and fresh["Time Walk"]['name'] == "Time Walk"
+    fresh.close()
+
+
+def test_prune_cache_keeps_superseded_files_for_the_window(tmp_path):
+    now = time.time()
+    for name, age in [("cache_a.json", 7200), ("cache_b.json", 5400), ("cache_c.json", 60), ("cache_d.json", 0)]:
+        (tmp_path / name).write_text('{}')
+        os.utime(tmp_path / name, (now - age, now - age))
+
+    prune_cache("cache_*.json", max_age=3600, cache_dir=tmp_path)
+
+    # a was superseded by b 2h ago (pruned); b was superseded by c a minute ago (kept)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cache_b.json", "cache_c.json", "cache_d.json"]
+
+
+def test_poll_reparses_only_changed_files(library, monkeypatch):
+    watcher = library_watcher.LibraryWatcher(library)
+    watcher.poll()
+    watcher.by_name()
+    assert watcher.version == 1
+
+    parsed = []
+    read_pinned_card_file = library_watcher.read_pinned_card_file
+
+    def recording_read(path):
+        parsed.append(path.relative_to(library).as_posix())
+        return read_pinned_card_file(path)
+
+    monkeypatch.setattr(library_watcher, 'read_pinned_card_file', recording_read)
+
+    assert watcher.poll() == {'added': [], 'changed': [], 'removed': []}
+    assert parsed == [] and watcher.version == 1
+
+    write_set(library, ["Black Lotus", "Sol Ring"], set_code='new')
+    assert watcher.poll()['added'] == ["test-set/all_cards_new.json"]
+    assert parsed == ["test-set/all_cards_new.json"] and watcher.version == 2
+
+    parsed.clear()
+    write_set(library, ["Mox Pearl", "Time Walk", "Ancestral Recall"])
+    assert watcher.poll()['changed'] == ["test-set/all_cards_tst.json"]
+    assert parsed == ["test-set/all_cards_tst.json"] and watcher.version == 3
+
+    parsed.clear()
+    (library / "test-set" / "all_cards_new.json").unlink()
+    assert watcher.poll()['removed'] == ["test-set/all_cards_new.json"]
+    assert parsed == [] and watcher.version == 4
+
+    fresh = library_watcher.LibraryWatcher(library)
+    fresh.poll()
+    assert ({name: card['set'] for name, card in watcher.by_name().items()}
+            == {name: card['set'] for name, card in fresh.by_name().items()})
+    assert "Sol Ring" not in watcher.by_name() and "Black Lotus" not in watcher.by_name()
+
+
+def test_by_name_prefers_the_later_file(library):
+    watcher = library_watcher.LibraryWatcher(library)
+    watcher.poll()
+    assert watcher.by_name()["Sol Ring"]['set'] == 'tst'
+
+    write_set(library, ["Sol Ring"], set_code='zzz')
+    watcher.poll()
+    assert watcher.by_name()["Sol Ring"]['set'] == 'zzz'
+
+    write_set(library, ["Sol Ring"], set_code='aaa')
+    watcher.poll()
+    assert watcher.by_name()["Sol Ring"]['set'] == 'zzz'
+
+    (library / "test-set" / "all_cards_zzz.json").unlink()
+    watcher.poll()
+    assert watcher.by_name()["Sol Ring"]['set'] == 'tst'
+
+
+def test_compact_watchers_hold_card_records(library):
+    plain = library_watcher.LibraryWatcher(library)
+    plain.poll()
+    compact = library_watcher.LibraryWatcher(library, compact=True)
+    compact.poll()
+
+    assert all(type(card) is dict for card in plain.cards())
+    assert all(isinstance(card, library_watcher.Card) for card in compact.cards())
+    assert [card['name'] for card in compact.cards()] == [card['name'] for card in plain.cards()]
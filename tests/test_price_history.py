@@ -0,0 +1,152 @@
+import datetime
+import json
+import math
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from library_watcher import LibraryWatcher
+from price_history import PRICE_FIELDS, PriceHistory, ingest_library, to_day, today
+
+
+def card(card_id, usd, name=None, lang='en'):
+    return {'id': card_id, 'oracle_id': f"o-{card_id}", 'name': name or f"Card {card_id}",
+            'set': 'tst', 'lang': lang, 'prices': {'usd': usd, 'usd_foil': None, 'eur': '1.00', 'tix': None}}
+
+
+def full_latest(history):
+    latest = np.full((len(history.card_ids), len(PRICE_FIELDS)), np.nan, dtype=np.float32)
+    for row in range(len(history)):
+        for index, field in enumerate(PRICE_FIELDS):
+            latest[history.columns['card'][row], index] = history.columns[field][row]
+    return latest
+
+
+def test_record_and_load_round_trip(tmp_path):
+    history = PriceHistory(tmp_path)
+    assert history.record([card('a', '1.00'), card('b', '2.50')], day=100) == 2
+    assert history.record([card('a', '1.00'), card('b', '3.00'), card('c', None)], day=101) == 2
+
+    loaded = PriceHistory(tmp_path)
+    assert loaded.card_ids == ['a', 'b', 'c']
+    assert loaded.card_info[1] == ('o-b', 'Card b', 'tst', 'en')
+    assert len(loaded) == 4
+    for column in loaded.columns:
+        np.testing.assert_array_equal(loaded.columns[column], history.columns[column])
+    np.testing.assert_array_equal(loaded.last_prices(), history.last_prices())
+
+    usd = loaded.last_prices()[:, PRICE_FIELDS.index('usd')]
+    assert usd[0] == pytest.approx(1.0) and usd[1] == pytest.approx(3.0) and math.isnan(usd[2])
+
+
+def test_unchanged_prices_are_not_appended(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.record([card('a', '1.00'), card('b', None)], day=1)
+    assert history.record([card('a', '1.00'), card('b', None)], day=2) == 0
+    assert len(PriceHistory(tmp_path)) == 2
+
+
+def test_as_of_returns_last_price_on_or_before_each_day(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.record([card('a', '1.00')], day=10)
+    history.record([card('a', '2.00')], day=20)
+
+    prices = history.as_of(np.array([0]), np.array([5, 10, 15, 20, 25]))
+    np.testing.assert_array_equal(prices[0, 1:], np.array([1.0, 1.0, 2.0, 2.0], dtype=np.float32))
+    assert math.isnan(prices[0, 0])
+
+
+def test_latest_prices_match_a_full_recompute(tmp_path):
+    history = PriceHistory(tmp_path)
+    for day in range(5):
+        history.record([card(str(i), f"{day + i % 3}.00") for i in range(6)], day=day)
+    np.testing.assert_array_equal(history.last_prices(), full_latest(history))
+    np.testing.assert_array_equal(PriceHistory(tmp_path).last_prices(), full_latest(history))
+
+
+def test_backdated_records_do_not_replace_newer_prices(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.record([card('a', '1.00')], day=10)
+    history.record([card('a', '3.00')], day=30)
+
+    # Unchanged as of day 20 (still 1.00 then): nothing to append
+    assert history.record([card('a', '1.00')], day=20) == 0
+    assert history.record([card('a', '2.00')], day=20) == 1
+
+    usd = PRICE_FIELDS.index('usd')
+    assert history.last_prices()[0, usd] == pytest.approx(3.0)
+    assert PriceHistory(tmp_path).last_prices()[0, usd] == pytest.approx(3.0)
+    np.testing.assert_array_equal(history.as_of(np.array([0]), np.array([15, 25, 35]))[0],
+                                  np.array([1.0, 2.0, 3.0], dtype=np.float32))
+
+
+def test_deck_history_is_nan_until_every_card_is_priced(tmp_path):
+    history = PriceHistory(tmp_path)
+    end = today()
+    history.record([card('a', '1.00', name="Alpha")], day=end - 10)
+    history.record([card('b', '2.00', name="Beta")], day=end - 5)
+
+    dates, totals, unpriced, missing = history.deck_history([(2, "Alpha"), (1, "Beta"), (1, "Gamma")], days=10)
+
+    assert missing == ["Gamma"]
+    assert len(dates) == len(totals) == len(unpriced) == 11
+    assert all(math.isnan(total) for total in totals[:5]) and list(unpriced[:5]) == [1] * 5
+    assert list(totals[5:]) == [pytest.approx(4.0)] * 6 and list(unpriced[5:]) == [0] * 6
+
+
+def test_ingest_dates_each_set_by_its_fetch(tmp_path):
+    library_path = tmp_path / "card-library"
+    for set_code, usd, fetched_at in [('old', '1.00', "2025-01-02 03:04:05 UTC"), ('new', '2.00', "2025-06-01 00:00:00 UTC")]:
+        set_dir = library_path / f"set-{set_code}"
+        set_dir.mkdir(parents=True)
+        (set_dir / f"all_cards_{set_code}.json").write_text(json.dumps([card(set_code, usd)]), encoding='utf-8')
+        (set_dir / f"set_info_{set_code}.json").write_text(json.dumps({'fetched_at': fetched_at}), encoding='utf-8')
+    library = LibraryWatcher(library_path)
+    library.poll()
+
+    history = PriceHistory(tmp_path / "history")
+    assert ingest_library(history, library) == 2
+
+    days = dict(zip((history.card_ids[code] for code in history.columns['card']), history.columns['day']))
+    assert days == {'old': to_day(datetime.date(2025, 1, 2)), 'new': to_day(datetime.date(2025, 6, 1))}
+
+
+def test_torn_append_is_ignored_and_cut_by_the_next_writer(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.record([card('a', '1.00')], day=1)
+    with open(tmp_path / "usd.bin", 'ab') as f:
+        f.write(b'\x00\x00')
+    with open(tmp_path / "cards.tsv", 'ab') as f:
+        f.write(b'torn\tline')
+
+    reader = PriceHistory(tmp_path)
+    assert len(reader) == 1 and reader.card_ids == ['a']
+
+    reader.record([card('b', '2.00')], day=2)
+    reloaded = PriceHistory(tmp_path)
+    assert reloaded.card_ids == ['a', 'b']
+    assert len(reloaded) == 2
+    assert (tmp_path / "usd.bin").stat().st_size == 2 * 4
+
+
+def record_from_process(path, worker):
+    history = PriceHistory(path)
+    for day in range(20):
+        history.record([card(f"c{(worker * 5 + i) % 20}", f"{worker}.{day:02d}") for i in range(8)], day=day)
+
+
+def test_concurrent_writers_keep_codes_unique_and_columns_aligned(tmp_path):
+    processes = [multiprocessing.Process(target=record_from_process, args=(tmp_path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    history = PriceHistory(tmp_path)
+    assert len(history.card_ids) == len(set(history.card_ids)) == 20
+    assert all(history.card_info[history.codes[card_id]][1] == f"Card {card_id}" for card_id in history.card_ids)
+    sizes = {(tmp_path / f"{column}.bin").stat().st_size // 4 for column in history.columns}
+    assert sizes == {len(history)}
+    np.testing.assert_array_equal(history.last_prices(), full_latest(history))
@@ -0,0 +1,63 @@
+import json
+import re
+
+import pytest
+
+import card_index
+import regex_search
+from card_index import CardIndex, build_card_index
+from regex_search import RegexSearch, chunk_bounds, open_column, scan_chunk
+
+
+def printing(name, set_code, number, oracle_text, type_line='Instant'):
+    return {'id': f"{set_code}-{number}", 'oracle_id': f"oracle-{name}", 'name': name, 'set': set_code,
+            'collector_number': str(number), 'type_line': type_line, 'oracle_text': oracle_text}
+
+
+SETS = {
+    'alpha': [printing("Lightning Bolt", 'lea', 1, "Lightning Bolt deals 3 damage to any target."),
+              printing("Æther Shock", 'lea', 2, "Æther Shock deals 2 damage to each creature."),
+              printing("Fireball", 'lea', 3, "Fireball deals X damage divided as you choose among any number of targets."),
+              printing("Jötun Grunt", 'lea', 4, "Cumulative upkeep—Put two cards…", 'Creature — Giant')],
+    'beta': [printing("Lightning Bolt", 'leb', 1, "Lightning Bolt deals 3 damage to any target."),
+             printing("Shock", 'leb', 2, "Shock deals 2 damage to any target."),
+             printing("Ancestral Recall", 'leb', 3, "Target player draws three cards.")],
+}
+
+
+@pytest.fixture
+def searcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(card_index, 'SIDECAR_DIR', tmp_path / "cache" / "card-offsets")
+    monkeypatch.setattr(regex_search, 'CACHE_DIR', tmp_path / "cache")
+    library_path = tmp_path / "card-library"
+    for set_dir, cards in SETS.items():
+        (library_path / set_dir).mkdir(parents=True)
+        (library_path / set_dir / f"all_cards_{set_dir}.json").write_text(json.dumps(cards, ensure_ascii=False),
+                                                                          encoding='utf-8')
+    searcher = RegexSearch(CardIndex(build_card_index(library_path), library_path), library_path)
+    yield searcher
+    searcher.close()
+    searcher.card_data.close()
+
+
+@pytest.mark.parametrize('pattern', [r"deals \d+ damage to any target", r"æther", r"^\w+ Grunt", r"cards", r"zzz"])
+def test_chunked_scans_match_a_single_scan_in_library_order(searcher, pattern):
+    single = searcher.search(pattern)
+    assert single == sorted(single)
+
+    open_column(searcher.text_file, searcher.rows_file)
+    for chunks in range(1, len(searcher) + 1):
+        chunked = []
+        for first, last in chunk_bounds(len(searcher), chunks):
+            chunked.extend(scan_chunk(pattern, re.IGNORECASE, first, last))
+        assert chunked == single
+
+    assert searcher.search(pattern, workers=2) == single
+
+
+def test_search_matches_name_text_and_type(searcher):
+    names = lambda pattern: [(card['name'], card['set']) for card in searcher.cards(searcher.search(pattern))]
+    assert names(r"deals \d+ damage to any target") == [
+        ("Lightning Bolt", 'lea'), ("Lightning Bolt", 'leb'), ("Shock", 'leb')]
+    assert names(r"æther") == [("Æther Shock", 'lea')]
+    assert names(r"— giant") == [("Jötun Grunt", 'lea')]
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scryfall_client import RateLimiter, ScryfallClient
+
+
+class FailureHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in server that injects failures:
+
+        /ok            always 200
+        /flaky/<id>    503 for the first two requests of each id, then 200
+        /limited/<id>  429 with Retry-After: 1 once per id, then 200
+        /down          always 500
+        /drop/<id>     closes the connection without a response once per id, then 200
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, headers=None):
+        body = json.dumps({'object': 'list', 'path': self.path}).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.hits[self.path] = count = server.hits.get(self.path, 0) + 1
+
+        if self.path.startswith("/flaky/") and count <= 2:
+            self.send(503)
+        elif self.path.startswith("/limited/") and count == 1:
+            self.send(429, {"Retry-After": "1"})
+        elif self.path == "/down":
+            self.send(500)
+        elif self.path.startswith("/drop/") and count == 1:
+            self.close_connection = True
+            self.connection.close()
+        else:
+            self.send(200)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FailureHandler)
+    server.hits, server.ports, server.lock = {}, set(), threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    return ScryfallClient(f"http://127.0.0.1:{server.server_address[1]}", max_retries=3, backoff_base=0.01,
+                          rate_limiter=RateLimiter(0.0))
+
+
+def test_sequential_calls_reuse_one_connection(client, server):
+    for _ in range(10):
+        assert client.get("/ok").status_code == 200
+    assert len(server.ports) == 1
+
+
+def test_retries_5xx_with_backoff(client):
+    assert client.get("/flaky/1").status_code == 200
+    assert client.metrics[-1].attempts == 3
+
+
+def test_honours_retry_after(client):
+    start = time.perf_counter()
+    assert client.get("/limited/1").status_code == 200
+    assert time.perf_counter() - start >= 0.9
+
+
+def test_retries_are_bounded(client):
+    assert client.get("/down").status_code == 500
+    assert client.metrics[-1].attempts == 4
+
+
+def test_retries_dropped_connections(client):
+    assert client.get("/drop/1").status_code == 200
+    assert client.metrics[-1].attempts == 2
+
+
+def test_threads_share_the_session(client):
+    errors = []
+
+    def worker(n):
+        try:
+            if client.get(f"/flaky/t{n}").status_code != 200:
+                errors.append(n)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_latency_metrics(client):
+    client.get("/ok")
+    client.get("/flaky/1")
+    client.get("/down")
+
+    stats = client.stats()
+    assert (stats['calls'], stats['retries'], stats['failures']) == (3, 5, 1)
+    assert 0 < stats['p50'] <= stats['p95'] <= stats['max']
+    assert client.summary().startswith("3 requests, 5 retries, 1 failed")